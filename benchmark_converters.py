@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the DocuGenius converters
+Builds synthetic DOCX/XLSX/PPTX/PDF corpora at several sizes and times simple_convert,
+convert_with_images and extract_images_from_document on every file, recording wall
+time, CPU time, peak RSS and output size as JSON so releases can be compared.
+
+Usage:
+    python benchmark_converters.py [--sizes small,medium] [--formats docx,xlsx,pptx,pdf]
+                                   [--repeat N] [--output results.json]
+                                   [--compare baseline.json] [--threshold 0.2]
+
+Every measurement runs in a fresh interpreter on a fresh copy of the document, so
+import costs are included and image writes are never skipped as duplicates.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import platform
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent
+
+# Corpus presets; each format has its own size parameters
+SIZES = {
+    'small': {
+        'docx': {'pages': 5, 'images': 2},
+        'xlsx': {'rows': 1000, 'sheets': 1},
+        'pptx': {'slides': 10},
+        'pdf': {'pages': 5},
+    },
+    'medium': {
+        'docx': {'pages': 50, 'images': 20},
+        'xlsx': {'rows': 20000, 'sheets': 4},
+        'pptx': {'slides': 100},
+        'pdf': {'pages': 50},
+    },
+    'large': {
+        'docx': {'pages': 300, 'images': 100},
+        'xlsx': {'rows': 200000, 'sheets': 10},
+        'pptx': {'slides': 300},
+        'pdf': {'pages': 300},
+    },
+}
+
+FORMATS = ['docx', 'xlsx', 'pptx', 'pdf']
+FUNCTIONS = ['simple_convert', 'convert_with_images', 'extract_images_from_document']
+
+# Roughly one printed page of body text
+PARAGRAPHS_PER_PAGE = 12
+LINES_PER_PDF_PAGE = 45
+
+
+def default_bin_dir():
+    """Converter scripts for the platform the benchmark runs on"""
+    return ROOT_DIR / 'bin' / ('win32' if sys.platform == 'win32' else 'darwin')
+
+
+def make_image(index, size=(320, 200)):
+    """Return PNG bytes of a distinct test image, so no two images deduplicate"""
+    import io
+    from PIL import Image, ImageDraw
+
+    img = Image.new('RGB', size, color=((index * 37) % 256, (index * 91) % 256, (index * 53) % 256))
+    draw = ImageDraw.Draw(img)
+    draw.text((10, size[1] // 2), f"Benchmark image {index}", fill='white')
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def sentence(index):
+    """A line of filler text that differs from line to line"""
+    return (f"Paragraph {index}: DocuGenius benchmark text with enough words to look like a "
+            f"real document, measured across releases to catch regressions ({index * 7919 % 10007}).")
+
+
+def make_docx(path, pages, images):
+    """Write a DOCX of about `pages` pages with `images` pictures and a table every 10 pages"""
+    import io
+    from docx import Document
+    from docx.shared import Inches
+
+    # Spread the images evenly over the pages
+    images_per_page = [0] * pages
+    for index in range(images):
+        images_per_page[index * pages // images] += 1
+
+    doc = Document()
+    image_index = 0
+    for page in range(pages):
+        doc.add_heading(f"Section {page + 1}", level=1 if page % 5 == 0 else 2)
+        for line in range(PARAGRAPHS_PER_PAGE):
+            doc.add_paragraph(sentence(page * PARAGRAPHS_PER_PAGE + line))
+
+        for _ in range(images_per_page[page]):
+            doc.add_picture(io.BytesIO(make_image(image_index)), width=Inches(3))
+            image_index += 1
+
+        if page % 10 == 9:
+            table = doc.add_table(rows=6, cols=4)
+            for r, row in enumerate(table.rows):
+                for c, cell in enumerate(row.cells):
+                    cell.text = f"R{r}C{c}" if r else f"Header {c}"
+
+        doc.add_page_break()
+    doc.save(str(path))
+
+
+def make_xlsx(path, rows, sheets=1):
+    """Write an XLSX with `rows` data rows of mixed text and numbers, split over `sheets` sheets"""
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    rows_per_sheet = max(1, rows // sheets)
+    for sheet in range(sheets):
+        worksheet = workbook.create_sheet(f"Sheet{sheet + 1}")
+        worksheet.append(['Account', 'Region', 'Q1', 'Q2', 'Q3', 'Q4', 'Total', 'Note'])
+        for r in range(rows_per_sheet):
+            values = [(r * 31 + sheet) % 1000 * 1.25, r % 97, (r * 7) % 500, r % 13 * 100.5]
+            worksheet.append([f"ACC-{r % 500:04d}", ['North', 'South', 'East', 'West'][r % 4]] + values +
+                             [sum(values), f"row {r}"])
+    workbook.save(str(path))
+
+
+def make_pptx(path, slides):
+    """Write a PPTX with `slides` title-and-content slides and a picture on every third slide"""
+    import io
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    prs = Presentation()
+    for index in range(slides):
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = f"Slide {index + 1}"
+        slide.placeholders[1].text = "\n".join(sentence(index * 4 + line) for line in range(4))
+        if index % 3 == 0:
+            slide.shapes.add_picture(io.BytesIO(make_image(index)), Inches(5), Inches(4), width=Inches(3))
+    prs.save(str(path))
+
+
+def make_pdf(path, pages):
+    """Write a text PDF of `pages` pages"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    c = canvas.Canvas(str(path), pagesize=letter)
+    width, height = letter
+    for page in range(pages):
+        y = height - 60
+        c.drawString(60, y, f"Page {page + 1}")
+        for line in range(LINES_PER_PDF_PAGE):
+            y -= 15
+            c.drawString(60, y, sentence(page * LINES_PER_PDF_PAGE + line)[:95])
+        c.showPage()
+    c.save()
+
+
+GENERATORS = {'docx': make_docx, 'xlsx': make_xlsx, 'pptx': make_pptx, 'pdf': make_pdf}
+
+
+def corpus_file(corpus_dir, fmt, params):
+    """Generate a corpus document, reusing an earlier one built with the same parameters"""
+    name = '_'.join(f"{key}{value}" for key, value in sorted(params.items()))
+    path = Path(corpus_dir) / f"bench_{fmt}_{name}.{fmt}"
+    if not path.exists():
+        temp_path = path.with_name(f"tmp_{path.name}")
+        GENERATORS[fmt](temp_path, **params)
+        os.replace(temp_path, path)
+    return path
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None where it cannot be read"""
+    try:
+        # Linux carries ru_maxrss over from the parent across fork and exec, so the
+        # benchmark's own memory would leak into every measurement; VmHWM does not
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        pass
+
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(),
+                                                 ctypes.byref(counters), counters.cb)
+        return counters.PeakWorkingSetSize
+    except Exception:
+        return None
+
+
+def directory_size(path):
+    """Number of files and total bytes under path, leaving out bookkeeping dotfiles"""
+    count = 0
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            if filename.startswith('.'):
+                continue  # e.g. the image dedup index
+            count += 1
+            total += os.path.getsize(os.path.join(dirpath, filename))
+    return count, total
+
+
+def measure(bin_dir, function, file_path):
+    """Run one converter function in this process and return its measurements
+
+    Called in a fresh interpreter by run_measurement(); file_path is a private copy.
+    """
+    sys.path.insert(0, str(bin_dir))
+    import converter
+
+    images_dir = Path(file_path).parent / 'DocuGenius' / 'images'
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+
+    if function == 'simple_convert':
+        markdown = converter.simple_convert(file_path)
+    elif function == 'convert_with_images':
+        markdown = converter.convert_with_images(file_path, True, use_cache=False)
+    elif function == 'extract_images_from_document':
+        from image_extractor import extract_images_from_document
+        result = extract_images_from_document(file_path)
+        if not result.get('success'):
+            raise RuntimeError(result.get('error', 'image extraction failed'))
+        markdown = result.get('markdown_references', '')
+    else:
+        raise ValueError(f"Unknown function: {function}")
+
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    if markdown.startswith(('Error:', 'Error reading', 'Unsupported file type:')):
+        raise RuntimeError(markdown.splitlines()[0])
+
+    images, image_bytes = directory_size(images_dir)
+    return {
+        'wall_seconds': round(wall, 4),
+        'cpu_seconds': round(cpu, 4),
+        'peak_rss_bytes': peak_rss_bytes(),
+        'output_bytes': len(markdown.encode('utf-8')),
+        'images': images,
+        'image_bytes': image_bytes,
+    }
+
+
+def run_measurement(bin_dir, function, document, timeout):
+    """Measure one function on one document in a fresh interpreter and working directory"""
+    work_dir = tempfile.mkdtemp(prefix='docugenius-bench-')
+    try:
+        file_path = os.path.join(work_dir, document.name)
+        shutil.copyfile(document, file_path)
+        completed = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), '--measure', str(bin_dir), function, file_path],
+            capture_output=True, text=True, timeout=timeout, cwd=work_dir)
+
+        # Converters may print warnings; the measurement is the last JSON line
+        for line in reversed(completed.stdout.splitlines()):
+            if line.startswith('{'):
+                return json.loads(line)
+        error = (completed.stderr.strip().splitlines() or ['no output'])[-1]
+        return {'error': error}
+    except subprocess.TimeoutExpired:
+        return {'error': f"timed out after {timeout}s"}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def converter_version(bin_dir):
+    """CONVERTER_VERSION of the converter under test"""
+    try:
+        source = (Path(bin_dir) / 'converter.py').read_text(encoding='utf-8')
+        match = re.search(r"^CONVERTER_VERSION = '([^']+)'", source, re.MULTILINE)
+        return match.group(1) if match else None
+    except OSError:
+        return None
+
+
+def extension_version():
+    """Version of the extension from package.json"""
+    try:
+        with open(ROOT_DIR / 'package.json', 'r', encoding='utf-8') as f:
+            return json.load(f).get('version')
+    except (OSError, ValueError):
+        return None
+
+
+def run_benchmarks(sizes, formats, functions, bin_dir, corpus_dir, repeat=1, timeout=600):
+    """Build the corpora and measure every function on every document
+
+    Wall and CPU times are the median over `repeat` runs; peak RSS is the largest seen.
+    """
+    results = []
+    for size_name, size in sizes.items():
+        for fmt in formats:
+            params = size[fmt]
+            result_base = {'format': fmt, 'size': size_name, 'params': params}
+            try:
+                document = corpus_file(corpus_dir, fmt, params)
+            except Exception as e:
+                # Usually a generator dependency that is not installed (reportlab, Pillow, ...)
+                print(f"[{size_name}] {fmt}: skipped, cannot build corpus: {e}", file=sys.stderr)
+                results.append(dict(result_base, skipped=f"cannot build corpus: {e}"))
+                continue
+
+            for function in functions:
+                runs = [run_measurement(bin_dir, function, document, timeout) for _ in range(repeat)]
+                result = dict(result_base, function=function, file_bytes=document.stat().st_size)
+
+                errors = [run['error'] for run in runs if 'error' in run]
+                if errors:
+                    result['error'] = errors[0]
+                    print(f"[{size_name}] {fmt} {function}: error: {errors[0]}", file=sys.stderr)
+                else:
+                    walls = [run['wall_seconds'] for run in runs]
+                    rss = [run['peak_rss_bytes'] for run in runs if run['peak_rss_bytes'] is not None]
+                    result.update({
+                        'wall_seconds': round(statistics.median(walls), 4),
+                        'wall_samples': walls,
+                        'cpu_seconds': round(statistics.median(run['cpu_seconds'] for run in runs), 4),
+                        'peak_rss_bytes': max(rss) if rss else None,
+                        'output_bytes': runs[-1]['output_bytes'],
+                        'images': runs[-1]['images'],
+                        'image_bytes': runs[-1]['image_bytes'],
+                    })
+                    rss_text = f"{result['peak_rss_bytes'] / 1048576:.1f} MB" if rss else "n/a"
+                    print(f"[{size_name}] {fmt} {function}: {result['wall_seconds']:.3f}s, "
+                          f"peak RSS {rss_text}, {result['output_bytes']} bytes, {result['images']} images",
+                          file=sys.stderr)
+                results.append(result)
+    return results
+
+
+def compare_results(baseline, current, threshold):
+    """Print wall time and peak RSS changes against a baseline; return the regressed entries
+
+    An entry regresses when its wall time or peak RSS grew by more than threshold
+    (a fraction) or when it fails now but succeeded in the baseline.
+    """
+    def key(result):
+        return (result['format'], result['size'], result.get('function'))
+
+    baseline_by_key = {key(result): result for result in baseline.get('results', [])}
+    regressions = []
+    print(f"{'benchmark':<48} {'wall':>18} {'peak RSS':>22}")
+    for result in current.get('results', []):
+        before = baseline_by_key.get(key(result))
+        if before is None or 'function' not in result:
+            continue
+
+        name = f"{result['size']}/{result['format']}/{result['function']}"
+        if 'error' in result:
+            if 'error' not in before:
+                regressions.append(name)
+            print(f"{name:<48} {'error: ' + result['error'][:30]:>41}")
+            continue
+        if 'error' in before:
+            continue
+
+        changes = []
+        for metric in ('wall_seconds', 'peak_rss_bytes'):
+            old, new = before.get(metric), result.get(metric)
+            changes.append((new - old) / old if old and new is not None else None)
+
+        if any(change is not None and change > threshold for change in changes):
+            regressions.append(name)
+
+        wall_change, rss_change = (f"{change:+.1%}" if change is not None else "n/a" for change in changes)
+        rss_new = f"{result['peak_rss_bytes'] / 1048576:.1f}MB" if result.get('peak_rss_bytes') else "n/a"
+        print(f"{name:<48} {result['wall_seconds']:>8.3f}s {wall_change:>9} {rss_new:>12} {rss_change:>9}")
+
+    return regressions
+
+
+def parse_args(args):
+    """Parse the benchmark command line"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the DocuGenius converters on synthetic corpora')
+    parser.add_argument('--sizes', default='small,medium', help=f"comma-separated presets from {', '.join(SIZES)} (default: small,medium)")
+    parser.add_argument('--formats', default=','.join(FORMATS), help='comma-separated formats (default: all)')
+    parser.add_argument('--functions', default=','.join(FUNCTIONS), help='comma-separated converter functions (default: all)')
+    parser.add_argument('--docx-pages', type=int, help='custom size: DOCX pages')
+    parser.add_argument('--docx-images', type=int, default=10, help='custom size: DOCX images (default: 10)')
+    parser.add_argument('--xlsx-rows', type=int, help='custom size: XLSX rows')
+    parser.add_argument('--xlsx-sheets', type=int, default=1, help='custom size: XLSX sheets (default: 1)')
+    parser.add_argument('--pptx-slides', type=int, help='custom size: PPTX slides')
+    parser.add_argument('--pdf-pages', type=int, help='custom size: PDF pages')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement; the median is reported (default: 3)')
+    parser.add_argument('--timeout', type=int, default=600, help='seconds before a single run is abandoned (default: 600)')
+    parser.add_argument('--bin-dir', default=str(default_bin_dir()), help='directory containing converter.py')
+    parser.add_argument('--corpus-dir', help='where generated documents are kept and reused (default: a temporary directory)')
+    parser.add_argument('--output', default='benchmark_results.json', help='results file (default: benchmark_results.json)')
+    parser.add_argument('--compare', help='baseline results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='regression threshold as a fraction (default: 0.2)')
+    return parser.parse_args(args)
+
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == '--measure':
+        # Child process of run_measurement()
+        _, _, bin_dir, function, file_path = sys.argv
+        print(json.dumps(measure(bin_dir, function, file_path)))
+        return 0
+
+    args = parse_args(sys.argv[1:])
+    formats = [fmt for fmt in args.formats.split(',') if fmt]
+    functions = [function for function in args.functions.split(',') if function]
+    size_names = [size for size in args.sizes.split(',') if size]
+    for kind, values, allowed in (('format', formats, FORMATS), ('function', functions, FUNCTIONS),
+                                  ('size preset', size_names, SIZES)):
+        unknown = [value for value in values if value not in allowed]
+        if unknown:
+            print(f"Error: unknown {kind}: {', '.join(unknown)}")
+            return 2
+    sizes = {name: SIZES[name] for name in size_names}
+
+    custom = {
+        'docx': {'pages': args.docx_pages, 'images': args.docx_images} if args.docx_pages else None,
+        'xlsx': {'rows': args.xlsx_rows, 'sheets': args.xlsx_sheets} if args.xlsx_rows else None,
+        'pptx': {'slides': args.pptx_slides} if args.pptx_slides else None,
+        'pdf': {'pages': args.pdf_pages} if args.pdf_pages else None,
+    }
+    if any(custom.values()):
+        # A custom size replaces the presets and covers only the formats it sizes
+        sizes = {'custom': {fmt: params for fmt, params in custom.items() if params}}
+        formats = [fmt for fmt in formats if custom[fmt]]
+
+    corpus_dir = args.corpus_dir or tempfile.mkdtemp(prefix='docugenius-corpus-')
+    os.makedirs(corpus_dir, exist_ok=True)
+    try:
+        results = run_benchmarks(sizes, formats, functions, args.bin_dir, corpus_dir, args.repeat, args.timeout)
+    finally:
+        if not args.corpus_dir:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    report = {
+        'extension_version': extension_version(),
+        'converter_version': converter_version(args.bin_dir),
+        'bin_dir': str(args.bin_dir),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'repeat': args.repeat,
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, report, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+        print(f"\nNo regressions over {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+DocuGenius Conversion Cache
+Content-addressed cache of converted markdown, keyed by the source file's hash plus
+the converter version and the options that affect the output.
+"""
+
+import os
+import json
+import hashlib
+import posixpath
+import re
+
+# pathlib and typing are left out on purpose: a cache hit loads this module and no format
+# library, so its imports are a large share of that conversion's startup time.
+
+# Without an explicit cache folder the cache lives in DocuGenius/.cache next to the
+# document; the extension passes the .cache folder inside its configured output folder
+DEFAULT_CACHE_SUBDIR = os.path.join("DocuGenius", ".cache")
+# Cache entries live in <cache folder>/conversions
+CONVERSIONS_SUBDIR = "conversions"
+# Per-part manifests for incremental re-conversion live in <cache folder>/segments
+SEGMENTS_SUBDIR = "segments"
+
+SPREADSHEETML_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+RELATIONSHIPS_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+# Shared-string cells (<c ... t="s"><v>index</v></c>), matched on the raw sheet XML
+SHARED_STRING_CELL = re.compile(rb'<(?:\w+:)?c\b[^>]*\bt="s"[^>]*>\s*<(?:\w+:)?v>\s*(\d+)\s*<')
+
+
+def cache_dir_for(document_path, cache_dir=None) -> str:
+    """Return cache_dir, or the default cache folder next to a document when it is None"""
+    if cache_dir:
+        return os.path.abspath(cache_dir)
+    return os.path.join(os.path.dirname(os.path.abspath(document_path)), DEFAULT_CACHE_SUBDIR)
+
+
+def calculate_file_hash(file_path, chunk_size: int = 1024 * 1024) -> str:
+    """Calculate the SHA-256 hash of a file's content"""
+    file_hash = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def _read_rels(archive, part_name: str) -> dict:
+    """Read the internal relationships of an OOXML package part as {rId: (type, target part)}"""
+    import xml.etree.ElementTree as ET
+
+    directory, name = posixpath.split(part_name)
+    try:
+        root = ET.fromstring(archive.read(posixpath.join(directory, '_rels', name + '.rels')))
+    except KeyError:
+        return {}
+
+    rels = {}
+    for rel in root:
+        target = rel.get('Target', '')
+        if rel.get('TargetMode') == 'External':
+            continue
+        if target.startswith('/'):
+            target_part = target.lstrip('/')
+        else:
+            target_part = posixpath.normpath(posixpath.join(directory, target))
+        rels[rel.get('Id')] = (rel.get('Type', ''), target_part)
+    return rels
+
+
+def _update_with_part(fingerprint, archive, part_name: str) -> None:
+    """Add a package part's name, CRC and size to a fingerprint without reading it"""
+    try:
+        info = archive.getinfo(part_name)
+    except KeyError:
+        return
+    fingerprint.update(f"{part_name}:{info.CRC}:{info.file_size};".encode('utf-8'))
+
+
+def xlsx_sheet_fingerprints(archive) -> list:
+    """Fingerprint every sheet of an XLSX workbook, in workbook order
+
+    A sheet's fingerprint covers its name and XML, the parts it relates to (drawings,
+    their images, comments, ...), the text of every shared string it uses, and the
+    workbook-wide settings that change how values read (styles and the date system).
+    Shared strings are resolved per sheet, so adding a string on one tab does not
+    invalidate the others.
+    """
+    import xml.etree.ElementTree as ET
+
+    s = f'{{{SPREADSHEETML_NS}}}'
+    workbook_part = next((target for rel_type, target in _read_rels(archive, '').values()
+                          if rel_type.endswith('/officeDocument')), 'xl/workbook.xml')
+    workbook_rels = _read_rels(archive, workbook_part)
+    workbook = ET.fromstring(archive.read(workbook_part))
+
+    workbook_fingerprint = hashlib.sha256()
+    workbook_properties = workbook.find(f'{s}workbookPr')
+    if workbook_properties is not None:
+        workbook_fingerprint.update(repr(sorted(workbook_properties.attrib.items())).encode('utf-8'))
+
+    shared_strings = None
+    for rel_type, target in workbook_rels.values():
+        if rel_type.endswith('/styles'):
+            _update_with_part(workbook_fingerprint, archive, target)
+        elif rel_type.endswith('/sharedStrings'):
+            shared_strings = [hashlib.sha256(''.join(item.itertext()).encode('utf-8')).digest()
+                              for item in ET.fromstring(archive.read(target)).iter(f'{s}si')]
+
+    fingerprints = []
+    for sheet in workbook.iter(f'{s}sheet'):
+        sheet_part = workbook_rels[sheet.get(f'{{{RELATIONSHIPS_NS}}}id')][1]
+        fingerprint = workbook_fingerprint.copy()
+        fingerprint.update(sheet.get('name', '').encode('utf-8'))
+        _update_with_part(fingerprint, archive, sheet_part)
+
+        # Related parts two levels down: drawings and the images they embed
+        for _, related_part in sorted(_read_rels(archive, sheet_part).values()):
+            _update_with_part(fingerprint, archive, related_part)
+            for _, nested_part in sorted(_read_rels(archive, related_part).values()):
+                _update_with_part(fingerprint, archive, nested_part)
+
+        if shared_strings is not None:
+            # A scan of the raw XML is several times cheaper than parsing every cell
+            for match in SHARED_STRING_CELL.finditer(archive.read(sheet_part)):
+                index = int(match.group(1))
+                if index < len(shared_strings):
+                    fingerprint.update(shared_strings[index])
+
+        fingerprints.append(fingerprint.hexdigest())
+    return fingerprints
+
+
+class ConversionCache:
+    """On-disk cache of conversion results
+
+    Entries are keyed by content rather than path or mtime, so touched-but-unchanged
+    files, renamed copies and checkouts that reset mtimes still hit the cache.
+    """
+
+    def __init__(self, cache_dir: str, version: str, max_entries: int = 5000):
+        self.cache_dir = str(cache_dir)
+        self.version = version
+        self.max_entries = max_entries
+
+    @classmethod
+    def for_document(cls, document_path: str, version: str, cache_dir: str = None, **kwargs) -> 'ConversionCache':
+        """Create the conversion cache in cache_dir (see cache_dir_for)"""
+        return cls(os.path.join(cache_dir_for(document_path, cache_dir), CONVERSIONS_SUBDIR), version, **kwargs)
+
+    def make_key(self, file_hash: str, options: dict) -> str:
+        """Build the cache key from the content hash, converter version and options"""
+        key_data = json.dumps({'hash': file_hash, 'version': self.version, 'options': options},
+                              sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(key_data.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str):
+        """Return the cached entry, or None if it is missing, unreadable or its images are gone"""
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # The markdown references extracted images; a hit is only valid while they exist
+        for image in entry.get('images', []):
+            if image.get('path') and not os.path.exists(image['path']):
+                return None
+
+        try:
+            # Refresh the mtime so pruning keeps recently used entries
+            os.utime(entry_path, None)
+        except OSError:
+            pass
+
+        return entry
+
+    def put(self, key: str, entry: dict) -> None:
+        """Store an entry atomically; failures only cost a future cache miss"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entry_path = self._entry_path(key)
+            temp_path = f"{entry_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(temp_path, entry_path)
+            self._prune()
+        except OSError:
+            pass
+
+    def _prune(self) -> None:
+        """Drop the least recently used entries once the cache grows past max_entries"""
+        entries = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith('.json')]
+        if len(entries) <= self.max_entries:
+            return
+
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+class SegmentManifest:
+    """Rendered markdown of each part (slide, sheet, ...) of one document, keyed by fingerprint
+
+    A re-conversion looks up every part by position and fingerprint, renders only the
+    parts that changed and splices the stored markdown of the others back in. Stored
+    segments are ignored when the settings they were rendered with differ.
+    """
+
+    def __init__(self, manifest_path, settings: dict):
+        self.manifest_path = str(manifest_path)
+        self.settings = settings
+        self._segments = None
+        self._recorded = []
+
+    @classmethod
+    def for_document(cls, document_path, settings: dict, kind: str = 'content', cache_dir: str = None) -> 'SegmentManifest':
+        """Create a document's manifest in cache_dir (see cache_dir_for)
+
+        Manifests are named <file name>.<kind>.json, so the extension can remove them
+        together with the source. kind separates manifests of the same document rendered
+        by different converters ('content' for the image-aware extractor, 'text' for the
+        text converter).
+        """
+        document_path = os.path.abspath(document_path)
+        manifest_name = f"{os.path.basename(document_path)}.{kind}.json"
+        return cls(os.path.join(cache_dir_for(document_path, cache_dir), SEGMENTS_SUBDIR, manifest_name), settings)
+
+    def _load(self) -> list:
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return []
+
+        if not isinstance(manifest, dict) or manifest.get('settings') != self.settings:
+            return []
+        segments = manifest.get('segments')
+        return segments if isinstance(segments, list) else []
+
+    def lookup(self, index: int, fingerprint: str):
+        """Return the stored segment at index if its fingerprint matches and its images still exist"""
+        if self._segments is None:
+            self._segments = self._load()
+
+        if index >= len(self._segments):
+            return None
+        segment = self._segments[index]
+        if not isinstance(segment, dict) or segment.get('fingerprint') != fingerprint:
+            return None
+
+        for image in segment.get('images', []):
+            if image.get('path') and not os.path.exists(image['path']):
+                return None
+        return segment
+
+    def record(self, fingerprint: str, segment: dict) -> None:
+        """Append the segment for the next part, in document order"""
+        self._recorded.append(dict(segment, fingerprint=fingerprint))
+
+    def save(self) -> None:
+        """Replace the stored manifest with the recorded segments; failures only cost a re-render"""
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+            temp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'settings': self.settings, 'segments': self._recorded}, f, ensure_ascii=False)
+            os.replace(temp_path, self.manifest_path)
+        except OSError:
+            pass
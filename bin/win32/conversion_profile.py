@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+DocuGenius Conversion Profile
+Opt-in per-stage timing and memory figures for a single conversion, reported as one
+JSON line on stderr.
+"""
+
+import sys
+import time
+
+# Prefix of the profile line on stderr; the extension looks for it to log the figures
+PROFILE_PREFIX = 'DOCUGENIUS_PROFILE '
+
+
+class ConversionProfile:
+    """Wall time, CPU time and traced memory peak of each stage of one conversion
+
+    Stages nest, and a stage's figures include the stages opened inside it. Memory is
+    traced with tracemalloc, which slows allocation-heavy code down, so the times of a
+    profiled run are somewhat higher than those of a normal one. A disabled profile
+    (the default) ignores every call.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.stages = []
+        self.counters = {}
+        # Stages being timed; the root frame collects the peak of the whole conversion
+        self._stack = [{'_peak': 0}]
+        self._start = None
+
+    def start(self) -> 'ConversionProfile':
+        """Start the clocks and memory tracing for the whole conversion"""
+        if self.enabled and self._start is None:
+            import tracemalloc
+            tracemalloc.start()
+            self._start = (time.perf_counter(), time.process_time())
+        return self
+
+    def stage(self, name: str) -> '_Stage':
+        """Time the code in the with block as one stage"""
+        return _Stage(self, name)
+
+    def _enter_stage(self, name: str) -> dict:
+        import tracemalloc
+        record = {'name': name, 'depth': len(self._stack) - 1, '_peak': 0}
+        self.stages.append(record)
+
+        # The peak counter is reset for this stage, so fold the enclosing stage's peak so far into it first
+        self._stack[-1]['_peak'] = max(self._stack[-1]['_peak'], tracemalloc.get_traced_memory()[1])
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+
+        self._stack.append(record)
+        record['_start'] = (time.perf_counter(), time.process_time())
+        return record
+
+    def _exit_stage(self, record: dict) -> None:
+        import tracemalloc
+        wall_start, cpu_start = record.pop('_start')
+        record['wall_seconds'] = round(time.perf_counter() - wall_start, 4)
+        record['cpu_seconds'] = round(time.process_time() - cpu_start, 4)
+        self._stack.pop()
+        record['peak_traced_bytes'] = max(record.pop('_peak'), tracemalloc.get_traced_memory()[1])
+        self._stack[-1]['_peak'] = max(self._stack[-1]['_peak'], record['peak_traced_bytes'])
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Add to a counter such as images written or bytes written"""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def report(self, **info) -> dict:
+        """Return the profile as a dictionary, with info (file path, ...) merged in"""
+        report = dict(info)
+        if self._start is not None:
+            import tracemalloc
+            report['total'] = {
+                'wall_seconds': round(time.perf_counter() - self._start[0], 4),
+                'cpu_seconds': round(time.process_time() - self._start[1], 4),
+                'peak_traced_bytes': max(self._stack[0]['_peak'], tracemalloc.get_traced_memory()[1])
+            }
+        report['stages'] = self.stages
+        report['counters'] = self.counters
+        return report
+
+    def emit(self, stream=None, **info) -> None:
+        """Write the report as a single prefixed JSON line (stderr by default)"""
+        if not self.enabled:
+            return
+        import json
+        stream = stream or sys.stderr
+        stream.write(PROFILE_PREFIX + json.dumps(self.report(**info), ensure_ascii=False) + "\n")
+        stream.flush()
+
+
+class _Stage:
+    """Context manager returned by ConversionProfile.stage()
+
+    A plain class rather than contextlib.contextmanager, which keeps contextlib out of
+    the converter's startup imports.
+    """
+
+    def __init__(self, profile: ConversionProfile, name: str):
+        self.profile = profile
+        self.name = name
+        self.record = None
+
+    def __enter__(self):
+        if self.profile.enabled:
+            self.record = self.profile._enter_stage(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.record is not None:
+            self.profile._exit_stage(self.record)
+        return False
+
+
+# The profile of the conversion running in this process; disabled unless enable_profile() is called
+_current = ConversionProfile(enabled=False)
+
+
+def current_profile() -> ConversionProfile:
+    """Return the active profile, a disabled one when profiling is off"""
+    return _current
+
+
+def enable_profile() -> ConversionProfile:
+    """Switch profiling on for this process and start the clocks"""
+    global _current
+    _current = ConversionProfile().start()
+    return _current
@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
+# Every conversion runs in a fresh process, so module-level imports stay minimal: format
+# libraries, image_extractor and even pathlib are imported only where they are needed
 import sys
 import os
-from pathlib import Path
+
+from markdown_writer import MarkdownWriter
+from conversion_profile import current_profile, enable_profile
 
 # Ensure UTF-8 encoding on Windows
 if sys.platform == 'win32':
@@ -13,230 +17,923 @@ if sys.platform == 'win32':
         except:
             pass
 
-def simple_convert(file_path):
-    """Simple document converter with Windows compatibility"""
+class ConversionError(Exception):
+    """A file could not be converted; the message is the error reported for it"""
+
+def convert_text(file_path, document=None, pdf_workers=None, pdf_min_pages=None, writer=None, incremental=False,
+                 csv_max_rows=None, csv_sample_rows=None, cache_dir=None):
+    """Simple document converter with Windows compatibility
+
+    Markdown is produced through a MarkdownWriter. When writer is given the output is
+    streamed to it and an empty string is returned. A file that cannot be converted
+    raises ConversionError with the message to report. With incremental set, XLSX
+    sheets that are unchanged since the last conversion are replayed from the cache
+    folder (cache_dir, by default DocuGenius/.cache) instead of being read again.
+    csv_max_rows and csv_sample_rows limit CSV/TSV tables to their first rows or to a
+    random sample of rows (see csv_table.write_csv_table).
+    """
     try:
         # Handle Windows path issues
         file_path = os.path.normpath(file_path)
         if not os.path.exists(file_path):
-            return f"Error: File not found: {file_path}"
+            raise ConversionError(f"Error: File not found: {file_path}")
 
-        ext = Path(file_path).suffix.lower()
-        name = Path(file_path).name
+        ext = os.path.splitext(file_path)[1].lower()
+        name = os.path.basename(file_path)
+        output = writer if writer is not None else MarkdownWriter()
 
 # Remove debug output to keep conversion clean
         
         if ext in ['.txt', '.md', '.markdown']:
             try:
-                # Try UTF-8 first, then fallback to other encodings
-                encodings = ['utf-8', 'utf-8-sig', 'gbk', 'cp1252', 'latin-1']
-                for encoding in encodings:
-                    try:
-                        with open(file_path, 'r', encoding=encoding) as f:
-                            return f.read()
-                    except UnicodeDecodeError:
-                        continue
-                return f"Error: Could not decode {name} with any supported encoding"
+                from text_input import decode_text_file
+
+                # The file is read once: a byte order mark decides, otherwise UTF-8 is tried
+                # first and the other encodings are fallbacks. Plain text is passed through
+                # verbatim, without stripping
+                if decode_text_file(file_path, output.write_raw, ['utf-8', 'gbk', 'cp1252', 'latin-1']) is None:
+                    raise ConversionError(f"Error: Could not decode {name} with any supported encoding")
+                return output.getvalue()
+            except ConversionError:
+                raise
             except Exception as e:
-                return f"Error reading {name}: {str(e)}"
+                raise ConversionError(f"Error reading {name}: {str(e)}")
                 
+        elif ext in ['.csv', '.tsv']:
+            try:
+                from text_input import open_text_file
+                from csv_table import write_csv_table
+
+                stream, _ = open_text_file(file_path, ['utf-8', 'gbk', 'cp1252', 'latin-1'])
+                if stream is None:
+                    raise ConversionError(f"Error: Could not decode {name} with any supported encoding")
+                # Rows are written as they are parsed, so huge exports never sit in memory whole
+                with stream:
+                    if write_csv_table(output, stream, ext == '.tsv', csv_max_rows, csv_sample_rows) is None:
+                        output.write("Empty CSV file.")
+                return output.getvalue()
+            except ConversionError:
+                raise
+            except Exception as e:
+                raise ConversionError(f"Error reading {name}: {str(e)}")
+
         elif ext == '.docx':
             try:
                 import docx
-                doc = docx.Document(file_path)
-                content = ""
-
-                # Extract paragraphs
-                for para in doc.paragraphs:
-                    if para.text.strip():
-                        content += para.text.strip() + "\n\n"
-
-                # Extract tables
-                for table in doc.tables:
-                    for i, row in enumerate(table.rows):
-                        row_data = []
-                        for cell in row.cells:
-                            row_data.append(cell.text.strip())
-                        if i == 0:  # Header row
-                            content += "| " + " | ".join(row_data) + " |\n"
-                            content += "| " + " | ".join(["---"] * len(row_data)) + " |\n"
-                        else:
-                            content += "| " + " | ".join(row_data) + " |\n"
-                    content += "\n"
-
-                return content.strip()
+                from docx.oxml.ns import qn
+                doc = document if document is not None else docx.Document(file_path)
+
+                # Walk the body once so paragraphs and tables keep their document order
+                for element in doc.element.body.iterchildren():
+                    if element.tag == qn('w:p'):
+                        text = _docx_paragraph_text(element)
+                        if text.strip():
+                            output.write(text.strip() + "\n\n")
+                    elif element.tag == qn('w:tbl'):
+                        _write_docx_table(output, element)
+
+                return output.getvalue()
             except ImportError:
-                return "Error: python-docx library not installed. Run: pip install python-docx"
+                raise ConversionError("Error: python-docx library not installed. Run: pip install python-docx")
             except Exception as e:
-                return f"Error: {str(e)}"
+                raise ConversionError(f"Error: {str(e)}")
 
         elif ext == '.xlsx':
             try:
                 import openpyxl
-                workbook = openpyxl.load_workbook(file_path, data_only=True)
-                content = ""
-
-                for sheet_name in workbook.sheetnames:
-                    if len(workbook.sheetnames) > 1:
-                        content += f"## {sheet_name}\n\n"
-
-                    worksheet = workbook[sheet_name]
-                    rows = list(worksheet.iter_rows(values_only=True))
-
-                    if rows:
-                        # Filter out empty rows
-                        non_empty_rows = []
-                        for row in rows:
-                            if any(cell is not None and str(cell).strip() for cell in row):
-                                non_empty_rows.append(row)
-
-                        if non_empty_rows:
-                            # Find max columns
-                            max_cols = max(len([cell for cell in row if cell is not None]) for row in non_empty_rows)
-
-                            for i, row in enumerate(non_empty_rows):
-                                row_data = []
-                                for j in range(max_cols):
-                                    if j < len(row) and row[j] is not None:
-                                        row_data.append(str(row[j]).strip())
-                                    else:
-                                        row_data.append("")
-
-                                if i == 0:  # Header row
-                                    content += "| " + " | ".join(row_data) + " |\n"
-                                    content += "| " + " | ".join(["---"] * len(row_data)) + " |\n"
-                                else:
-                                    content += "| " + " | ".join(row_data) + " |\n"
-                            content += "\n"
-
-                return content.strip()
+                # Sheets unchanged since the last conversion are replayed from the segment manifest
+                manifest, fingerprints, segments = _read_xlsx_segments(file_path, cache_dir) if incremental else (None, None, None)
+
+                workbook = None
+                if manifest is None or None in segments:
+                    # Read-only mode streams rows from the sheet XML instead of building every cell object
+                    workbook = document if document is not None else openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+                    if manifest is None or len(workbook.sheetnames) != len(segments):
+                        manifest = None
+                        segments = [None] * len(workbook.sheetnames)
+
+                try:
+                    for index, segment in enumerate(segments):
+                        if segment is None:
+                            # Sheets are only rendered into a fragment when the manifest keeps it
+                            sheet_output = output if manifest is None else MarkdownWriter(strip=False)
+                            _write_xlsx_sheet(sheet_output, workbook, workbook.sheetnames[index], len(segments) > 1)
+                            if manifest is None:
+                                continue
+                            segment = {'markdown': sheet_output.getvalue()}
+
+                        output.write(segment['markdown'])
+                        manifest.record(fingerprints[index], segment)
+
+                    if manifest is not None:
+                        manifest.save()
+                finally:
+                    if workbook is not None and document is None:
+                        workbook.close()
+
+                return output.getvalue()
             except ImportError:
-                return "Error: openpyxl library not installed. Run: pip install openpyxl"
+                raise ConversionError("Error: openpyxl library not installed. Run: pip install openpyxl")
             except Exception as e:
-                return f"Error: {str(e)}"
+                raise ConversionError(f"Error: {str(e)}")
 
         elif ext == '.pptx':
             try:
                 import pptx
-                presentation = pptx.Presentation(file_path)
-                content = ""
+                presentation = document if document is not None else pptx.Presentation(file_path)
 
                 for i, slide in enumerate(presentation.slides, 1):
                     if len(presentation.slides) > 1:
-                        content += f"## Slide {i}\n\n"
+                        output.write(f"## Slide {i}\n\n")
 
                     for shape in slide.shapes:
                         if hasattr(shape, "text") and shape.text.strip():
-                            content += shape.text.strip() + "\n\n"
+                            output.write(shape.text.strip() + "\n\n")
 
                     if i < len(presentation.slides):
-                        content += "---\n\n"
+                        output.write("---\n\n")
 
-                return content.strip()
+                return output.getvalue()
             except ImportError:
-                return "Error: python-pptx library not installed. Run: pip install python-pptx"
+                raise ConversionError("Error: python-pptx library not installed. Run: pip install python-pptx")
             except Exception as e:
-                return f"Error: {str(e)}"
+                raise ConversionError(f"Error: {str(e)}")
 
         elif ext == '.pdf':
             try:
                 # Try pdfplumber first (better for Chinese text)
                 try:
                     import pdfplumber
-                    content = ""
-                    with pdfplumber.open(file_path) as pdf:
-                        for i, page in enumerate(pdf.pages):
-                            if len(pdf.pages) > 1:
-                                content += f"## Page {i+1}\n\n"
-
-                            text = page.extract_text()
-                            if text and text.strip():
-                                # Clean up the text
-                                lines = text.split('\n')
-                                cleaned_lines = []
-                                for line in lines:
-                                    line = line.strip()
-                                    if line:
-                                        cleaned_lines.append(line)
-                                content += '\n'.join(cleaned_lines) + "\n\n"
-
-                    return content.strip()
+                    page_texts = _extract_pdf_pages(file_path, pdf_workers, pdf_min_pages)
+                    for i, text in enumerate(page_texts):
+                        if len(page_texts) > 1:
+                            output.write(f"## Page {i+1}\n\n")
+
+                        if text:
+                            output.write(text + "\n\n")
+
+                    return output.getvalue()
                 except ImportError:
                     raise ImportError("pdfplumber library not installed. Run: pip install pdfplumber")
 
             except ImportError:
-                return "Error: pdfplumber library not installed. Run: pip install pdfplumber"
+                raise ConversionError("Error: pdfplumber library not installed. Run: pip install pdfplumber")
             except Exception as e:
-                return f"Error: {str(e)}"
+                raise ConversionError(f"Error: {str(e)}")
                 
         else:
-            return f"Unsupported file type: {ext}"
+            raise ConversionError(f"Unsupported file type: {ext}")
             
+    except ConversionError:
+        raise
     except Exception as e:
-        return f"Error: {str(e)}"
+        raise ConversionError(f"Error: {str(e)}")
+
+def simple_convert(file_path, *args, **options):
+    """Convert a file with convert_text, returning the error message as text on failure"""
+    try:
+        return convert_text(file_path, *args, **options)
+    except ConversionError as e:
+        return str(e)
+
+def _docx_paragraph_text(paragraph):
+    """Text of a w:p element as python-docx reports it"""
+    from docx.text.paragraph import Paragraph
+    return Paragraph(paragraph, None).text
+
+def _write_docx_table(writer, table):
+    """Write a w:tbl element as a markdown table, reading the cell grid directly
+
+    python-docx's row.cells resolves merged cells across the whole table for every
+    row, which is quadratic for wide merged tables. Here each w:tc is visited once:
+    a cell spanning several grid columns gives its text once followed by empty
+    cells, and vertically merged continuation cells are left empty.
+    """
+    from docx.oxml.ns import qn
+
+    for i, row in enumerate(table.iterchildren(qn('w:tr'))):
+        row_data = []
+        for cell in row.iterchildren(qn('w:tc')):
+            span = 1
+            continued = False
+            properties = cell.find(qn('w:tcPr'))
+            if properties is not None:
+                grid_span = properties.find(qn('w:gridSpan'))
+                if grid_span is not None:
+                    span = max(int(grid_span.get(qn('w:val'), 1)), 1)
+                v_merge = properties.find(qn('w:vMerge'))
+                continued = v_merge is not None and v_merge.get(qn('w:val'), 'continue') == 'continue'
+
+            if continued:
+                row_data.append("")
+            else:
+                row_data.append("\n".join(_docx_paragraph_text(p) for p in cell.iterchildren(qn('w:p'))).strip())
+            row_data.extend([""] * (span - 1))
+
+        if i == 0:  # Header row
+            writer.write_table_header(row_data)
+        else:
+            writer.write_table_row(row_data)
+    writer.write("\n")
 
-def convert_with_images(file_path, extract_images=True):
+def _read_xlsx_segments(file_path, cache_dir=None):
+    """Look up every sheet of a workbook in its text segment manifest
+
+    Returns (manifest, fingerprints, segments) with None in segments for each sheet that
+    has to be converted again, or (None, None, None) if the workbook cannot be fingerprinted.
+    """
+    try:
+        import zipfile
+        from conversion_cache import SegmentManifest, xlsx_sheet_fingerprints
+        with zipfile.ZipFile(file_path) as archive:
+            fingerprints = xlsx_sheet_fingerprints(archive)
+    except Exception:
+        # Incremental conversion is only an optimisation
+        return None, None, None
+
+    # Sheet headers are only written for workbooks with more than one sheet
+    settings = {'version': CONVERTER_VERSION, 'sheets': len(fingerprints)}
+    manifest = SegmentManifest.for_document(file_path, settings, 'text', cache_dir)
+    return manifest, fingerprints, [manifest.lookup(index, fingerprint) for index, fingerprint in enumerate(fingerprints)]
+
+def _write_xlsx_sheet(writer, workbook, sheet_name, with_header):
+    """Write one worksheet as a markdown table, headed by its name in multi-sheet workbooks"""
+    if with_header:
+        writer.write(f"## {sheet_name}\n\n")
+
+    worksheet = workbook[sheet_name]
+    if not hasattr(worksheet, 'iter_rows'):
+        return  # Chartsheets have no cells
+
+    if _write_xlsx_table(writer, worksheet.iter_rows(values_only=True)):
+        writer.write("\n")
+
+def _write_xlsx_table(writer, rows):
+    """Write worksheet rows as a markdown table in a single streaming pass
+
+    Empty rows are skipped as they arrive, so only one row is held at a time. The first
+    non-empty row fixes the column count; shorter rows are padded to it, longer rows keep
+    their extra cells. Returns True if any row was written.
+    """
+    width = None
+    for row in rows:
+        if not any(cell is not None and str(cell).strip() for cell in row):
+            continue
+
+        row_data = [str(cell).strip() if cell is not None else "" for cell in row]
+        if width is None:  # Header row
+            width = len(row_data)
+            writer.write_table_header(row_data)
+        else:
+            if len(row_data) < width:
+                row_data.extend([""] * (width - len(row_data)))
+            writer.write_table_row(row_data)
+
+    return width is not None
+
+# Bump when converter output changes; part of every conversion cache key
+CONVERTER_VERSION = '2.4.4'
+
+# Images narrower and shorter than this many pixels are not extracted (image_extractor's default)
+DEFAULT_MIN_IMAGE_SIZE = 50
+
+# Formats whose conversion results are worth caching (text files are cheaper to re-read)
+CACHED_EXTENSIONS = ['.pdf', '.docx', '.pptx', '.xlsx']
+
+# PDFs with fewer pages than this are extracted serially; process startup would dominate
+PDF_PARALLEL_MIN_PAGES = 40
+
+def _clean_pdf_text(text):
+    """Strip each line of a page's text and drop blank lines"""
+    if not text or not text.strip():
+        return ""
+    return '\n'.join(line.strip() for line in text.split('\n') if line.strip())
+
+def _extract_pdf_page_range(file_path, start, end):
+    """Extract cleaned text for pages [start, end); runs in a worker process that opens the PDF by path"""
+    import pdfplumber
+    with pdfplumber.open(file_path) as pdf:
+        return [_clean_pdf_text(page.extract_text()) for page in pdf.pages[start:end]]
+
+def _extract_pdf_pages(file_path, workers=None, min_pages=None):
+    """Extract cleaned text for every page of a PDF, in page order
+
+    Page layout analysis is independent per page, so large PDFs are split into
+    contiguous page ranges that are processed in parallel worker processes and
+    merged back in order. PDFs below min_pages, or workers=1, stay serial.
+    """
+    import pdfplumber
+
+    min_pages = PDF_PARALLEL_MIN_PAGES if min_pages is None else min_pages
+    with pdfplumber.open(file_path) as pdf:
+        page_count = len(pdf.pages)
+        workers = min(workers or os.cpu_count() or 1, page_count)
+        if workers <= 1 or page_count < min_pages:
+            return [_clean_pdf_text(page.extract_text()) for page in pdf.pages]
+
+    chunk_size = -(-page_count // workers)  # Ceiling division
+    ranges = [(start, min(start + chunk_size, page_count)) for start in range(0, page_count, chunk_size)]
+    try:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+            chunks = executor.map(_extract_pdf_page_range, [file_path] * len(ranges),
+                                  [start for start, _ in ranges], [end for _, end in ranges])
+            return [text for chunk in chunks for text in chunk]
+    except (OSError, RuntimeError, ImportError):
+        # Process pools can be unavailable (sandboxes, frozen apps); fall back to serial
+        return _extract_pdf_page_range(file_path, 0, page_count)
+
+def convert_with_images(file_path, extract_images=True, **options):
     """Convert document and optionally extract images"""
+    return convert_document(file_path, extract_images, **options)['markdown_content']
+
+def _open_document(file_path, ext):
+    """Parse a DOCX/PPTX/XLSX file once so text and image extraction can share the object
+
+    Returns None if the document cannot be opened here; convert_text then reports the
+    problem with its usual error message.
+    """
     try:
-        # First, convert the document to markdown
-        markdown_content = simple_convert(file_path)
+        if ext == '.docx':
+            import docx
+            return docx.Document(file_path)
+        elif ext == '.pptx':
+            import pptx
+            return pptx.Presentation(file_path)
+        elif ext == '.xlsx':
+            import openpyxl
+            return openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    except Exception:
+        pass
+    return None
+
+def convert_document(file_path, extract_images=True, use_cache=True, **options):
+    """Convert document and optionally extract images, returning markdown and image metadata
+
+    Office and PDF results are cached in the cache_dir option's folder (by default
+    DocuGenius/.cache next to the file) keyed by the file's content hash, so unchanged
+    files are returned without opening them; failed conversions are not cached. Extra
+    keyword options (pdf_workers, pdf_min_pages) are passed through to convert_text;
+    docx_engine and min_image_size go to the image extractor. The result is shaped as
+    _convert_document_uncached describes, with 'cached' set on a cache hit.
+    """
+    if not use_cache or os.path.splitext(file_path)[1].lower() not in CACHED_EXTENSIONS:
+        return _convert_document_uncached(file_path, extract_images, **options)
+
+    profile = current_profile()
+    try:
+        from conversion_cache import ConversionCache, calculate_file_hash
+
+        with profile.stage('cache_lookup'):
+            cache = ConversionCache.for_document(file_path, CONVERTER_VERSION, options.get('cache_dir'))
+            # Image references depend on the document name, so it is only part of the key
+            # when images are extracted; text-only results are shared by renamed copies
+            key_options = {'extract_images': extract_images}
+            if extract_images:
+                key_options['document_name'] = os.path.splitext(os.path.basename(file_path))[0]
+                # Which images are kept changes both the markdown and the files written
+                min_image_size = options.get('min_image_size')
+                key_options['min_image_size'] = DEFAULT_MIN_IMAGE_SIZE if min_image_size is None else min_image_size
+            cache_key = cache.make_key(calculate_file_hash(file_path), key_options)
+            cached = cache.get(cache_key)
+    except (ImportError, OSError):
+        return _convert_document_uncached(file_path, extract_images, **options)
+
+    if cached is not None:
+        return {'success': True, 'markdown_content': cached['markdown_content'], 'images': cached.get('images', []),
+                'cached': True}
+
+    # A cache miss still reuses the unchanged slides or sheets of the previous conversion
+    result = _convert_document_uncached(file_path, extract_images, incremental=True, **options)
+    if result['success']:
+        with profile.stage('cache_write'):
+            cache.put(cache_key, result)
+    return result
+
+def _convert_document_uncached(file_path, extract_images=True, docx_engine=None, min_image_size=None, **options):
+    """Convert document and optionally extract images without consulting the cache
+
+    Returns {'success': True, 'markdown_content': ..., 'images': [...]}, or for a file
+    that cannot be converted {'success': False, 'error': ...} with the error repeated
+    as markdown_content.
+
+    docx_engine selects the DOCX content engine of the image extractor ('auto', 'zip'
+    or 'python-docx'); the default 'auto' streams the raw package. Images whose width
+    and height are both below min_image_size pixels (default DEFAULT_MIN_IMAGE_SIZE)
+    are skipped.
+    """
+    images = []
+    profile = current_profile()
+    try:
+        ext = os.path.splitext(file_path)[1].lower()
+
+        # Without image extraction the text converter is all we need
+        if not extract_images or ext not in ['.pdf', '.docx', '.pptx', '.xlsx']:
+            with profile.stage('text'):
+                return {'success': True, 'markdown_content': convert_text(file_path, **options), 'images': images}
+
+        # Parse the document a single time; the image-aware extractor and the
+        # text-only fallback below both work on this object. The DOCX zip engine
+        # reads the package itself, and decks and workbooks are only parsed when slides
+        # or sheets changed since the last conversion, so those are only parsed here
+        # if a fallback needs them
+        docx_engine = docx_engine or 'auto'
+        if min_image_size is None:
+            min_image_size = DEFAULT_MIN_IMAGE_SIZE
+        document = None
+        if ext == '.docx' and docx_engine == 'python-docx':
+            with profile.stage('open'):
+                document = _open_document(file_path, ext)
+            if document is None:
+                with profile.stage('text'):
+                    return {'success': True, 'markdown_content': convert_text(file_path, **options), 'images': images}
 
-        # If image extraction is enabled and we have a supported format
-        if extract_images and Path(file_path).suffix.lower() in ['.pdf', '.docx', '.pptx', '.xlsx']:
+        try:
             try:
                 # Import and use the intelligent image extractor
-                from image_extractor import extract_document_with_images
-
-                # Extract complete document content with images in original positions
-                extraction_result = extract_document_with_images(file_path)
-
-                if extraction_result['success']:
-                    if extraction_result.get('markdown_content'):
-                        # Replace the markdown content with the intelligent version
-                        # that has images in their original positions
-                        markdown_content = extraction_result['markdown_content']
-
-                        # Add metadata comment
-                        if extraction_result.get('images_count', 0) > 0:
-                            markdown_content += f"\n\n<!-- Images extracted: {extraction_result['images_count']} images saved to {extraction_result.get('output_dir', 'DocuGenius/images')} -->\n"
-                    else:
-                        # Fallback to traditional mode if no content was extracted
-                        from image_extractor import extract_images_from_document
-                        fallback_result = extract_images_from_document(file_path)
-                        if fallback_result['success'] and fallback_result['images']:
-                            markdown_content += fallback_result.get('markdown_references', '')
-                            markdown_content += f"\n\n<!-- Images extracted: {fallback_result['images_count']} images saved to {fallback_result['output_dir']} -->\n"
-
+                from image_extractor import extract_document_with_images, extract_images_from_document
             except ImportError:
                 # Image extractor not available, continue without image extraction
-                pass
+                with profile.stage('text'):
+                    return {'success': True, 'markdown_content': convert_text(file_path, document, **options), 'images': images}
+
+            markdown_content = None
+            try:
+                # Extract complete document content with images in original positions
+                with profile.stage('content'):
+                    extraction_result = extract_document_with_images(file_path, min_image_size=min_image_size, document=document,
+                                                                     docx_engine=docx_engine,
+                                                                     incremental=options.get('incremental', False),
+                                                                     cache_dir=options.get('cache_dir'))
+
+                if extraction_result['success'] and extraction_result.get('markdown_content'):
+                    # Use the intelligent version that has images in their original positions
+                    markdown_content = extraction_result['markdown_content']
+                    images = extraction_result.get('images', [])
+
+                    # Add metadata comment
+                    if extraction_result.get('images_count', 0) > 0:
+                        markdown_content += f"\n\n<!-- Images extracted: {extraction_result['images_count']} images saved to {extraction_result.get('output_dir', 'DocuGenius/images')} -->\n"
+                else:
+                    # Fallback to text-only mode on the already-parsed document,
+                    # with the images appended in traditional mode
+                    if document is None:
+                        with profile.stage('open'):
+                            document = _open_document(file_path, ext)
+                    with profile.stage('text'):
+                        markdown_content = convert_text(file_path, document, **options)
+                    with profile.stage('images'):
+                        fallback_result = extract_images_from_document(file_path, min_image_size=min_image_size,
+                                                                       document=document)
+                    if fallback_result['success'] and fallback_result['images']:
+                        images = fallback_result['images']
+                        markdown_content += fallback_result.get('markdown_references', '')
+                        markdown_content += f"\n\n<!-- Images extracted: {fallback_result['images_count']} images saved to {fallback_result['output_dir']} -->\n"
+            except ConversionError:
+                raise
             except Exception as e:
                 # Image extraction failed, add note to markdown
+                if markdown_content is None:
+                    with profile.stage('text'):
+                        markdown_content = convert_text(file_path, document, **options)
                 markdown_content += f"\n\n<!-- Note: Image extraction failed: {str(e)} -->\n"
 
-        return markdown_content
+            return {'success': True, 'markdown_content': markdown_content, 'images': images}
+        finally:
+            if hasattr(document, 'close'):
+                # Read-only workbooks keep the package open until closed
+                document.close()
 
+    except ConversionError as e:
+        return _failed_result(str(e))
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _failed_result(f"Error: {str(e)}")
+
+def _failed_result(error):
+    """Result of a conversion that failed; markdown_content carries the error for callers that print it"""
+    return {'success': False, 'error': error, 'markdown_content': error, 'images': []}
+
+# Third-party modules each format needs (beyond the standard library); check_startup_time.py
+# also uses this to catch a conversion importing the library of another format
+FORMAT_MODULES = {
+    '.docx': ['docx'],
+    '.pptx': ['pptx'],
+    '.xlsx': ['openpyxl'],
+    '.pdf': ['pdfplumber'],
+}
+
+def _profile_imports(file_path, extract_images):
+    """Import the modules converting file_path will need as a profile stage of its own
+
+    Without this the import cost would be hidden in whichever stage first needs a module.
+    """
+    import importlib
+
+    ext = os.path.splitext(file_path)[1].lower()
+    modules = list(FORMAT_MODULES.get(ext, []))
+    if extract_images and modules:
+        modules.append('image_extractor')
+
+    with current_profile().stage('import'):
+        for module in modules:
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                pass  # The conversion reports missing libraries itself
+
+# Converter options accepted in worker requests and on the command line (flag -> (option, type))
+CLI_OPTIONS = {
+    '--pdf-workers': ('pdf_workers', int),
+    '--pdf-min-pages': ('pdf_min_pages', int),
+    '--csv-max-rows': ('csv_max_rows', int),
+    '--csv-sample-rows': ('csv_sample_rows', int),
+    '--docx-engine': ('docx_engine', str),
+    '--min-image-size': ('min_image_size', int),
+    '--cache-dir': ('cache_dir', str),
+}
+# Flags without a value (flag -> (option, value))
+CLI_FLAGS = {
+    '--no-cache': ('use_cache', False),
+}
+REQUEST_OPTIONS = [option for option, _ in list(CLI_OPTIONS.values()) + list(CLI_FLAGS.values())]
+
+def _parse_options(args):
+    """Split command line arguments into positional arguments and converter options
+
+    Raises ValueError for an option value the converter does not accept.
+    """
+    positional = []
+    options = {}
+    i = 0
+    while i < len(args):
+        if args[i] in CLI_OPTIONS and i + 1 < len(args):
+            option, option_type = CLI_OPTIONS[args[i]]
+            options[option] = option_type(args[i + 1])
+            i += 2
+        elif args[i] in CLI_FLAGS:
+            option, value = CLI_FLAGS[args[i]]
+            options[option] = value
+            i += 1
+        else:
+            positional.append(args[i])
+            i += 1
+    _check_options(options)
+    return positional, options
+
+def _check_options(options):
+    """Raise ValueError if an option has a value the converter does not accept"""
+    docx_engine = options.get('docx_engine')
+    if docx_engine is not None:
+        from image_extractor import DOCX_ENGINES
+        if docx_engine not in DOCX_ENGINES:
+            raise ValueError(f"Unknown DOCX engine: {docx_engine} (expected one of {', '.join(DOCX_ENGINES)})")
+
+def convert_to_file(file_path, output_path, extract_images=True, use_cache=True, docx_engine=None, min_image_size=None,
+                    **options):
+    """Convert a document straight into output_path and return a small status dictionary
+
+    The markdown is written to a temporary file beside output_path and renamed over it,
+    so a partially written document is never visible at the destination. Conversions
+    that neither extract images nor are cached (text, CSV, ...) are streamed into the
+    file as they are produced.
+    Plain text and markdown that is already valid UTF-8 is copied byte for byte, the
+    way the extension copies text files, without being decoded.
+    """
+    output_path = os.path.abspath(output_path)
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    ext = os.path.splitext(file_path)[1].lower()
+    images = []
+    cached = False
+    profile = current_profile()
+
+    try:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        passthrough = False
+        if ext in ['.txt', '.md', '.markdown'] and os.path.isfile(file_path):
+            from text_input import is_utf8_file, copy_file
+            with profile.stage('copy'):
+                passthrough = is_utf8_file(file_path)
+                if passthrough:
+                    copy_file(file_path, temp_path)
+
+        if passthrough:
+            error = None
+        else:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                if ext not in CACHED_EXTENSIONS or not (extract_images or use_cache):
+                    # Nothing to cache and no images, so nothing needs the whole document in memory
+                    with profile.stage('text'):
+                        try:
+                            convert_text(file_path, writer=MarkdownWriter(f), **options)
+                            error = None
+                        except ConversionError as e:
+                            error = str(e)
+                else:
+                    result = convert_document(file_path, extract_images, use_cache, docx_engine=docx_engine,
+                                              min_image_size=min_image_size, **options)
+                    error = result.get('error')
+                    if result['success']:
+                        with profile.stage('write'):
+                            f.write(result['markdown_content'])
+                        images = result['images']
+                        cached = result.get('cached', False)
+                # Match the trailing newline print() adds on stdout
+                f.write("\n")
+
+        if error is None:
+            os.replace(temp_path, output_path)
+    except Exception as e:
+        error = f"Error: {str(e)}"
+
+    if error is not None:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return {'success': False, 'file_path': file_path, 'error': error}
+
+    output_bytes = os.path.getsize(output_path)
+    profile.count('output_bytes', output_bytes)
+    return {'success': True, 'file_path': file_path, 'output_path': output_path,
+            'bytes': output_bytes, 'images': len(images), 'cached': cached}
+
+def handle_request(request):
+    """Handle a single worker request and return the response dictionary
+
+    Supported request types:
+        simple_convert      - {"type": "simple_convert", "file_path": ...}
+        convert_with_images - {"type": "convert_with_images", "file_path": ..., "extract_images": true}
+        ping                - health check, answered with {"type": "pong"}
+
+    Any of REQUEST_OPTIONS present in the request are checked and passed on to the converter.
+    """
+    request_id = request.get('id')
+    request_type = request.get('type', 'convert_with_images')
+
+    if request_type == 'ping':
+        return {'id': request_id, 'success': True, 'type': 'pong'}
+
+    file_path = request.get('file_path')
+    if not file_path:
+        return {'id': request_id, 'success': False, 'error': 'Missing file_path'}
+
+    options = {key: request[key] for key in REQUEST_OPTIONS if request.get(key) is not None}
+    try:
+        _check_options(options)
+    except ValueError as e:
+        return {'id': request_id, 'success': False, 'file_path': file_path, 'error': f'Invalid request: {str(e)}'}
+
+    if request_type == 'simple_convert':
+        options.pop('use_cache', None)
+        options.pop('docx_engine', None)
+        options.pop('min_image_size', None)
+        try:
+            result = {'success': True, 'markdown_content': convert_text(file_path, **options), 'images': []}
+        except ConversionError as e:
+            result = _failed_result(str(e))
+    elif request_type == 'convert_with_images':
+        result = convert_document(file_path, request.get('extract_images', True), **options)
+    else:
+        return {'id': request_id, 'success': False, 'error': f'Unknown request type: {request_type}'}
+
+    if not result['success']:
+        return {'id': request_id, 'success': False, 'file_path': file_path, 'error': result['error']}
+
+    return {'id': request_id, 'success': True, 'file_path': file_path, 'markdown': result['markdown_content'],
+            'images': result['images'], 'cached': result.get('cached', False)}
+
+def run_worker(input_stream=None, output_stream=None):
+    """Serve newline-delimited JSON requests until stdin closes or a shutdown request arrives
+
+    Each request line produces exactly one JSON response line. The interpreter and the
+    document libraries stay loaded between requests, so only the first conversion of
+    each format pays the import cost.
+    """
+    import json
+    import contextlib
+
+    input_stream = input_stream or sys.stdin
+    output_stream = output_stream or sys.stdout
+
+    if hasattr(input_stream, 'reconfigure'):
+        try:
+            input_stream.reconfigure(encoding='utf-8')
+        except Exception:
+            pass
+
+    def send(response):
+        output_stream.write(json.dumps(response, ensure_ascii=False) + "\n")
+        output_stream.flush()
+
+    send({'id': None, 'success': True, 'type': 'ready', 'pid': os.getpid()})
+
+    for line in input_stream:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError('request must be a JSON object')
+        except ValueError as e:
+            send({'id': None, 'success': False, 'error': f'Invalid request: {str(e)}'})
+            continue
+
+        if request.get('type') == 'shutdown':
+            send({'id': request.get('id'), 'success': True, 'type': 'shutdown'})
+            break
+
+        try:
+            # Keep stray prints from the converters out of the response stream
+            with contextlib.redirect_stdout(sys.stderr):
+                response = handle_request(request)
+        except Exception as e:
+            response = {'id': request.get('id'), 'success': False, 'error': f'Error: {str(e)}'}
+
+        send(response)
+
+def _convert_for_batch(file_path, extract_images=True, options=None):
+    """Convert one file of a batch and report markdown, images, error and timing"""
+    import time
+    import contextlib
+
+    start = time.perf_counter()
+    try:
+        # Keep stray prints from the converters out of the result stream
+        with contextlib.redirect_stdout(sys.stderr):
+            result = convert_document(file_path, extract_images, **(options or {}))
+    except Exception as e:
+        result = _failed_result(f"Error: {str(e)}")
+
+    elapsed = round(time.perf_counter() - start, 3)
+    if not result['success']:
+        return {'file_path': file_path, 'success': False, 'error': result['error'], 'elapsed': elapsed}
+
+    return {
+        'file_path': file_path,
+        'success': True,
+        'markdown': result['markdown_content'],
+        'images': result['images'],
+        'cached': result.get('cached', False),
+        'elapsed': elapsed
+    }
+
+def _read_manifest(manifest_path):
+    """Read a batch manifest: one path per line, blank lines and # comments ignored"""
+    paths = []
+    with open(manifest_path, 'r', encoding='utf-8-sig') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                paths.append(line)
+    return paths
+
+def run_batch(file_paths, extract_images=True, jobs=None, output_stream=None, options=None):
+    """Convert many files across a process pool, streaming one JSON line per finished file
+
+    Results are written in completion order as soon as each file is done, followed by a
+    final summary line. With jobs=1 the files are converted in this process instead.
+    Files are already converted in parallel, so PDFs are extracted serially unless
+    pdf_workers is given in options. Returns the number of failed files.
+    """
+    import json
+    import time
+
+    output_stream = output_stream or sys.stdout
+    jobs = jobs or os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(file_paths) or 1))
+    options = dict(options or {})
+    options.setdefault('pdf_workers', 1)
+    start = time.perf_counter()
+    failed = 0
+
+    def send(response):
+        output_stream.write(json.dumps(response, ensure_ascii=False) + "\n")
+        output_stream.flush()
+
+    if jobs == 1:
+        for file_path in file_paths:
+            result = _convert_for_batch(file_path, extract_images, options)
+            failed += 0 if result['success'] else 1
+            send(result)
+    else:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {executor.submit(_convert_for_batch, file_path, extract_images, options): file_path
+                       for file_path in file_paths}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker process itself died (e.g. out of memory)
+                    result = {'file_path': futures[future], 'success': False, 'error': f'Error: {str(e)}'}
+                failed += 0 if result['success'] else 1
+                send(result)
+
+    send({
+        'type': 'summary',
+        'total': len(file_paths),
+        'succeeded': len(file_paths) - failed,
+        'failed': failed,
+        'jobs': jobs,
+        'elapsed': round(time.perf_counter() - start, 3)
+    })
+    return failed
+
+def _parse_batch_args(args):
+    """Parse --batch arguments: [--jobs N] [--manifest FILE] [--no-images] [converter options] [paths...]"""
+    args, options = _parse_options(args)
+    file_paths = []
+    extract_images = True
+    jobs = None
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg in ('--jobs', '-j') and i + 1 < len(args):
+            jobs = int(args[i + 1])
+            i += 1
+        elif arg == '--manifest' and i + 1 < len(args):
+            file_paths.extend(_read_manifest(args[i + 1]))
+            i += 1
+        elif arg == '--no-images':
+            extract_images = False
+        else:
+            file_paths.append(arg)
+        i += 1
+    return file_paths, extract_images, jobs, options
 
 if __name__ == '__main__':
-    if len(sys.argv) > 1:
+    if len(sys.argv) > 1 and sys.argv[1] == '--worker':
+        # Long-lived mode: JSON-lines requests on stdin, responses on stdout
+        run_worker()
+    elif len(sys.argv) > 1 and sys.argv[1] == '--batch':
+        # Multi-file mode: fan the files out across a process pool
+        try:
+            file_paths, extract_images, jobs, options = _parse_batch_args(sys.argv[2:])
+        except ValueError as e:
+            print(f"Error: {str(e)}")
+            sys.exit(1)
+        if not file_paths:
+            print("Error: No files given for batch conversion")
+            sys.exit(1)
+        sys.exit(1 if run_batch(file_paths, extract_images, jobs, options=options) else 0)
+    elif len(sys.argv) > 1:
         try:
+            argv = sys.argv[1:]
+            output_path = None
+            if '--output' in argv:
+                index = argv.index('--output')
+                output_path = argv[index + 1] if index + 1 < len(argv) else None
+                del argv[index:index + 2]
+            profiling = '--profile' in argv
+            if profiling:
+                argv.remove('--profile')
+            args, options = _parse_options(argv)
+
             # Default to extract images unless explicitly disabled
             extract_images = True
-            if len(sys.argv) > 2 and sys.argv[2].lower() in ['false', 'no', '0']:
+            if len(args) > 1 and args[1].lower() in ['false', 'no', '0']:
                 extract_images = False
 
-            result = convert_with_images(sys.argv[1], extract_images)
-            if result:
-                print(result)
-            else:
-                print("Error: Conversion failed")
+            if profiling:
+                # Per-stage figures go to stderr as one JSON line when the conversion ends
+                enable_profile()
+                _profile_imports(args[0], extract_images)
+
+            if output_path:
+                # Write the markdown to the target file and report only a JSON status
+                import json
+                status = convert_to_file(args[0], output_path, extract_images, **options)
+                current_profile().emit(file_path=args[0], extract_images=extract_images, success=status['success'])
+                print(json.dumps(status, ensure_ascii=False))
+                sys.exit(0 if status['success'] else 1)
+
+            result = convert_document(args[0], extract_images, **options)
+            current_profile().emit(file_path=args[0], extract_images=extract_images, success=result['success'])
+            # A failed conversion prints its error message in place of the markdown
+            print(result['markdown_content'])
+            if not result['success']:
                 sys.exit(1)
         except Exception as e:
             print(f"Error: {str(e)}")
             sys.exit(1)
     else:
-        print("Usage: converter.py file_path [extract_images=true]")
+        print("Usage: converter.py file_path [extract_images=true] [options]")
+        print("       converter.py --worker")
+        print("       converter.py --batch [--jobs N] [--manifest file] [--no-images] [file_path ...]")
+        print("Options: --pdf-workers N (default: CPU count), --pdf-min-pages N (default: %d)" % PDF_PARALLEL_MIN_PAGES)
+        print("         --no-cache: always convert, ignoring the cache")
+        print("         --cache-dir path: keep the conversion cache in path (default: DocuGenius/.cache beside the file)")
+        print("         --csv-max-rows N: convert only the first N rows of a CSV/TSV file")
+        print("         --csv-sample-rows N: convert N rows sampled evenly from the whole CSV/TSV file")
+        print("         --docx-engine auto|zip|python-docx: DOCX content engine for image extraction (default: auto)")
+        print("         --min-image-size N: skip images narrower and shorter than N pixels (default: 50, 0 keeps all)")
+        print("         --output path: write the markdown to path (atomically) and print a JSON status")
+        print("         --profile: report per-stage time and memory as a JSON line on stderr")
         print("  extract_images: true/false to enable/disable image extraction (default: true)")
+        print("  --worker: serve JSON-lines conversion requests on stdin until it is closed")
+        print("  --batch: convert many files in parallel, one JSON line per finished file")
         sys.exit(1)
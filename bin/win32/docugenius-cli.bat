@@ -2,9 +2,9 @@
 REM DocuGenius CLI for Windows
 REM This batch file provides document conversion functionality
 
-REM Set UTF-8 code page and enable delayed expansion
+REM Set UTF-8 code page; delayed expansion stays off so a "!" in a path or option is kept
 chcp 65001 >nul 2>&1
-setlocal enabledelayedexpansion
+setlocal disabledelayedexpansion
 
 REM Set environment variables for better Unicode support
 set PYTHONIOENCODING=utf-8
@@ -92,11 +92,27 @@ if not exist "%SCRIPT_DIR%converter.py" (
     exit /b 1
 )
 
+REM Collect any options after the first two arguments (e.g. --output path)
+set EXTRA_ARGS=
+set PROFILE=
+:collect_args
+if "%~3"=="" goto args_collected
+set EXTRA_ARGS=%EXTRA_ARGS% %3
+if /i "%~3"=="--profile" set PROFILE=1
+shift /3
+goto collect_args
+:args_collected
+
 REM Silent conversion with timeout and error handling
 
 REM Run the Python converter script with timeout
+REM With --profile stderr is kept, since it carries the profile line
 timeout /t 30 /nobreak >nul & (
-    python "%SCRIPT_DIR%converter.py" "%~1" "%~2" 2>nul
+    if defined PROFILE (
+        python "%SCRIPT_DIR%converter.py" "%~1" "%~2" %EXTRA_ARGS%
+    ) else (
+        python "%SCRIPT_DIR%converter.py" "%~1" "%~2" %EXTRA_ARGS% 2>nul
+    )
     if errorlevel 1 (
         echo Error: Conversion failed for "%~1"
         exit /b 1
@@ -8,9 +8,37 @@ import sys
 import os
 import json
 import hashlib
+import posixpath
+import struct
+import zipfile
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 
+from image_store import ImageStore, FilenameAllocator, ImageWriteQueue
+from conversion_profile import current_profile
+from conversion_cache import SegmentManifest, xlsx_sheet_fingerprints
+
+# XML namespaces used when reading OOXML package parts directly
+SPREADSHEETML_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+DRAWINGML_NS = 'http://schemas.openxmlformats.org/drawingml/2006/main'
+RELATIONSHIPS_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+WORDPROCESSINGML_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+CONTENT_TYPES_NS = 'http://schemas.openxmlformats.org/package/2006/content-types'
+PRESENTATIONML_NS = 'http://schemas.openxmlformats.org/presentationml/2006/main'
+
+# Bump when the markdown rendered for a slide or sheet changes; part of the segment manifest settings
+SEGMENT_VERSION = '2'
+
+# DOCX content engines: 'zip' streams the raw package, 'python-docx' builds the object
+# model, 'auto' tries the zip engine first and falls back to python-docx
+DOCX_ENGINES = ['auto', 'zip', 'python-docx']
+
+# Word stores these built-in style names in lower case; python-docx reports the UI spelling
+DOCX_BUILTIN_STYLE_NAMES = dict(
+    [('caption', 'Caption'), ('footer', 'Footer'), ('header', 'Header')] +
+    [(f'heading {level}', f'Heading {level}') for level in range(1, 10)]
+)
+
 # Ensure UTF-8 encoding on Windows
 if sys.platform == 'win32':
     import codecs
@@ -21,10 +49,177 @@ if sys.platform == 'win32':
         except:
             pass
 
+# JPEG start-of-frame markers, which carry the image dimensions
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+def probe_image_size(image_data: bytes) -> Optional[Tuple[int, int]]:
+    """Read (width, height) from a PNG, JPEG, GIF or BMP header without decoding the image
+
+    Returns None for other formats (EMF, WMF, TIFF, ...) or truncated headers.
+    """
+    try:
+        if image_data[:8] == b'\x89PNG\r\n\x1a\n' and image_data[12:16] == b'IHDR':
+            return struct.unpack('>II', image_data[16:24])
+
+        if image_data[:6] in (b'GIF87a', b'GIF89a'):
+            return struct.unpack('<HH', image_data[6:10])
+
+        if image_data[:2] == b'BM':
+            if struct.unpack('<I', image_data[14:18])[0] == 12:  # OS/2 BITMAPCOREHEADER
+                return struct.unpack('<HH', image_data[18:22])
+            width, height = struct.unpack('<ii', image_data[18:26])
+            return abs(width), abs(height)  # Negative height means a top-down bitmap
+
+        if image_data[:2] == b'\xff\xd8':
+            # Walk the marker segments, skipping their payloads, until a start-of-frame
+            offset = 2
+            while offset + 9 <= len(image_data):
+                if image_data[offset] != 0xFF:
+                    return None
+                marker = image_data[offset + 1]
+                if marker == 0xFF:  # Fill byte
+                    offset += 1
+                elif marker in JPEG_SOF_MARKERS:
+                    height, width = struct.unpack('>HH', image_data[offset + 5:offset + 9])
+                    return width, height
+                elif marker == 0x01 or 0xD0 <= marker <= 0xD8:  # Markers without a length
+                    offset += 2
+                else:
+                    offset += 2 + struct.unpack('>H', image_data[offset + 2:offset + 4])[0]
+    except struct.error:
+        pass
+
+    return None
+
+def _read_package_rels(archive, part_name: str) -> Dict[str, Tuple[str, str]]:
+    """Read the internal relationships of an OOXML package part as {rId: (type, target part)}"""
+    import xml.etree.ElementTree as ET
+
+    # Relationships of a part live in _rels/<name>.rels next to it
+    directory, name = posixpath.split(part_name)
+    try:
+        root = ET.fromstring(archive.read(posixpath.join(directory, '_rels', name + '.rels')))
+    except KeyError:
+        return {}
+
+    rels = {}
+    for rel in root:
+        target = rel.get('Target', '')
+        if rel.get('TargetMode') == 'External':
+            continue
+        if target.startswith('/'):
+            target_part = target.lstrip('/')
+        else:
+            target_part = posixpath.normpath(posixpath.join(directory, target))
+        rels[rel.get('Id')] = (rel.get('Type', ''), target_part)
+    return rels
+
+def _read_pptx_slide_fingerprints(archive) -> List[str]:
+    """Fingerprint every slide of a PPTX package, in presentation order
+
+    A fingerprint covers the slide XML, its relationships, and the size and CRC of every
+    part the slide points at, so replacing an image under the same name changes it too.
+    """
+    import xml.etree.ElementTree as ET
+
+    presentation_part = next((target for rel_type, target in _read_package_rels(archive, '').values()
+                              if rel_type.endswith('/officeDocument')), 'ppt/presentation.xml')
+    presentation_rels = _read_package_rels(archive, presentation_part)
+    presentation = ET.fromstring(archive.read(presentation_part))
+
+    fingerprints = []
+    for slide_id in presentation.iter(f'{{{PRESENTATIONML_NS}}}sldId'):
+        slide_part = presentation_rels[slide_id.get(f'{{{RELATIONSHIPS_NS}}}id')][1]
+        fingerprint = hashlib.sha256(archive.read(slide_part))
+
+        directory, name = posixpath.split(slide_part)
+        try:
+            fingerprint.update(archive.read(posixpath.join(directory, '_rels', name + '.rels')))
+        except KeyError:
+            pass
+
+        for _, target_part in sorted(_read_package_rels(archive, slide_part).values()):
+            try:
+                info = archive.getinfo(target_part)
+            except KeyError:
+                continue
+            fingerprint.update(f"{target_part}:{info.CRC}:{info.file_size}".encode('utf-8'))
+
+        fingerprints.append(fingerprint.hexdigest())
+    return fingerprints
+
+def _read_content_types(archive):
+    """Return a function mapping a package part name to its content type"""
+    import xml.etree.ElementTree as ET
+
+    defaults = {}
+    overrides = {}
+    root = ET.fromstring(archive.read('[Content_Types].xml'))
+    for entry in root.iter(f'{{{CONTENT_TYPES_NS}}}Default'):
+        defaults[entry.get('Extension', '').lower()] = entry.get('ContentType', '')
+    for entry in root.iter(f'{{{CONTENT_TYPES_NS}}}Override'):
+        overrides[entry.get('PartName', '').lstrip('/')] = entry.get('ContentType', '')
+
+    def content_type(part_name):
+        if part_name in overrides:
+            return overrides[part_name]
+        return defaults.get(posixpath.splitext(part_name)[1].lstrip('.').lower(), '')
+
+    return content_type
+
+def _read_docx_paragraph_styles(archive, styles_part: Optional[str]) -> Tuple[Dict[str, str], str]:
+    """Read {style id: UI name} for the paragraph styles, plus the default paragraph style name"""
+    import xml.etree.ElementTree as ET
+
+    w = f'{{{WORDPROCESSINGML_NS}}}'
+    names = {}
+    default_name = ''
+    if not styles_part:
+        return names, default_name
+
+    for style in ET.fromstring(archive.read(styles_part)).iter(f'{w}style'):
+        if style.get(f'{w}type') != 'paragraph':
+            continue
+        name_element = style.find(f'{w}name')
+        name = name_element.get(f'{w}val', '') if name_element is not None else ''
+        name = DOCX_BUILTIN_STYLE_NAMES.get(name, name)
+        names[style.get(f'{w}styleId')] = name
+        if style.get(f'{w}default') in ('1', 'true', 'on'):
+            default_name = name  # The last default wins, as in Word
+    return names, default_name
+
+def _docx_paragraph_text(paragraph) -> str:
+    """Text of a w:p element, from its runs and hyperlinks, the way python-docx reads it"""
+    w = f'{{{WORDPROCESSINGML_NS}}}'
+    runs = []
+    for child in paragraph:
+        if child.tag == f'{w}r':
+            runs.append(child)
+        elif child.tag == f'{w}hyperlink':
+            runs.extend(child.findall(f'{w}r'))
+
+    text = []
+    for run in runs:
+        for element in run:
+            tag = element.tag
+            if tag == f'{w}t':
+                text.append(element.text or '')
+            elif tag == f'{w}tab' or tag == f'{w}ptab':
+                text.append('\t')
+            elif tag == f'{w}cr':
+                text.append('\n')
+            elif tag == f'{w}br':
+                # Only line breaks are text; page and column breaks are not
+                if element.get(f'{w}type', 'textWrapping') == 'textWrapping':
+                    text.append('\n')
+            elif tag == f'{w}noBreakHyphen':
+                text.append('-')
+    return ''.join(text)
+
 class ImageExtractor:
     """Main class for extracting images from documents"""
 
-    def __init__(self, document_path: str, output_dir: str = None, markdown_dir: str = None, min_image_size: int = 50):
+    def __init__(self, document_path: str, output_dir: str = None, markdown_dir: str = None, min_image_size: int = 50, document=None, docx_engine: str = 'auto', incremental: bool = False, cache_dir: str = None):
         self.document_path = Path(document_path)
         self.document_name = self.document_path.stem
         self.document_ext = self.document_path.suffix.lower()
@@ -36,10 +231,29 @@ class ImageExtractor:
             # Default to DocuGenius/images folder in same directory as document
             self.output_dir = self.document_path.parent / "DocuGenius" / "images" / self.document_name
 
+        # Blob-hash index of this document's own image folder
+        self.image_store = ImageStore(self.output_dir)
+        self.filename_allocator = FilenameAllocator(self.output_dir)
+
+        # Image bytes are written behind the document walk by a small thread pool
+        self.image_writer = ImageWriteQueue()
+
         self.extracted_images = []
         self.image_counter = 1
         self.min_image_size = min_image_size
 
+        # Already-parsed document object shared with the text converter (optional)
+        self.document = document
+
+        if docx_engine not in DOCX_ENGINES:
+            raise ValueError(f"Unknown DOCX engine: {docx_engine} (expected one of {', '.join(DOCX_ENGINES)})")
+        self.docx_engine = docx_engine
+
+        # Re-render only the slides and sheets that changed since the last conversion, using
+        # the segment manifests in cache_dir (by default DocuGenius/.cache next to the document)
+        self.incremental = incremental
+        self.cache_dir = cache_dir
+
         # Store the original document directory for relative path calculation
         self.original_dir = self.document_path.parent
 
@@ -57,13 +271,13 @@ class ImageExtractor:
             self.output_dir.mkdir(parents=True, exist_ok=True)
             
             if self.document_ext == '.pdf':
-                return self._extract_from_pdf()
+                return self._flush_image_writes(self._extract_from_pdf())
             elif self.document_ext == '.docx':
-                return self._extract_from_docx()
+                return self._flush_image_writes(self._extract_from_docx())
             elif self.document_ext == '.pptx':
-                return self._extract_from_pptx()
+                return self._flush_image_writes(self._extract_from_pptx())
             elif self.document_ext == '.xlsx':
-                return self._extract_from_xlsx()
+                return self._flush_image_writes(self._extract_from_xlsx())
             else:
                 return {
                     'success': False,
@@ -77,6 +291,9 @@ class ImageExtractor:
                 'error': f'Error extracting images: {str(e)}',
                 'images': []
             }
+        finally:
+            self.image_writer.close()
+            self.image_store.save()
     
     def _extract_from_pdf(self) -> Dict:
         """PDF image extraction is not supported in lightweight mode"""
@@ -107,7 +324,7 @@ class ImageExtractor:
             }
 
         try:
-            doc = docx.Document(str(self.document_path))
+            doc = self._load_document(docx.Document)
             images_extracted = []
 
             # Extract images from document relationships
@@ -130,16 +347,17 @@ class ImageExtractor:
                     else:
                         img_ext = 'png'  # Default fallback
 
-                    # Generate unique filename
-                    img_filename = self._generate_image_filename(
+                    # Skip icons and spacers below min_image_size before anything is written
+                    if self._is_below_min_size(image_data):
+                        continue
+
+                    # Save under a unique filename, or reuse an identical image already on disk
+                    img_path = self._save_image(
+                        image_data,
                         f"docx_img_{len(images_extracted) + 1}",
                         img_ext
                     )
-                    img_path = self.output_dir / img_filename
-
-                    # Save image
-                    with open(img_path, "wb") as img_file:
-                        img_file.write(image_data)
+                    img_filename = img_path.name
 
                     # Add to extracted images list
                     image_info = {
@@ -181,12 +399,12 @@ class ImageExtractor:
             }
 
         try:
-            prs = Presentation(str(self.document_path))
+            prs = self._load_document(Presentation)
             images_extracted = []
 
             for slide_num, slide in enumerate(prs.slides):
-                for shape in slide.shapes:
-                    if hasattr(shape, 'image'):
+                for shape, image_index in self._iter_slide_shapes(slide):
+                    if image_index is not None:
                         # Get image data
                         image = shape.image
                         image_data = image.blob
@@ -204,16 +422,17 @@ class ImageExtractor:
                         else:
                             img_ext = 'png'  # Default fallback
 
-                        # Generate unique filename
-                        img_filename = self._generate_image_filename(
-                            f"slide_{slide_num + 1}_img_{len([s for s in slide.shapes if hasattr(s, 'image')]) + 1}",
+                        # Skip icons and spacers below min_image_size before anything is written
+                        if self._is_below_min_size(image_data):
+                            continue
+
+                        # Save under a unique filename, or reuse an identical image already on disk
+                        img_path = self._save_image(
+                            image_data,
+                            f"slide_{slide_num + 1}_img_{image_index}",
                             img_ext
                         )
-                        img_path = self.output_dir / img_filename
-
-                        # Save image
-                        with open(img_path, "wb") as img_file:
-                            img_file.write(image_data)
+                        img_filename = img_path.name
 
                         # Add to extracted images list
                         image_info = {
@@ -246,46 +465,31 @@ class ImageExtractor:
     def _extract_from_xlsx(self) -> Dict:
         """Extract images from XLSX files"""
         try:
-            import openpyxl
-            from openpyxl.drawing.image import Image as OpenpyxlImage
-        except ImportError:
-            return {
-                'success': False,
-                'error': 'XLSX image extraction requires openpyxl (pip install openpyxl)',
-                'images': []
-            }
-
-        try:
-            workbook = openpyxl.load_workbook(str(self.document_path))
             images_extracted = []
 
-            for sheet_name in workbook.sheetnames:
-                worksheet = workbook[sheet_name]
-
-                # Check if worksheet has images
-                if hasattr(worksheet, '_images') and worksheet._images:
-                    for img_index, image in enumerate(worksheet._images):
+            # Images are read straight from the drawing parts, so the workbook itself
+            # never has to be loaded
+            with zipfile.ZipFile(str(self.document_path)) as archive:
+                for sheet_name, media_parts in self._read_xlsx_sheet_media(archive):
+                    for img_index, media_part in enumerate(media_parts):
                         try:
                             # Get image data
-                            image_data = image.ref.getvalue()
+                            image_data = archive.read(media_part)
+
+                            # Determine file extension from the media part name
+                            img_ext = posixpath.splitext(media_part)[1].lstrip('.').lower() or 'png'
 
-                            # Determine file extension from image format
-                            img_ext = 'png'  # Default
-                            if hasattr(image, 'format') and image.format:
-                                img_ext = image.format.lower()
-                            elif hasattr(image.ref, 'format') and image.ref.format:
-                                img_ext = image.ref.format.lower()
+                            # Skip icons and spacers below min_image_size before anything is written
+                            if self._is_below_min_size(image_data):
+                                continue
 
-                            # Generate unique filename
-                            img_filename = self._generate_image_filename(
+                            # Save under a unique filename, or reuse an identical image already on disk
+                            img_path = self._save_image(
+                                image_data,
                                 f"sheet_{sheet_name}_img_{img_index + 1}",
                                 img_ext
                             )
-                            img_path = self.output_dir / img_filename
-
-                            # Save image
-                            with open(img_path, "wb") as img_file:
-                                img_file.write(image_data)
+                            img_filename = img_path.name
 
                             # Add to extracted images list
                             image_info = {
@@ -320,21 +524,125 @@ class ImageExtractor:
                 'images': []
             }
 
+    def _read_xlsx_sheet_media(self, archive) -> List[Tuple[str, List[str]]]:
+        """List the image parts anchored on each worksheet, in workbook order
+
+        This is a lightweight pass over the package relationships and drawing parts,
+        following workbook -> worksheet -> drawing -> media without building any cells.
+        """
+        import xml.etree.ElementTree as ET
+
+        workbook_part = next((target for rel_type, target in _read_package_rels(archive, '').values()
+                              if rel_type.endswith('/officeDocument')), 'xl/workbook.xml')
+        workbook_rels = _read_package_rels(archive, workbook_part)
+        workbook = ET.fromstring(archive.read(workbook_part))
+
+        sheet_media = []
+        for sheet in workbook.iter(f'{{{SPREADSHEETML_NS}}}sheet'):
+            sheet_rel = workbook_rels.get(sheet.get(f'{{{RELATIONSHIPS_NS}}}id'))
+            if not sheet_rel:
+                continue
+
+            media_parts = []
+            for rel_type, drawing_part in _read_package_rels(archive, sheet_rel[1]).values():
+                if not rel_type.endswith('/drawing'):
+                    continue
+
+                drawing_rels = _read_package_rels(archive, drawing_part)
+                drawing = ET.fromstring(archive.read(drawing_part))
+                for blip in drawing.iter(f'{{{DRAWINGML_NS}}}blip'):
+                    image_rel = drawing_rels.get(blip.get(f'{{{RELATIONSHIPS_NS}}}embed'))
+                    if image_rel and image_rel[0].endswith('/image'):
+                        media_parts.append(image_rel[1])
+
+            sheet_media.append((sheet.get('name'), media_parts))
+
+        return sheet_media
+
+    def _iter_slide_shapes(self, slide):
+        """Walk a slide's shapes once, numbering picture shapes as they are reached
+
+        Yields (shape, image_index) with a 1-based image_index for pictures and None for
+        every other shape. Pictures are recognised by type, so counting them never
+        resolves an image relationship or loads a blob.
+        """
+        from pptx.shapes.picture import Picture
+
+        image_index = 0
+        for shape in slide.shapes:
+            if isinstance(shape, Picture):
+                image_index += 1
+                yield shape, image_index
+            else:
+                yield shape, None
+
+    def _load_document(self, loader):
+        """Return the shared document object, parsing the file with loader only if needed"""
+        if self.document is None:
+            with current_profile().stage('open'):
+                self.document = loader(str(self.document_path))
+        return self.document
+
+    def _flush_image_writes(self, result: Dict) -> Dict:
+        """Wait for queued image writes before handing back a result that references them"""
+        with current_profile().stage('image_writes'):
+            self.image_writer.flush()
+        return result
+
+    def _is_below_min_size(self, image_data: bytes) -> bool:
+        """Check whether an image is narrower and shorter than min_image_size pixels
+
+        Only the header is probed. Images of unknown format are kept, and a
+        min_image_size of 0 keeps everything.
+        """
+        if not self.min_image_size:
+            return False
+
+        size = probe_image_size(image_data)
+        if size is None:
+            return False
+
+        width, height = size
+        return width < self.min_image_size and height < self.min_image_size
+
+    def _save_image(self, image_data: bytes, base_name: str, extension: str) -> Path:
+        """Write an image blob once and return its path
+
+        If the same bytes were already written to this document's image folder, the
+        existing file is returned instead of writing a duplicate.
+        """
+        blob_hash = self.image_store.hash_blob(image_data)
+        existing_path = self.image_store.lookup(blob_hash)
+        if existing_path is not None:
+            current_profile().count('images_reused')
+            return existing_path
+
+        while True:
+            img_path = self.output_dir / self._generate_image_filename(base_name, extension)
+            try:
+                # Exclusive create: another process may have taken the name since the directory was listed
+                img_file = open(img_path, "xb")
+                break
+            except FileExistsError:
+                continue
+
+        # The name is claimed now; the bytes are written behind
+        self.image_writer.submit(img_file, image_data)
+        profile = current_profile()
+        profile.count('images_written')
+        profile.count('image_bytes_written', len(image_data))
+
+        self.image_store.add(blob_hash, img_path)
+        return img_path
+
     def _generate_image_filename(self, base_name: str, extension: str) -> str:
         """Generate a unique filename for an image, avoiding collisions"""
         # Clean the base name
         base_name = "".join(c for c in base_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
         base_name = base_name.replace(' ', '_')
 
-        filename = f"{base_name}.{extension}"
-        counter = 1
-
-        # Check for collisions and add counter if needed
-        while (self.output_dir / filename).exists():
-            filename = f"{base_name}_{counter}.{extension}"
-            counter += 1
-
-        return filename
+        # Collisions are resolved against an in-memory listing of the output directory
+        return self.filename_allocator.allocate(base_name, extension)
 
     def _calculate_relative_path(self, image_path: Path) -> str:
         """Calculate the correct relative path from markdown file to image"""
@@ -465,13 +773,13 @@ class ImageExtractor:
         """Extract document content and intelligently insert images at their original positions"""
         try:
             if self.document_ext == '.pdf':
-                return self._extract_pdf_content_with_images()
+                return self._flush_image_writes(self._extract_pdf_content_with_images())
             elif self.document_ext == '.docx':
-                return self._extract_docx_content_with_images()
+                return self._flush_image_writes(self._extract_docx_content_with_images())
             elif self.document_ext == '.pptx':
-                return self._extract_pptx_content_with_images()
+                return self._flush_image_writes(self._extract_pptx_content_with_images())
             elif self.document_ext == '.xlsx':
-                return self._extract_xlsx_content_with_images()
+                return self._flush_image_writes(self._extract_xlsx_content_with_images())
             else:
                 return {
                     'success': False,
@@ -486,6 +794,9 @@ class ImageExtractor:
                 'markdown_content': '',
                 'images': []
             }
+        finally:
+            self.image_writer.close()
+            self.image_store.save()
 
     def _extract_pdf_content_with_images(self) -> Dict:
         """PDF content with images is not supported in lightweight mode"""
@@ -498,7 +809,148 @@ class ImageExtractor:
         }
 
     def _extract_docx_content_with_images(self) -> Dict:
-        """Extract DOCX content and insert images at their original positions"""
+        """Extract DOCX content and insert images at their original positions
+
+        Uses the streaming zip engine unless python-docx was selected, or (in auto mode)
+        a parsed python-docx document was already handed in. In auto mode a failure of
+        the zip engine falls back to python-docx.
+        """
+        use_zip = self.docx_engine == 'zip' or (self.docx_engine == 'auto' and self.document is None)
+        if use_zip:
+            result = self._extract_docx_content_from_zip()
+            if result['success'] or self.docx_engine == 'zip':
+                return result
+
+        return self._extract_docx_content_with_python_docx()
+
+    def _extract_docx_content_from_zip(self) -> Dict:
+        """Extract DOCX content with images in one streaming pass over the raw package
+
+        word/document.xml is read with iterparse and each top-level paragraph is turned
+        into markdown and discarded as soon as it ends. Relationships, content types and
+        styles are read once from their own parts. The output matches the python-docx engine.
+        """
+        import xml.etree.ElementTree as ET
+
+        w = f'{{{WORDPROCESSINGML_NS}}}'
+        blip_tag = f'{{{DRAWINGML_NS}}}blip'
+        embed_attribute = f'{{{RELATIONSHIPS_NS}}}embed'
+
+        try:
+            markdown_lines = []
+            all_images = []
+
+            # Create output directory
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+
+            with zipfile.ZipFile(str(self.document_path)) as archive:
+                document_part = next((target for rel_type, target in _read_package_rels(archive, '').values()
+                                      if rel_type.endswith('/officeDocument')), 'word/document.xml')
+                document_rels = _read_package_rels(archive, document_part)
+                content_type_of = _read_content_types(archive)
+                styles_part = next((target for rel_type, target in document_rels.values()
+                                    if rel_type.endswith('/styles')), None)
+                style_names, default_style_name = _read_docx_paragraph_styles(archive, styles_part)
+                image_parts = {rel_id: target for rel_id, (rel_type, target) in document_rels.items()
+                               if rel_type.endswith('/image')}
+
+                img_counter = 1
+                depth = 0
+                with archive.open(document_part) as document_xml:
+                    for event, element in ET.iterparse(document_xml, events=('start', 'end')):
+                        if event == 'start':
+                            depth += 1
+                            continue
+
+                        depth -= 1
+                        if depth != 2:
+                            continue  # Only direct children of w:body are handled (and freed)
+
+                        if element.tag == f'{w}p':
+                            text = _docx_paragraph_text(element).strip()
+
+                            if text:
+                                style = element.find(f'{w}pPr/{w}pStyle')
+                                style_id = style.get(f'{w}val') if style is not None else None
+                                style_name = style_names.get(style_id, default_style_name)
+
+                                # Check if paragraph has special formatting
+                                if style_name.startswith('Heading'):
+                                    level = '##' if 'Heading 1' in style_name else '###'
+                                    markdown_lines.append(f"{level} {text}\n")
+                                else:
+                                    markdown_lines.append(text)
+                                    markdown_lines.append("")  # Empty line after paragraph
+
+                            # Check for images in this paragraph's runs
+                            for run in element.findall(f'{w}r'):
+                                for blip in run.iter(blip_tag):
+                                    image_part = image_parts.get(blip.get(embed_attribute))
+                                    if image_part is None:
+                                        continue
+                                    image_data = archive.read(image_part)
+
+                                    # Determine file extension from content type
+                                    content_type = content_type_of(image_part)
+                                    if 'jpeg' in content_type or 'jpg' in content_type:
+                                        img_ext = 'jpg'
+                                    elif 'png' in content_type:
+                                        img_ext = 'png'
+                                    elif 'gif' in content_type:
+                                        img_ext = 'gif'
+                                    else:
+                                        img_ext = 'png'  # Default fallback
+
+                                    # Skip icons and spacers below min_image_size before anything is written
+                                    if self._is_below_min_size(image_data):
+                                        continue
+
+                                    # Save under a unique filename, or reuse an identical image already on disk
+                                    img_path = self._save_image(
+                                        image_data,
+                                        f"docx_img_{img_counter}",
+                                        img_ext
+                                    )
+
+                                    # Create image info
+                                    image_info = {
+                                        'filename': img_path.name,
+                                        'path': str(img_path),
+                                        'relative_path': self._calculate_relative_path(img_path),
+                                        'format': img_ext.upper(),
+                                        'size_bytes': len(image_data),
+                                        'source': 'docx_inline'
+                                    }
+                                    all_images.append(image_info)
+
+                                    # Insert image reference right here in the content
+                                    alt_text = f"Image {img_counter}"
+                                    markdown_lines.append(f"![{alt_text}]({image_info['relative_path']})")
+                                    markdown_lines.append("")  # Empty line after image
+
+                                    img_counter += 1
+
+                        element.clear()
+
+            return {
+                'success': True,
+                'document': str(self.document_path),
+                'output_dir': str(self.output_dir),
+                'images_count': len(all_images),
+                'images': all_images,
+                'markdown_content': '\n'.join(markdown_lines)
+            }
+
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f'Error extracting DOCX content with images: {str(e)}',
+                'markdown_content': '',
+                'images': []
+            }
+
+    def _extract_docx_content_with_python_docx(self) -> Dict:
+        """Extract DOCX content with images through the python-docx object model"""
         try:
             import docx
             from docx.document import Document
@@ -511,7 +963,7 @@ class ImageExtractor:
             }
 
         try:
-            doc = docx.Document(str(self.document_path))
+            doc = self._load_document(docx.Document)
             markdown_lines = []
             all_images = []
 
@@ -560,16 +1012,17 @@ class ImageExtractor:
                                 else:
                                     img_ext = 'png'  # Default fallback
 
-                                # Generate unique filename
-                                img_filename = self._generate_image_filename(
+                                # Skip icons and spacers below min_image_size before anything is written
+                                if self._is_below_min_size(image_data):
+                                    continue
+
+                                # Save under a unique filename, or reuse an identical image already on disk
+                                img_path = self._save_image(
+                                    image_data,
                                     f"docx_img_{img_counter}",
                                     img_ext
                                 )
-                                img_path = self.output_dir / img_filename
-
-                                # Save image
-                                with open(img_path, "wb") as img_file:
-                                    img_file.write(image_data)
+                                img_filename = img_path.name
 
                                 # Create image info
                                 image_info = {
@@ -620,71 +1073,33 @@ class ImageExtractor:
             }
 
         try:
-            prs = Presentation(str(self.document_path))
-            markdown_lines = []
-            all_images = []
-
             # Create output directory
             self.output_dir.mkdir(parents=True, exist_ok=True)
 
-            for slide_num, slide in enumerate(prs.slides):
-                # Add slide header
-                markdown_lines.append(f"\n## Slide {slide_num + 1}\n")
-
-                # Extract text and images from shapes in order
-                for shape in slide.shapes:
-                    # Handle text shapes
-                    if hasattr(shape, 'text') and shape.text.strip():
-                        text = shape.text.strip()
-                        if text:
-                            markdown_lines.append(text)
-                            markdown_lines.append("")  # Empty line after text
+            # Slides whose fingerprint matches the previous conversion are spliced back in
+            manifest, fingerprints, segments = self._lookup_segments(_read_pptx_slide_fingerprints)
 
-                    # Handle image shapes
-                    if hasattr(shape, 'image'):
-                        image = shape.image
-                        image_data = image.blob
+            slides = None
+            if manifest is None or None in segments:
+                # At least one slide has to be rendered, which needs the parsed deck
+                slides = list(self._load_document(Presentation).slides)
+                if manifest is None or len(slides) != len(segments):
+                    manifest = None
+                    segments = [None] * len(slides)
 
-                        # Determine file extension from content type
-                        content_type = image.content_type
-                        if 'jpeg' in content_type or 'jpg' in content_type:
-                            img_ext = 'jpg'
-                        elif 'png' in content_type:
-                            img_ext = 'png'
-                        elif 'gif' in content_type:
-                            img_ext = 'gif'
-                        else:
-                            img_ext = 'png'  # Default fallback
-
-                        # Generate unique filename
-                        img_filename = self._generate_image_filename(
-                            f"slide_{slide_num + 1}_img_{len([s for s in slide.shapes if hasattr(s, 'image')]) + 1}",
-                            img_ext
-                        )
-                        img_path = self.output_dir / img_filename
-
-                        # Save image
-                        with open(img_path, "wb") as img_file:
-                            img_file.write(image_data)
-
-                        # Create image info
-                        image_info = {
-                            'filename': img_filename,
-                            'path': str(img_path),
-                            'relative_path': self._calculate_relative_path(img_path),
-                            'slide': slide_num + 1,
-                            'format': img_ext.upper(),
-                            'size_bytes': len(image_data),
-                            'source': 'pptx_shape'
-                        }
-                        all_images.append(image_info)
+            markdown_segments = []
+            all_images = []
+            for slide_num, segment in enumerate(segments):
+                if segment is None:
+                    segment = self._render_pptx_slide(slides[slide_num], slide_num)
+                if manifest is not None:
+                    manifest.record(fingerprints[slide_num], segment)
 
-                        # Insert image reference right here in the content
-                        alt_text = f"Image from slide {slide_num + 1}"
-                        markdown_lines.append(f"![{alt_text}]({image_info['relative_path']})")
-                        markdown_lines.append("")  # Empty line after image
+                markdown_segments.append(segment['markdown'])
+                all_images.extend(segment['images'])
 
-                markdown_lines.append("---\n")  # Slide separator
+            if manifest is not None:
+                manifest.save()
 
             return {
                 'success': True,
@@ -692,7 +1107,7 @@ class ImageExtractor:
                 'output_dir': str(self.output_dir),
                 'images_count': len(all_images),
                 'images': all_images,
-                'markdown_content': '\n'.join(markdown_lines)
+                'markdown_content': '\n'.join(markdown_segments)
             }
 
         except Exception as e:
@@ -703,6 +1118,101 @@ class ImageExtractor:
                 'images': []
             }
 
+    def _lookup_segments(self, read_fingerprints):
+        """Look up every slide or sheet in the segment manifest of the previous conversion
+
+        read_fingerprints(archive) lists one fingerprint per part. Returns (manifest,
+        fingerprints, segments) with None in segments for each part that has to be
+        rendered, or (None, None, None) if incremental conversion is off or the document
+        cannot be fingerprinted; every part is rendered then.
+        """
+        if not self.incremental:
+            return None, None, None
+
+        try:
+            with zipfile.ZipFile(self.document_path) as archive:
+                fingerprints = read_fingerprints(archive)
+        except Exception:
+            # Incremental conversion is only an optimisation
+            return None, None, None
+
+        # Rendered markdown depends on where images go and which ones are kept
+        settings = {
+            'version': SEGMENT_VERSION,
+            'output_dir': str(self.output_dir),
+            'markdown_dir': str(self.markdown_dir),
+            'min_image_size': self.min_image_size
+        }
+        manifest = SegmentManifest.for_document(self.document_path, settings, cache_dir=self.cache_dir)
+        return manifest, fingerprints, [manifest.lookup(index, fingerprint) for index, fingerprint in enumerate(fingerprints)]
+
+    def _render_pptx_slide(self, slide, slide_num: int) -> Dict:
+        """Render one slide as a markdown segment, saving its images
+
+        Returns {'markdown': ..., 'images': [...]}; segments are joined with newlines.
+        """
+        # Add slide header
+        markdown_lines = [f"\n## Slide {slide_num + 1}\n"]
+        images = []
+
+        # Extract text and images from shapes in order
+        for shape, image_index in self._iter_slide_shapes(slide):
+            # Handle text shapes
+            if hasattr(shape, 'text') and shape.text.strip():
+                text = shape.text.strip()
+                if text:
+                    markdown_lines.append(text)
+                    markdown_lines.append("")  # Empty line after text
+
+            # Handle image shapes
+            if image_index is not None:
+                image = shape.image
+                image_data = image.blob
+
+                # Determine file extension from content type
+                content_type = image.content_type
+                if 'jpeg' in content_type or 'jpg' in content_type:
+                    img_ext = 'jpg'
+                elif 'png' in content_type:
+                    img_ext = 'png'
+                elif 'gif' in content_type:
+                    img_ext = 'gif'
+                else:
+                    img_ext = 'png'  # Default fallback
+
+                # Skip icons and spacers below min_image_size before anything is written
+                if self._is_below_min_size(image_data):
+                    continue
+
+                # Save under a unique filename, or reuse an identical image already on disk
+                img_path = self._save_image(
+                    image_data,
+                    f"slide_{slide_num + 1}_img_{image_index}",
+                    img_ext
+                )
+                img_filename = img_path.name
+
+                # Create image info
+                image_info = {
+                    'filename': img_filename,
+                    'path': str(img_path),
+                    'relative_path': self._calculate_relative_path(img_path),
+                    'slide': slide_num + 1,
+                    'format': img_ext.upper(),
+                    'size_bytes': len(image_data),
+                    'source': 'pptx_shape'
+                }
+                images.append(image_info)
+
+                # Insert image reference right here in the content
+                alt_text = f"Image from slide {slide_num + 1}"
+                markdown_lines.append(f"![{alt_text}]({image_info['relative_path']})")
+                markdown_lines.append("")  # Empty line after image
+
+        markdown_lines.append("---\n")  # Slide separator
+
+        return {'markdown': '\n'.join(markdown_lines), 'images': images}
+
     def _extract_xlsx_content_with_images(self) -> Dict:
         """Extract XLSX content and insert images at their original positions"""
         try:
@@ -716,90 +1226,50 @@ class ImageExtractor:
             }
 
         try:
-            workbook = openpyxl.load_workbook(str(self.document_path))
-            markdown_lines = []
-            all_images = []
-
             # Create output directory
             self.output_dir.mkdir(parents=True, exist_ok=True)
 
-            for sheet_name in workbook.sheetnames:
-                worksheet = workbook[sheet_name]
-
-                # Add sheet header
-                markdown_lines.append(f"\n## {sheet_name}\n")
-
-                # Extract table data
-                rows = list(worksheet.iter_rows(values_only=True))
-                if rows:
-                    # Filter out completely empty rows
-                    non_empty_rows = []
-                    for row in rows:
-                        if any(cell is not None and str(cell).strip() for cell in row):
-                            non_empty_rows.append(row)
-
-                    if non_empty_rows:
-                        # Create markdown table
-                        markdown_lines.append("| " + " | ".join(str(cell) if cell is not None else "" for cell in non_empty_rows[0]) + " |")
-                        markdown_lines.append("| " + " | ".join("---" for _ in non_empty_rows[0]) + " |")
-
-                        for row in non_empty_rows[1:]:
-                            markdown_lines.append("| " + " | ".join(str(cell) if cell is not None else "" for cell in row) + " |")
-
-                        markdown_lines.append("")  # Empty line after table
-
-                # Extract and insert images for this sheet
-                if hasattr(worksheet, '_images') and worksheet._images:
-                    sheet_images = []
-
-                    for img_index, image in enumerate(worksheet._images):
-                        try:
-                            # Get image data
-                            image_data = image.ref.getvalue()
-
-                            # Determine file extension
-                            img_ext = 'png'  # Default
-                            if hasattr(image, 'format') and image.format:
-                                img_ext = image.format.lower()
-                            elif hasattr(image.ref, 'format') and image.ref.format:
-                                img_ext = image.ref.format.lower()
-
-                            # Generate unique filename
-                            img_filename = self._generate_image_filename(
-                                f"sheet_{sheet_name}_img_{img_index + 1}",
-                                img_ext
-                            )
-                            img_path = self.output_dir / img_filename
-
-                            # Save image
-                            with open(img_path, "wb") as img_file:
-                                img_file.write(image_data)
+            # Sheets whose fingerprint matches the previous conversion are spliced back in
+            manifest, fingerprints, segments = self._lookup_segments(xlsx_sheet_fingerprints)
 
-                            # Create image info
-                            image_info = {
-                                'filename': img_filename,
-                                'path': str(img_path),
-                                'relative_path': self._calculate_relative_path(img_path),
-                                'sheet': sheet_name,
-                                'format': img_ext.upper(),
-                                'size_bytes': len(image_data),
-                                'source': 'xlsx_image'
-                            }
-                            sheet_images.append(image_info)
-                            all_images.append(image_info)
-
-                        except Exception as img_error:
-                            print(f"Warning: Could not extract image {img_index + 1} from sheet {sheet_name}: {img_error}")
-                            continue
-
-                    # Insert images after the sheet content
-                    if sheet_images:
-                        for img_info in sheet_images:
-                            alt_text = f"Image from sheet {img_info['sheet']}"
-                            markdown_lines.append(f"![{alt_text}]({img_info['relative_path']})")
-                            markdown_lines.append("")  # Empty line after image
-
-                markdown_lines.append("---\n")  # Sheet separator
+            markdown_segments = []
+            all_images = []
+            if manifest is not None and None not in segments:
+                for index, segment in enumerate(segments):
+                    manifest.record(fingerprints[index], segment)
+                    markdown_segments.append(segment['markdown'])
+                    all_images.extend(segment['images'])
+            else:
+                # Read-only mode streams rows from the sheet XML one at a time and keeps the
+                # file open until the workbook is closed; a workbook passed in is left to its owner
+                opened_here = self.document is None
+                workbook = self._load_document(lambda path: openpyxl.load_workbook(path, read_only=True, data_only=True))
+                try:
+                    if manifest is None or len(workbook.sheetnames) != len(segments):
+                        manifest = None
+                        segments = [None] * len(workbook.sheetnames)
+
+                    with zipfile.ZipFile(str(self.document_path)) as archive:
+                        # Images come from a separate lightweight pass over the drawing parts
+                        sheet_media = dict(self._read_xlsx_sheet_media(archive))
+
+                        for index, sheet_name in enumerate(workbook.sheetnames):
+                            segment = segments[index]
+                            if segment is None:
+                                segment = self._render_xlsx_sheet(archive, workbook[sheet_name], sheet_name,
+                                                                  sheet_media.get(sheet_name, []))
+                            if manifest is not None:
+                                manifest.record(fingerprints[index], segment)
+
+                            markdown_segments.append(segment['markdown'])
+                            all_images.extend(segment['images'])
+                finally:
+                    if opened_here:
+                        workbook.close()
+                        self.document = None
+
+            if manifest is not None:
+                manifest.save()
 
             return {
                 'success': True,
@@ -807,7 +1277,7 @@ class ImageExtractor:
                 'output_dir': str(self.output_dir),
                 'images_count': len(all_images),
                 'images': all_images,
-                'markdown_content': '\n'.join(markdown_lines)
+                'markdown_content': '\n'.join(markdown_segments)
             }
 
         except Exception as e:
@@ -818,8 +1288,78 @@ class ImageExtractor:
                 'images': []
             }
 
+    def _render_xlsx_sheet(self, archive, worksheet, sheet_name: str, media_parts: List[str]) -> Dict:
+        """Render one worksheet as a markdown segment, saving the images anchored on it
+
+        Returns {'markdown': ..., 'images': [...]}; segments are joined with newlines.
+        """
+        # Add sheet header
+        markdown_lines = [f"\n## {sheet_name}\n"]
+
+        # Extract table data, skipping completely empty rows as they stream past
+        header_written = False
+        for row in (worksheet.iter_rows(values_only=True) if hasattr(worksheet, 'iter_rows') else []):
+            if not any(cell is not None and str(cell).strip() for cell in row):
+                continue
+
+            markdown_lines.append("| " + " | ".join(str(cell) if cell is not None else "" for cell in row) + " |")
+            if not header_written:
+                markdown_lines.append("| " + " | ".join("---" for _ in row) + " |")
+                header_written = True
+
+        if header_written:
+            markdown_lines.append("")  # Empty line after table
+
+        # Extract and insert images for this sheet
+        sheet_images = []
+
+        for img_index, media_part in enumerate(media_parts):
+            try:
+                # Get image data
+                image_data = archive.read(media_part)
+
+                # Determine file extension from the media part name
+                img_ext = posixpath.splitext(media_part)[1].lstrip('.').lower() or 'png'
+
+                # Skip icons and spacers below min_image_size before anything is written
+                if self._is_below_min_size(image_data):
+                    continue
+
+                # Save under a unique filename, or reuse an identical image already on disk
+                img_path = self._save_image(
+                    image_data,
+                    f"sheet_{sheet_name}_img_{img_index + 1}",
+                    img_ext
+                )
+                img_filename = img_path.name
+
+                # Create image info
+                image_info = {
+                    'filename': img_filename,
+                    'path': str(img_path),
+                    'relative_path': self._calculate_relative_path(img_path),
+                    'sheet': sheet_name,
+                    'format': img_ext.upper(),
+                    'size_bytes': len(image_data),
+                    'source': 'xlsx_image'
+                }
+                sheet_images.append(image_info)
+
+            except Exception as img_error:
+                print(f"Warning: Could not extract image {img_index + 1} from sheet {sheet_name}: {img_error}")
+                continue
+
+        # Insert images after the sheet content
+        for img_info in sheet_images:
+            alt_text = f"Image from sheet {img_info['sheet']}"
+            markdown_lines.append(f"![{alt_text}]({img_info['relative_path']})")
+            markdown_lines.append("")  # Empty line after image
+
+        markdown_lines.append("---\n")  # Sheet separator
+
+        return {'markdown': '\n'.join(markdown_lines), 'images': sheet_images}
 
-def extract_images_from_document(document_path: str, output_dir: str = None, markdown_dir: str = None, markdown_mode: str = "simple", min_image_size: int = 50) -> Dict:
+def extract_images_from_document(document_path: str, output_dir: str = None, markdown_dir: str = None, markdown_mode: str = "simple", min_image_size: int = 50, document=None) -> Dict:
     """Main function to extract images from a document
 
     Args:
@@ -827,9 +1367,10 @@ def extract_images_from_document(document_path: str, output_dir: str = None, mar
         output_dir: Directory to save extracted images
         markdown_dir: Directory where markdown files will be located (for relative path calculation)
         markdown_mode: How to format markdown references ("simple", "grouped", "inline")
+        document: Already-parsed document object to reuse instead of opening the file again
     """
     try:
-        extractor = ImageExtractor(document_path, output_dir, markdown_dir, min_image_size)
+        extractor = ImageExtractor(document_path, output_dir, markdown_dir, min_image_size, document)
 
         result = extractor.extract_images()
 
@@ -869,10 +1410,11 @@ def extract_images_from_document(document_path: str, output_dir: str = None, mar
         }
 
 
-def extract_document_with_images(document_path: str, output_dir: str = None, markdown_dir: str = None, min_image_size: int = 50) -> Dict:
+def extract_document_with_images(document_path: str, output_dir: str = None, markdown_dir: str = None, min_image_size: int = 50, document=None, docx_engine: str = 'auto', incremental: bool = False, cache_dir: str = None) -> Dict:
     """Extract complete document content with images inserted at their original positions"""
     try:
-        extractor = ImageExtractor(document_path, output_dir, markdown_dir, min_image_size)
+        extractor = ImageExtractor(document_path, output_dir, markdown_dir, min_image_size, document, docx_engine, incremental,
+                                   cache_dir)
         result = extractor.extract_document_content_with_images()
         return result
     except Exception as e:
@@ -888,7 +1430,7 @@ def main():
     """Command line interface for image extraction"""
     if len(sys.argv) < 2:
         print("DocuGenius Image Extractor")
-        print("Usage: python image_extractor.py <document_path> [output_dir] [markdown_dir] [mode] [min_image_size]")
+        print("Usage: python image_extractor.py <document_path> [output_dir] [markdown_dir] [mode] [min_image_size] [docx_engine]")
         print("")
         print("Arguments:")
         print("  document_path  : Path to PDF, DOCX, or PPTX file")
@@ -898,6 +1440,7 @@ def main():
         print("                   - 'images_only': Extract images only (default)")
         print("                   - 'full_content': Extract full document with images in original positions")
         print("  min_image_size : Minimum image size in pixels (optional, default: 50)")
+        print("  docx_engine    : DOCX content engine for full_content: auto, zip or python-docx (default: auto)")
         print("")
         print("Output: JSON with extraction results")
         sys.exit(1)
@@ -907,10 +1450,11 @@ def main():
     markdown_dir = sys.argv[3] if len(sys.argv) > 3 else None
     mode = sys.argv[4] if len(sys.argv) > 4 else "images_only"
     min_image_size = int(sys.argv[5]) if len(sys.argv) > 5 else 50
+    docx_engine = sys.argv[6] if len(sys.argv) > 6 else 'auto'
 
     if mode == "full_content":
         # Extract complete document content with images in original positions
-        result = extract_document_with_images(document_path, output_dir, markdown_dir, min_image_size)
+        result = extract_document_with_images(document_path, output_dir, markdown_dir, min_image_size, docx_engine=docx_engine)
     else:
         # Extract images only (traditional mode)
         result = extract_images_from_document(document_path, output_dir, markdown_dir, "simple", min_image_size)
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+DocuGenius Image Store
+Content-addressed bookkeeping for the images written to one document's folder under
+DocuGenius/images.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class ImageStore:
+    """Deduplicates extracted images by blob hash within one document's image folder
+
+    The index maps the MD5 of each image blob to the file that already holds it,
+    relative to the folder, and is persisted in .image_index.json there so repeats
+    within the document and later conversions of it can point at existing files
+    instead of writing the same bytes again. Folders are never shared between
+    documents: the extension deletes a document's folder with its source.
+    """
+
+    INDEX_NAME = '.image_index.json'
+
+    def __init__(self, images_root: Path):
+        self.images_root = Path(images_root)
+        self.index_path = self.images_root / self.INDEX_NAME
+        self._index = None
+        self._added = {}
+
+    @staticmethod
+    def hash_blob(image_data: bytes) -> str:
+        """Calculate the MD5 hash of an image blob for duplicate detection"""
+        return hashlib.md5(image_data).hexdigest()
+
+    def _load_index(self) -> Dict[str, str]:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            return index if isinstance(index, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def lookup(self, blob_hash: str) -> Optional[Path]:
+        """Return the existing file holding this blob, if it is still on disk"""
+        if self._index is None:
+            self._index = self._load_index()
+
+        relative_path = self._index.get(blob_hash)
+        if not relative_path:
+            return None
+
+        existing_path = self.images_root / relative_path
+        if existing_path.is_file():
+            return existing_path
+
+        # The file was removed since it was indexed
+        del self._index[blob_hash]
+        return None
+
+    def add(self, blob_hash: str, image_path: Path) -> None:
+        """Record that image_path now holds the blob with this hash"""
+        if self._index is None:
+            self._index = self._load_index()
+
+        relative_path = os.path.relpath(str(image_path), str(self.images_root)).replace('\\', '/')
+        self._index[blob_hash] = relative_path
+        self._added[blob_hash] = relative_path
+
+    def save(self) -> None:
+        """Persist new index entries, merging with entries written by other processes"""
+        if not self._added:
+            return
+
+        try:
+            index = self._load_index()
+            index.update(self._added)
+            self.images_root.mkdir(parents=True, exist_ok=True)
+            temp_path = self.index_path.with_name(f"{self.INDEX_NAME}.{os.getpid()}.tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False)
+            os.replace(temp_path, self.index_path)
+            self._added = {}
+        except OSError:
+            # The index is only an optimisation; losing an update costs a duplicate file
+            pass
+
+
+class FilenameAllocator:
+    """Hands out unique file names in one directory without probing the filesystem per name
+
+    The directory is listed once; names handed out afterwards are tracked in memory.
+    Names claimed by other processes after the listing are caught by creating files
+    exclusively and allocating again on FileExistsError.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._taken = None
+        self._next_counter = {}
+
+    def _list_directory(self) -> set:
+        try:
+            return {entry.name for entry in os.scandir(self.directory)}
+        except OSError:
+            return set()
+
+    def allocate(self, base_name: str, extension: str) -> str:
+        """Return base_name.extension, or base_name_N.extension for the first free N"""
+        if self._taken is None:
+            self._taken = self._list_directory()
+
+        key = (base_name, extension)
+        counter = self._next_counter.get(key, 0)
+        while True:
+            filename = f"{base_name}.{extension}" if counter == 0 else f"{base_name}_{counter}.{extension}"
+            counter += 1
+            if filename not in self._taken:
+                break
+
+        self._next_counter[key] = counter
+        self._taken.add(filename)
+        return filename
+
+
+class ImageWriteQueue:
+    """Writes image blobs on a small thread pool so extraction can keep walking the document
+
+    Callers open the target file themselves (which claims the name) and hand over the
+    open file with its bytes. The number of files and bytes waiting to be written is
+    bounded; submit() blocks until the writers catch up when either limit is reached.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending_bytes: int = 32 * 1024 * 1024, max_pending_files: int = 64):
+        self.max_workers = max_workers
+        self.max_pending_bytes = max_pending_bytes
+        self.max_pending_files = max_pending_files
+        self._condition = threading.Condition()
+        self._pending_bytes = 0
+        self._pending_files = 0
+        self._errors = []
+        self._executor = None
+
+    def submit(self, image_file, image_data: bytes) -> None:
+        """Queue image_data to be written to the open binary file image_file, which is then closed"""
+        size = len(image_data)
+        with self._condition:
+            # A blob larger than the whole budget is still accepted once the queue has drained
+            while self._pending_files and (self._pending_files >= self.max_pending_files or
+                                           self._pending_bytes + size > self.max_pending_bytes):
+                self._condition.wait()
+            self._pending_bytes += size
+            self._pending_files += 1
+
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self._executor.submit(self._write, image_file, image_data)
+
+    def _write(self, image_file, image_data: bytes) -> None:
+        try:
+            with image_file:
+                image_file.write(image_data)
+        except Exception as e:
+            # Never leave a truncated image behind for the dedup index to point at
+            try:
+                os.remove(image_file.name)
+            except OSError:
+                pass
+            with self._condition:
+                self._errors.append(e)
+        finally:
+            with self._condition:
+                self._pending_bytes -= len(image_data)
+                self._pending_files -= 1
+                self._condition.notify_all()
+
+    def flush(self) -> None:
+        """Wait until every queued image is on disk; re-raises the first write error"""
+        with self._condition:
+            while self._pending_files:
+                self._condition.wait()
+            errors, self._errors = self._errors, []
+        if errors:
+            raise errors[0]
+
+    def close(self) -> None:
+        """Wait for outstanding writes and stop the writer threads"""
+        with self._condition:
+            while self._pending_files:
+                self._condition.wait()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
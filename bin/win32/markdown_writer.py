@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+DocuGenius Markdown Writer
+Incremental markdown output for the converters, so large documents are never
+rebuilt as one growing string.
+"""
+
+
+class MarkdownWriter:
+    """Collects markdown chunks in memory or streams them to a file-like target
+
+    With no target the chunks are kept in a list and joined once by getvalue().
+    With a target (an open file, sys.stdout, ...) every chunk is written through
+    as soon as it is produced.
+
+    When strip is True the output matches calling .strip() on the concatenated
+    text: leading whitespace is dropped, and trailing whitespace is held back
+    until more text follows it, so it never reaches the target at the end.
+    """
+
+    def __init__(self, target=None, strip=True):
+        self.target = target
+        self.strip = strip
+        self._parts = [] if target is None else None
+        self._started = False
+        self._pending = ""
+
+    def write(self, text):
+        """Append a chunk of markdown"""
+        if not text:
+            return
+
+        if not self.strip:
+            self._emit(text)
+            return
+
+        if not self._started:
+            text = text.lstrip()
+            if not text:
+                return
+            self._started = True
+
+        body = text.rstrip()
+        if not body:
+            self._pending += text
+            return
+
+        if self._pending:
+            self._emit(self._pending)
+        self._emit(body)
+        self._pending = text[len(body):]
+
+    def write_raw(self, text):
+        """Append text verbatim, bypassing whitespace stripping"""
+        if not text:
+            return
+
+        if self._pending:
+            self._emit(self._pending)
+            self._pending = ""
+        self._started = True
+        self._emit(text)
+
+    def write_table_row(self, cells):
+        """Append one markdown table row"""
+        self.write("| " + " | ".join(cells) + " |\n")
+
+    def write_table_header(self, cells):
+        """Append a markdown table header row and its separator"""
+        self.write_table_row(cells)
+        self.write_table_row(["---"] * len(cells))
+
+    def _emit(self, text):
+        if self._parts is not None:
+            self._parts.append(text)
+        else:
+            self.target.write(text)
+
+    def getvalue(self):
+        """Return the collected markdown (empty when streaming to a target)"""
+        if self._parts is None:
+            return ""
+        return "".join(self._parts)
+
+    def flush(self):
+        """Flush the target, if it supports flushing"""
+        if self.target is not None and hasattr(self.target, 'flush'):
+            self.target.flush()
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+DocuGenius Text Input
+Encoding detection and decoding for plain-text sources, which reads small files only
+once and checks a large file's encoding against all of it before decoding, and
+byte-for-byte copies of sources that are already UTF-8.
+"""
+
+import io
+import os
+import codecs
+
+# Files up to this size are read whole and decoded exactly; larger ones are decoded in chunks
+STREAMING_THRESHOLD = 16 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+# A large file's encoding is chosen from its head plus this many windows spread across it
+SAMPLE_SIZE = 64 * 1024
+SAMPLE_WINDOWS = 8
+
+# Encodings that keep ASCII bytes as they are, so pure-ASCII chunks need no decoding to be checked
+ASCII_COMPATIBLE = {'utf-8', 'utf-8-sig', 'gbk', 'cp1252', 'latin-1'}
+
+# UTF-32 marks are checked first, since the UTF-32 LE mark starts with the UTF-16 LE one
+BYTE_ORDER_MARKS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+
+def sniff_bom(head: bytes):
+    """Return the encoding announced by a byte order mark at the start of head, or None"""
+    for bom, encoding in BYTE_ORDER_MARKS:
+        if head.startswith(bom):
+            return encoding
+    return None
+
+
+def _decodes(encoding: str, data: bytes, final: bool) -> bool:
+    try:
+        codecs.getincrementaldecoder(encoding)().decode(data, final)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def _read_samples(f, size: int) -> list:
+    """Read the head of a large file and SAMPLE_WINDOWS windows spread across the rest
+
+    Each window starts after its first newline so it does not begin inside a multi-byte
+    character; the head is read last, leaving the file positioned right after it.
+    """
+    samples = []
+    for index in range(1, SAMPLE_WINDOWS + 1):
+        f.seek(size * index // (SAMPLE_WINDOWS + 1))
+        window = f.read(SAMPLE_SIZE)
+        newline = window.find(b'\n')
+        if newline >= 0:
+            samples.append(window[newline + 1:])
+
+    f.seek(0)
+    samples.insert(0, f.read(SAMPLE_SIZE))
+    return samples
+
+
+def _decodes_stream(f, encoding: str) -> bool:
+    """Check in one streaming pass that the whole of f decodes strictly with encoding
+
+    Chunks of pure ASCII are accepted without decoding them (on Python 3.7+) when the
+    encoding is ASCII compatible; other chunks are decoded and the text is dropped.
+    """
+    f.seek(0)
+    decoder = codecs.getincrementaldecoder(encoding)()
+    skip_ascii = encoding in ASCII_COMPATIBLE
+    for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+        # Bytes of a character split across chunks are pending in the decoder; the next chunk must complete them
+        if skip_ascii and hasattr(chunk, 'isascii') and chunk.isascii() and not decoder.getstate()[0]:
+            continue
+        try:
+            decoder.decode(chunk)
+        except UnicodeDecodeError:
+            return False
+    try:
+        decoder.decode(b'', True)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def _choose_streaming_encoding(f, size: int, candidates: list):
+    """Pick the first candidate that decodes the whole of a large file, or None
+
+    Samples of the file rule most wrong candidates out cheaply. A candidate that decodes
+    them still has to decode the entire file strictly: samples can miss the only
+    non-ASCII text of a mostly-ASCII file. Latin-1 decodes any bytes and is not checked.
+    """
+    samples = _read_samples(f, size)
+    bom_encoding = sniff_bom(samples[0][:4])
+    if bom_encoding:
+        candidates.insert(0, bom_encoding)
+
+    for encoding in candidates:
+        # Windows cut out of UTF-16/32 text do not start on a character boundary, so only the head is sampled
+        sampled = samples[:1] if encoding == bom_encoding else samples
+        if not all(_decodes(encoding, sample, final=False) for sample in sampled):
+            continue
+        if encoding == 'latin-1' or _decodes_stream(f, encoding):
+            return encoding
+    return None
+
+
+def decode_text_file(file_path, write, encodings) -> str:
+    """Decode a text file with the first fitting encoding and pass the text to write
+
+    A byte order mark takes precedence over encodings, which are tried in order.
+    Line endings are translated to \\n as in text mode. Small files are read once and
+    decoded exactly. Files over STREAMING_THRESHOLD are first checked candidate by
+    candidate in a streaming pass, then decoded in CHUNK_SIZE pieces, so nothing is
+    written until the encoding is known to fit the whole file.
+
+    Returns the encoding used, or None when no candidate decodes the file (nothing is
+    written then).
+    """
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        candidates = list(encodings)
+
+        if size <= STREAMING_THRESHOLD:
+            data = f.read()
+            bom_encoding = sniff_bom(data[:4])
+            if bom_encoding:
+                candidates.insert(0, bom_encoding)
+            for encoding in candidates:
+                try:
+                    text = data.decode(encoding)
+                except UnicodeDecodeError:
+                    continue
+                # Release the bytes before the newline translation copies the text
+                del data
+                write(text.replace('\r\n', '\n').replace('\r', '\n'))
+                return encoding
+            return None
+
+        chosen = _choose_streaming_encoding(f, size, candidates)
+        if chosen is None:
+            return None
+
+        f.seek(0)
+        decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(chosen)(), translate=True)
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            write(decoder.decode(chunk))
+        write(decoder.decode(b'', final=True))
+        return chosen
+
+
+def open_text_file(file_path, encodings):
+    """Open a text file for reading with the encoding decode_text_file would choose
+
+    Returns (stream, encoding), or (None, None) when no candidate decodes the file. Small
+    files are decoded exactly into an in-memory stream; larger ones are checked as
+    decode_text_file checks them and then decoded lazily while the stream is read. Line
+    endings are left as they are (newline=''), which is what the csv module expects.
+    """
+    f = open(file_path, 'rb')
+    try:
+        size = os.fstat(f.fileno()).st_size
+        candidates = list(encodings)
+
+        if size <= STREAMING_THRESHOLD:
+            data = f.read()
+            f.close()
+            bom_encoding = sniff_bom(data[:4])
+            if bom_encoding:
+                candidates.insert(0, bom_encoding)
+            for encoding in candidates:
+                try:
+                    return io.StringIO(data.decode(encoding), newline=''), encoding
+                except UnicodeDecodeError:
+                    continue
+            return None, None
+
+        chosen = _choose_streaming_encoding(f, size, candidates)
+        if chosen is None:
+            f.close()
+            return None, None
+        f.seek(0)
+        return io.TextIOWrapper(f, encoding=chosen, newline=''), chosen
+    except Exception:
+        f.close()
+        raise
+
+
+def is_utf8_file(file_path) -> bool:
+    """Check in one streaming pass whether a file is valid UTF-8"""
+    with open(file_path, 'rb') as f:
+        return _decodes_stream(f, 'utf-8')
+
+
+def copy_file(source_path, target_path) -> None:
+    """Copy a file's bytes without passing them through Python where the platform allows it
+
+    os.copy_file_range (Linux) copies inside the kernel and shares blocks on file systems
+    with reflinks; elsewhere, or when it is refused, shutil.copyfile uses sendfile
+    (Linux) or fcopyfile (macOS).
+    """
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with open(source_path, 'rb') as source, open(target_path, 'wb') as target:
+                while os.copy_file_range(source.fileno(), target.fileno(), 1 << 30):
+                    pass
+            return
+        except OSError:
+            pass  # e.g. EXDEV on older kernels or a file system without support
+
+    import shutil
+    shutil.copyfile(source_path, target_path)
@@ -33,95 +33,466 @@ A standalone document converter for DocuGenius VS Code extension
 
 import sys
 import os
-import argparse
-from pathlib import Path
-import json
-import re
-import hashlib
-from typing import List, Dict, Tuple, Optional
 
-def convert_text_file(file_path):
-    """Convert text-based files (just read and return content)"""
+# Every run is a fresh process, so module-level imports are limited to what all files
+# need; json, csv and the document libraries are imported by the handlers that use them
+
+class MarkdownWriter:
+    """Collects markdown chunks in memory or streams them to a file-like target"""
+
+    def __init__(self, target=None):
+        self.target = target
+        self._parts = [] if target is None else None
+
+    def write(self, text):
+        """Append a chunk of markdown"""
+        if not text:
+            return
+        if self._parts is not None:
+            self._parts.append(text)
+        else:
+            self.target.write(text)
+
+    def write_table_row(self, cells):
+        """Append one markdown table row"""
+        self.write("| " + " | ".join(cells) + " |\\n")
+
+    def write_table_header(self, cells):
+        """Append a markdown table header row and its separator"""
+        self.write_table_row(cells)
+        self.write_table_row(["---"] * len(cells))
+
+    def getvalue(self):
+        """Return the collected markdown (empty when streaming to a target)"""
+        return "".join(self._parts) if self._parts is not None else ""
+
+# Text files up to this size are read whole; larger ones are decoded in chunks
+TEXT_STREAMING_THRESHOLD = 16 * 1024 * 1024
+TEXT_CHUNK_SIZE = 1024 * 1024
+TEXT_SAMPLE_SIZE = 64 * 1024
+TEXT_BOMS = [(b'\\xff\\xfe\\x00\\x00', 'utf-32'), (b'\\x00\\x00\\xfe\\xff', 'utf-32'), (b'\\xef\\xbb\\xbf', 'utf-8-sig'),
+             (b'\\xff\\xfe', 'utf-16'), (b'\\xfe\\xff', 'utf-16')]
+
+def _text_samples(f, size, windows=8):
+    """Read the head of a large file and windows spread across it, each starting after a newline"""
+    samples = []
+    for index in range(1, windows + 1):
+        f.seek(size * index // (windows + 1))
+        window = f.read(TEXT_SAMPLE_SIZE)
+        newline = window.find(b'\\n')
+        if newline >= 0:
+            samples.append(window[newline + 1:])
+    f.seek(0)
+    samples.insert(0, f.read(TEXT_SAMPLE_SIZE))
+    return samples
+
+def _decodes_whole_file(f, encoding):
+    """Check in one streaming pass that all of f decodes strictly; pure-ASCII chunks of UTF-8 are skipped"""
+    import codecs
+
+    f.seek(0)
+    decoder = codecs.getincrementaldecoder(encoding)()
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        return content
+        for chunk in iter(lambda: f.read(TEXT_CHUNK_SIZE), b''):
+            if encoding == 'utf-8' and hasattr(chunk, 'isascii') and chunk.isascii() and not decoder.getstate()[0]:
+                continue
+            decoder.decode(chunk)
+        decoder.decode(b'', True)
     except UnicodeDecodeError:
-        # Try with different encodings
-        for encoding in ['latin-1', 'cp1252', 'iso-8859-1']:
+        return False
+    return True
+
+def _streaming_encoding(f, size):
+    """Encoding of a large file: its byte order mark's or UTF-8 when all of it decodes, else Latin-1
+
+    Samples rule a candidate out cheaply, but one that decodes them is still checked
+    against the whole file: they can miss the only non-ASCII text of a mostly-ASCII file.
+    """
+    import codecs
+
+    samples = _text_samples(f, size)
+    bom_encoding = next((encoding for bom, encoding in TEXT_BOMS if samples[0].startswith(bom)), None)
+    for encoding in ([bom_encoding] if bom_encoding else []) + ['utf-8']:
+        # Windows cut out of UTF-16/32 text do not start on a character boundary, so only the head is sampled
+        try:
+            for sample in (samples[:1] if encoding == bom_encoding else samples):
+                codecs.getincrementaldecoder(encoding)().decode(sample, False)
+        except UnicodeDecodeError:
+            continue
+        if _decodes_whole_file(f, encoding):
+            return encoding
+    return 'latin-1'
+
+def _open_text_stream(file_path):
+    """Open a text file for the csv module (newline=''), choosing the encoding as convert_text_file does"""
+    import io
+
+    f = open(file_path, 'rb')
+    size = os.fstat(f.fileno()).st_size
+    if size <= TEXT_STREAMING_THRESHOLD:
+        with f:
+            data = f.read()
+        candidates = [encoding for bom, encoding in TEXT_BOMS if data.startswith(bom)][:1] + ['utf-8', 'latin-1']
+        for encoding in candidates:
             try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    content = f.read()
-                return content
+                return io.StringIO(data.decode(encoding), newline='')
             except UnicodeDecodeError:
                 continue
-        return f"# {Path(file_path).name}\\n\\nError: Could not decode file content."
 
-def convert_json_file(file_path):
-    """Convert JSON file to formatted markdown"""
+    encoding = _streaming_encoding(f, size)
+    f.seek(0)
+    return io.TextIOWrapper(f, encoding=encoding, newline='')
+
+def convert_text_file(file_path, writer=None):
+    """Convert text-based files (just read and return content)
+
+    A byte order mark picks the encoding; otherwise UTF-8 is used when it decodes and
+    Latin-1, which decodes any bytes, when it does not. Small files are read once. Large
+    files are checked against the encoding in a streaming pass first, then decoded in
+    chunks.
+    """
+    import io
+    import codecs
+
+    out = writer if writer is not None else MarkdownWriter()
+
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= TEXT_STREAMING_THRESHOLD:
+            data = f.read()
+            candidates = [encoding for bom, encoding in TEXT_BOMS if data.startswith(bom)][:1] + ['utf-8', 'latin-1']
+            for encoding in candidates:
+                try:
+                    text = data.decode(encoding)
+                except UnicodeDecodeError:
+                    continue
+                out.write(text.replace('\\r\\n', '\\n').replace('\\r', '\\n'))
+                return out.getvalue()
+
+        encoding = _streaming_encoding(f, size)
+        f.seek(0)
+        decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(), translate=True)
+        for chunk in iter(lambda: f.read(TEXT_CHUNK_SIZE), b''):
+            out.write(decoder.decode(chunk))
+        out.write(decoder.decode(b'', final=True))
+    return out.getvalue()
+
+# JSON files up to this size are parsed and re-serialised with the json module; its object
+# tree takes several times the file size, so larger files are re-indented token by token
+JSON_STREAMING_THRESHOLD = 4 * 1024 * 1024
+JSON_INDENT = "  "
+
+def _open_string_start(buffer):
+    """Position of the quote opening the string that runs past the end of buffer"""
+    index = len(buffer)
+    while True:
+        index = buffer.rfind('"', 0, index)
+        escape = index
+        while escape > 0 and buffer[escape - 1] == '\\\\':
+            escape -= 1
+        if (index - escape) % 2 == 0:
+            return index
+
+def _reindent_json(stream, out):
+    """Pretty-print the JSON text read from stream to out without building the object tree
+
+    Tokens are matched chunk by chunk and written back with two-space indentation, the
+    layout json.dumps(indent=2) gives, so memory stays at one chunk plus the longest
+    string. Strings and numbers are copied as written rather than normalised. Several
+    top-level values (JSON Lines, or concatenated documents) are printed one after the
+    other. The order of values, keys, colons, commas and brackets is checked, and bare
+    words must be JSON numbers or literals; a ValueError reports the first problem
+    found, after the text before it has been written.
+    """
+    import re
+
+    # A lone quote starts a string whose closing quote has not been read yet
+    token_pattern = re.compile(r'"[^"\\\\]*(?:\\\\.[^"\\\\]*)*"|[{}\\[\\],:]|[^ \\t\\n\\r{}\\[\\],:"]+|"')
+    number_match = re.compile(r'-?(?:0|[1-9][0-9]*)(?:\\.[0-9]+)?(?:[eE][+-]?[0-9]+)?').fullmatch
+    literals = {'true', 'false', 'null'}
+    closers = {'{': '}', '[': ']'}
+    line_starts = ["\\n"]  # Newline plus indentation, by depth
+    # What the grammar allows next: a value, an object key, the colon after a key, or a
+    # comma or closing bracket after a value inside a container
+    VALUE, KEY, COLON, NEXT = range(4)
+    expected = ["a value", "a string key", "':'", "',' or a closing bracket"]
+
+    expect = VALUE
+    stack = []
+    pending_open = None  # An opened bracket is only broken onto its own line once it turns out not to be empty
+    values = 0
+    buffer = ''
+    at_end = False
+    read_size = TEXT_CHUNK_SIZE
+
+    while not at_end:
+        chunk = stream.read(read_size)
+        at_end = not chunk
+        buffer += chunk
+        tokens = token_pattern.findall(buffer)
+        if at_end:
+            if '"' in tokens:
+                raise ValueError("Unterminated string")
+            rest = ''
+        elif '"' in tokens:
+            rest = buffer[_open_string_start(buffer):]
+            del tokens[tokens.index('"'):]
+        elif tokens:
+            # The last token may continue in the next chunk
+            rest = buffer[buffer.rfind(tokens[-1]):]
+            del tokens[-1]
+        else:
+            rest = ''
+
+        parts = []
+        append = parts.append
+        try:
+            for token in tokens:
+                first = token[0]
+                if pending_open is not None:
+                    if token == closers[pending_open]:
+                        append(pending_open + token)
+                        pending_open = None
+                        stack.pop()
+                        expect = NEXT if stack else VALUE
+                        continue
+                    if len(line_starts) <= len(stack):
+                        line_starts.append(line_starts[-1] + JSON_INDENT)
+                    append(pending_open + line_starts[len(stack)])
+                    pending_open = None
+
+                if first == ',':
+                    if expect != NEXT:
+                        raise ValueError(f"Expecting {expected[expect]}, found ','")
+                    expect = KEY if stack[-1] == '{' else VALUE
+                    append("," + line_starts[len(stack)])
+                elif first == ':':
+                    if expect != COLON:
+                        raise ValueError(f"Expecting {expected[expect]}, found ':'")
+                    expect = VALUE
+                    append(": ")
+                elif first == '}' or first == ']':
+                    if expect != NEXT or closers[stack[-1]] != token:
+                        raise ValueError(f"Expecting {expected[expect]}, found '{token}'")
+                    stack.pop()
+                    expect = NEXT if stack else VALUE
+                    append(line_starts[len(stack)] + token)
+                elif expect == KEY and first == '"':
+                    expect = COLON
+                    append(token)
+                else:
+                    if expect != VALUE or (first != '"' and first != '{' and first != '[' and token not in literals
+                                           and not number_match(token)):
+                        raise ValueError(f"Expecting {expected[expect]}, found {token[:40]!r}")
+                    if not stack:
+                        if values:
+                            append("\\n")
+                        values += 1
+                    if first == '{' or first == '[':
+                        stack.append(token)
+                        pending_open = token
+                        expect = KEY if first == '{' else VALUE
+                    else:
+                        append(token)
+                        expect = NEXT if stack else VALUE
+        finally:
+            # Text before a rejected token is written before the error is raised
+            out.write("".join(parts))
+        # A string longer than the buffer is read in growing chunks so it is not rescanned over and over
+        read_size = read_size * 2 if tokens == [] and rest else TEXT_CHUNK_SIZE
+        buffer = rest
+
+    if stack or pending_open is not None:
+        raise ValueError("Unexpected end of data: an object or array is not closed")
+    if not values:
+        raise ValueError("No JSON value found")
+
+def convert_json_file(file_path, writer=None):
+    """Convert a JSON or JSON Lines file to a pretty-printed markdown code block
+
+    Small JSON files go through json.load and json.dumps. Large files, and files holding
+    more than one top-level value, are re-indented as a token stream instead.
+    """
+    import json
+
+    out = writer if writer is not None else MarkdownWriter()
+    out.write(f"# {os.path.basename(file_path)}\\n\\n")
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        stream = None
+        if os.path.getsize(file_path) <= JSON_STREAMING_THRESHOLD:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            try:
+                data = json.loads(text)
+            except json.JSONDecodeError as e:
+                if not e.msg.startswith('Extra data'):
+                    raise
+                # Several values, one per line or concatenated: print each of them in turn
+                import io
+                stream = io.StringIO(text)
+            else:
+                out.write("```json\\n")
+                out.write(json.dumps(data, indent=2, ensure_ascii=False))
+                out.write("\\n```\\n")
+                return out.getvalue()
 
-        markdown = f"# {Path(file_path).name}\\n\\n"
-        markdown += "```json\\n"
-        markdown += json.dumps(data, indent=2, ensure_ascii=False)
-        markdown += "\\n```\\n"
-        return markdown
+        out.write("```json\\n")
+        try:
+            with stream or _open_text_stream(file_path) as f:
+                _reindent_json(f, out)
+        finally:
+            out.write("\\n```\\n")
     except Exception as e:
-        return f"# {Path(file_path).name}\\n\\nError converting JSON: {str(e)}"
+        out.write(f"Error converting JSON: {str(e)}")
+    return out.getvalue()
 
-def convert_csv_file(file_path):
-    """Convert CSV file to markdown table"""
+# csv.Sniffer's time grows faster than its sample; 16 KB of whole lines take about 0.1 s
+CSV_SNIFF_SIZE = 16 * 1024
+
+def _is_number(cell):
     try:
-        import csv
-        markdown = f"# {Path(file_path).name}\\n\\n"
+        float(cell)
+    except ValueError:
+        return False
+    return True
 
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            rows = list(reader)
+def _sniff_csv(sample, tab_separated):
+    """Return (dialect, has_header) for a sample of whole lines
 
-        if not rows:
-            return markdown + "Empty CSV file."
+    The first row stays the header unless csv.Sniffer votes against it and the row holds
+    a number; the sniffer's vote on a few rows of text is little more than a coin toss.
+    """
+    import csv
 
-        # Header row
-        if rows:
-            markdown += "| " + " | ".join(rows[0]) + " |\\n"
-            markdown += "| " + " | ".join(["---"] * len(rows[0])) + " |\\n"
+    default = csv.excel_tab if tab_separated else csv.excel
+    if not sample.strip():
+        return default, True
+    sniffer = csv.Sniffer()
+    try:
+        dialect = sniffer.sniff(sample, delimiters=',;\\t|')
+    except csv.Error:
+        return default, True
+    try:
+        has_header = sniffer.has_header(sample)
+    except csv.Error:
+        has_header = True
+    if not has_header:
+        first_row = next(csv.reader(sample.splitlines(True), dialect), [])
+        has_header = not any(_is_number(cell) for cell in first_row)
+    return dialect, has_header
+
+def _sample_csv_rows(rows, count):
+    """Keep count rows spread over all of rows (reservoir sampling, fixed seed); returns (rows, total)"""
+    import random
+
+    chooser = random.Random(0)
+    reservoir = []
+    seen = 0
+    for row in rows:
+        if seen < count:
+            reservoir.append((seen, row))
+        else:
+            slot = chooser.randint(0, seen)
+            if slot < count:
+                reservoir[slot] = (seen, row)
+        seen += 1
+    reservoir.sort(key=lambda item: item[0])
+    return [row for _, row in reservoir], seen
+
+def convert_csv_file(file_path, writer=None, max_rows=None, sample_rows=None):
+    """Convert a CSV or TSV file to a markdown table, writing each row as it is parsed
+
+    The dialect and header are sniffed from the start of the file. max_rows stops after
+    that many data rows; sample_rows instead keeps that many rows spread over the whole
+    file. Only the sniffed lines, and the sampled rows, are held in memory.
+    """
+    out = writer if writer is not None else MarkdownWriter()
+    out.write(f"# {os.path.basename(file_path)}\\n\\n")
+    try:
+        import csv
 
-            # Data rows
-            for row in rows[1:]:
-                # Pad row to match header length
-                padded_row = row + [""] * (len(rows[0]) - len(row))
-                markdown += "| " + " | ".join(padded_row[:len(rows[0])]) + " |\\n"
+        try:
+            csv.field_size_limit(sys.maxsize)
+        except OverflowError:
+            csv.field_size_limit(2 ** 31 - 1)
+
+        with _open_text_stream(file_path) as f:
+            lines = []
+            size = 0
+            while size < CSV_SNIFF_SIZE:
+                line = f.readline()
+                if not line:
+                    break
+                lines.append(line)
+                size += len(line)
+            dialect, has_header = _sniff_csv(''.join(lines), file_path.lower().endswith('.tsv'))
+
+            def all_lines():
+                for line in lines:
+                    yield line
+                del lines[:]
+                for line in f:
+                    yield line
+
+            rows = (row for row in csv.reader(all_lines(), dialect) if row)
+            first = next(rows, None)
+            if first is None:
+                out.write("Empty CSV file.")
+                return out.getvalue()
+
+            width = len(first)
+            if has_header:
+                out.write_table_header(first)
+            else:
+                out.write_table_header([f"Column {index}" for index in range(1, width + 1)])
+                out.write_table_row(first)
 
-        return markdown
+            note = None
+            if sample_rows is not None and sample_rows >= 0:
+                max_rows = None
+                rows, total = _sample_csv_rows(rows, sample_rows)
+                if total > len(rows):
+                    note = f"<!-- Sampled {len(rows)} of {total} rows -->"
+
+            written = 0
+            for row in rows:
+                if max_rows is not None and written >= max_rows:
+                    note = f"<!-- Showing the first {written} rows; the rest of the file was not read -->"
+                    break
+                # Pad or cut each row to the header's width
+                row = row + [""] * (width - len(row))
+                out.write_table_row(row[:width])
+                written += 1
+
+            if note:
+                out.write(f"\\n{note}\\n")
     except Exception as e:
-        return f"# {Path(file_path).name}\\n\\nError converting CSV: {str(e)}"
+        out.write(f"Error converting CSV: {str(e)}")
+    return out.getvalue()
 
-def convert_xml_file(file_path):
+def convert_xml_file(file_path, writer=None):
     """Convert XML file to formatted markdown"""
+    out = writer if writer is not None else MarkdownWriter()
+    out.write(f"# {os.path.basename(file_path)}\\n\\n")
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
 
-        markdown = f"# {Path(file_path).name}\\n\\n"
-        markdown += "```xml\\n"
-        markdown += content
-        markdown += "\\n```\\n"
-        return markdown
+        out.write("```xml\\n")
+        out.write(content)
+        out.write("\\n```\\n")
     except Exception as e:
-        return f"# {Path(file_path).name}\\n\\nError converting XML: {str(e)}"
+        out.write(f"Error converting XML: {str(e)}")
+    return out.getvalue()
 
-def convert_docx_file(file_path):
+def convert_docx_file(file_path, writer=None):
     """Convert DOCX file using python-docx"""
+    out = writer if writer is not None else MarkdownWriter()
+    out.write(f"# {os.path.basename(file_path)}\\n\\n")
     try:
         from docx import Document
 
         doc = Document(file_path)
-        file_name = Path(file_path).name
-
-        markdown = f"# {file_name}\\n\\n"
 
         # Extract paragraphs
         for paragraph in doc.paragraphs:
@@ -131,23 +502,23 @@ def convert_docx_file(file_path):
                 style_name = paragraph.style.name.lower() if paragraph.style else ""
 
                 if "heading 1" in style_name:
-                    markdown += f"# {text}\\n\\n"
+                    out.write(f"# {text}\\n\\n")
                 elif "heading 2" in style_name:
-                    markdown += f"## {text}\\n\\n"
+                    out.write(f"## {text}\\n\\n")
                 elif "heading 3" in style_name:
-                    markdown += f"### {text}\\n\\n"
+                    out.write(f"### {text}\\n\\n")
                 elif "heading 4" in style_name:
-                    markdown += f"#### {text}\\n\\n"
+                    out.write(f"#### {text}\\n\\n")
                 elif "heading 5" in style_name:
-                    markdown += f"##### {text}\\n\\n"
+                    out.write(f"##### {text}\\n\\n")
                 elif "heading 6" in style_name:
-                    markdown += f"###### {text}\\n\\n"
+                    out.write(f"###### {text}\\n\\n")
                 else:
-                    markdown += f"{text}\\n\\n"
+                    out.write(f"{text}\\n\\n")
 
         # Extract tables
         for table in doc.tables:
-            markdown += "\\n"
+            out.write("\\n")
             for i, row in enumerate(table.rows):
                 row_data = []
                 for cell in row.cells:
@@ -156,39 +527,36 @@ def convert_docx_file(file_path):
 
                 if i == 0:
                     # Header row
-                    markdown += "| " + " | ".join(row_data) + " |\\n"
-                    markdown += "| " + " | ".join(["---"] * len(row_data)) + " |\\n"
+                    out.write_table_header(row_data)
                 else:
                     # Data row
-                    markdown += "| " + " | ".join(row_data) + " |\\n"
-            markdown += "\\n"
-
-        return markdown
+                    out.write_table_row(row_data)
+            out.write("\\n")
 
     except ImportError:
-        return f"# {Path(file_path).name}\\n\\nError: python-docx library not available"
+        out.write("Error: python-docx library not available")
     except Exception as e:
-        return f"# {Path(file_path).name}\\n\\nError converting DOCX: {str(e)}"
+        out.write(f"Error converting DOCX: {str(e)}")
+    return out.getvalue()
 
-def convert_excel_file(file_path):
+def convert_excel_file(file_path, writer=None):
     """Convert Excel file using openpyxl"""
+    out = writer if writer is not None else MarkdownWriter()
+    out.write(f"# {os.path.basename(file_path)}\\n\\n")
     try:
         from openpyxl import load_workbook
 
         workbook = load_workbook(file_path, data_only=True)
-        file_name = Path(file_path).name
-
-        markdown = f"# {file_name}\\n\\n"
 
         for sheet_name in workbook.sheetnames:
             worksheet = workbook[sheet_name]
 
-            markdown += f"## {sheet_name}\\n\\n"
+            out.write(f"## {sheet_name}\\n\\n")
 
             # Get all rows with data
             rows = list(worksheet.iter_rows(values_only=True))
             if not rows:
-                markdown += "*Empty sheet*\\n\\n"
+                out.write("*Empty sheet*\\n\\n")
                 continue
 
             # Filter out completely empty rows
@@ -198,7 +566,7 @@ def convert_excel_file(file_path):
                     non_empty_rows.append(row)
 
             if not non_empty_rows:
-                markdown += "*No data found*\\n\\n"
+                out.write("*No data found*\\n\\n")
                 continue
 
             # Find the maximum number of columns with data
@@ -216,33 +584,30 @@ def convert_excel_file(file_path):
 
                 if i == 0:
                     # Header row
-                    markdown += "| " + " | ".join(row_data) + " |\\n"
-                    markdown += "| " + " | ".join(["---"] * len(row_data)) + " |\\n"
+                    out.write_table_header(row_data)
                 else:
                     # Data row
-                    markdown += "| " + " | ".join(row_data) + " |\\n"
+                    out.write_table_row(row_data)
 
-            markdown += "\\n"
-
-        return markdown
+            out.write("\\n")
 
     except ImportError:
-        return f"# {Path(file_path).name}\\n\\nError: openpyxl library not available"
+        out.write("Error: openpyxl library not available")
     except Exception as e:
-        return f"# {Path(file_path).name}\\n\\nError converting Excel: {str(e)}"
+        out.write(f"Error converting Excel: {str(e)}")
+    return out.getvalue()
 
-def convert_pptx_file(file_path):
+def convert_pptx_file(file_path, writer=None):
     """Convert PowerPoint file using python-pptx"""
+    out = writer if writer is not None else MarkdownWriter()
+    out.write(f"# {os.path.basename(file_path)}\\n\\n")
     try:
         from pptx import Presentation
 
         prs = Presentation(file_path)
-        file_name = Path(file_path).name
-
-        markdown = f"# {file_name}\\n\\n"
 
         for i, slide in enumerate(prs.slides, 1):
-            markdown += f"## Slide {i}\\n\\n"
+            out.write(f"## Slide {i}\\n\\n")
 
             # Extract text from all shapes in the slide
             slide_text = []
@@ -257,120 +622,231 @@ def convert_pptx_file(file_path):
                     for line in lines:
                         line = line.strip()
                         if line:
-                            markdown += f"{line}\\n\\n"
+                            out.write(f"{line}\\n\\n")
             else:
-                markdown += "*No text content found*\\n\\n"
+                out.write("*No text content found*\\n\\n")
 
-            markdown += "---\\n\\n"
-
-        return markdown
+            out.write("---\\n\\n")
 
     except ImportError:
-        return f"# {Path(file_path).name}\\n\\nError: python-pptx library not available"
+        out.write("Error: python-pptx library not available")
     except Exception as e:
-        return f"# {Path(file_path).name}\\n\\nError converting PowerPoint: {str(e)}"
-
-def convert_pdf_file(file_path):
-    """Convert PDF file using pdfplumber"""
-    try:
-        import pdfplumber
+        out.write(f"Error converting PowerPoint: {str(e)}")
+    return out.getvalue()
 
-        file_name = Path(file_path).name
-        markdown = f"# {file_name}\\n\\n"
+# PDFs with fewer pages than this are extracted serially; process startup would dominate
+PDF_PARALLEL_MIN_PAGES = 40
 
-        with pdfplumber.open(file_path) as pdf:
-            markdown += f"**Total Pages:** {len(pdf.pages)}\\n\\n"
+def extract_pdf_page_range(file_path, start, end):
+    """Extract (text, error) for pages [start, end); runs in a worker process that opens the PDF by path"""
+    import pdfplumber
 
-            for i, page in enumerate(pdf.pages, 1):
-                markdown += f"## Page {i}\\n\\n"
+    results = []
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages[start:end]:
+            try:
+                results.append((page.extract_text(), None))
+            except Exception as page_error:
+                results.append((None, str(page_error)))
+    return results
+
+def extract_pdf_pages(file_path, workers=None, min_pages=PDF_PARALLEL_MIN_PAGES):
+    """Extract (text, error) for every page in order, sharding large PDFs across processes"""
+    import pdfplumber
+
+    with pdfplumber.open(file_path) as pdf:
+        page_count = len(pdf.pages)
+    workers = min(workers or os.cpu_count() or 1, page_count)
+    if workers <= 1 or page_count < min_pages:
+        return extract_pdf_page_range(file_path, 0, page_count)
+
+    chunk_size = -(-page_count // workers)  # Ceiling division
+    starts = list(range(0, page_count, chunk_size))
+    ends = [min(start + chunk_size, page_count) for start in starts]
+    try:
+        from concurrent.futures import ProcessPoolExecutor
 
-                try:
-                    text = page.extract_text()
-                    if text and text.strip():
-                        # Clean up the extracted text
-                        lines = text.split('\\n')
-                        cleaned_lines = []
-                        for line in lines:
-                            line = line.strip()
-                            if line:
-                                cleaned_lines.append(line)
-
-                        if cleaned_lines:
-                            markdown += '\\n\\n'.join(cleaned_lines) + "\\n\\n"
-                        else:
-                            markdown += "*No text content found on this page*\\n\\n"
-                    else:
-                        markdown += "*No text content found on this page*\\n\\n"
+        with ProcessPoolExecutor(max_workers=len(starts)) as executor:
+            chunks = executor.map(extract_pdf_page_range, [file_path] * len(starts), starts, ends)
+            return [result for chunk in chunks for result in chunk]
+    except (OSError, RuntimeError, ImportError):
+        # Process pools can be unavailable in some environments; fall back to serial
+        return extract_pdf_page_range(file_path, 0, page_count)
 
-                except Exception as page_error:
-                    markdown += f"*Error extracting text from page {i}: {str(page_error)}*\\n\\n"
+def convert_pdf_file(file_path, pdf_workers=None, pdf_min_pages=PDF_PARALLEL_MIN_PAGES, writer=None):
+    """Convert PDF file using pdfplumber"""
+    out = writer if writer is not None else MarkdownWriter()
+    out.write(f"# {os.path.basename(file_path)}\\n\\n")
+    try:
+        import pdfplumber
 
-                markdown += "---\\n\\n"
+        page_results = extract_pdf_pages(file_path, pdf_workers, pdf_min_pages)
+        out.write(f"**Total Pages:** {len(page_results)}\\n\\n")
+
+        for i, (text, page_error) in enumerate(page_results, 1):
+            out.write(f"## Page {i}\\n\\n")
+
+            if page_error is not None:
+                out.write(f"*Error extracting text from page {i}: {page_error}*\\n\\n")
+            elif text and text.strip():
+                # Clean up the extracted text
+                lines = text.split('\\n')
+                cleaned_lines = []
+                for line in lines:
+                    line = line.strip()
+                    if line:
+                        cleaned_lines.append(line)
+
+                if cleaned_lines:
+                    out.write('\\n\\n'.join(cleaned_lines) + "\\n\\n")
+                else:
+                    out.write("*No text content found on this page*\\n\\n")
+            else:
+                out.write("*No text content found on this page*\\n\\n")
 
-        return markdown
+            out.write("---\\n\\n")
 
     except ImportError:
-        return f"# {Path(file_path).name}\\n\\nError: pdfplumber library not available"
+        out.write("Error: pdfplumber library not available")
     except Exception as e:
-        return f"# {Path(file_path).name}\\n\\nError converting PDF: {str(e)}"
+        out.write(f"Error converting PDF: {str(e)}")
+    return out.getvalue()
 
 def extract_images_from_pdf(file_path, output_dir, min_image_size=50):
     """PDF image extraction not supported in lightweight mode"""
     return [], "PDF image extraction is not supported in lightweight mode (pdfplumber does not support image extraction)"
 
-def convert_document_file(file_path, extract_images=True):
+def convert_document_file(file_path, extract_images=True, pdf_workers=None, pdf_min_pages=PDF_PARALLEL_MIN_PAGES, writer=None):
     """Convert document files using native Python libraries with optional image extraction"""
-    file_name = Path(file_path).name
-    file_ext = Path(file_path).suffix.lower()
+    out = writer if writer is not None else MarkdownWriter()
+    file_name = os.path.basename(file_path)
+    file_ext = os.path.splitext(file_path)[1].lower()
 
     try:
         # First, convert the document content
         if file_ext in ['.docx']:
-            content = convert_docx_file(file_path)
+            convert_docx_file(file_path, out)
         elif file_ext in ['.xlsx', '.xls']:
-            content = convert_excel_file(file_path)
+            convert_excel_file(file_path, out)
         elif file_ext in ['.pptx']:
-            content = convert_pptx_file(file_path)
+            convert_pptx_file(file_path, out)
         elif file_ext == '.pdf':
-            content = convert_pdf_file(file_path)
+            convert_pdf_file(file_path, pdf_workers, pdf_min_pages, out)
         else:
             # Fallback for unsupported formats
-            content = f"# {file_name}\\n\\n"
-            content += f"**Document Type:** {file_ext.upper()} file\\n\\n"
-            content += "This file type is not yet supported for full conversion.\\n\\n"
-            content += f"- **File:** {file_name}\\n"
-            content += f"- **Size:** {os.path.getsize(file_path)} bytes\\n\\n"
-            return content
+            out.write(f"# {file_name}\\n\\n")
+            out.write(f"**Document Type:** {file_ext.upper()} file\\n\\n")
+            out.write("This file type is not yet supported for full conversion.\\n\\n")
+            out.write(f"- **File:** {file_name}\\n")
+            out.write(f"- **Size:** {os.path.getsize(file_path)} bytes\\n\\n")
+            return out.getvalue()
 
         # If image extraction is enabled and we have a PDF
         if extract_images and file_ext == '.pdf':
             # Note about image extraction limitation
-            content += "\\n\\n<!-- Note: PDF image extraction is not supported in lightweight mode (using pdfplumber) -->\\n"
+            out.write("\\n\\n<!-- Note: PDF image extraction is not supported in lightweight mode (using pdfplumber) -->\\n")
 
-        return content
+        return out.getvalue()
 
     except Exception as e:
         # Error handling - return basic info with error message
-        content = f"# {file_name}\\n\\n"
-        content += f"**Error converting {file_ext.upper()} file**\\n\\n"
-        content += f"Error: {str(e)}\\n\\n"
-        content += f"- **File:** {file_name}\\n"
-        content += f"- **Size:** {os.path.getsize(file_path)} bytes\\n"
-        return content
+        out.write(f"# {file_name}\\n\\n")
+        out.write(f"**Error converting {file_ext.upper()} file**\\n\\n")
+        out.write(f"Error: {str(e)}\\n\\n")
+        out.write(f"- **File:** {file_name}\\n")
+        out.write(f"- **Size:** {os.path.getsize(file_path)} bytes\\n")
+        return out.getvalue()
+
+def convert_any_file(file_path, writer, extract_images=True, pdf_workers=None, pdf_min_pages=PDF_PARALLEL_MIN_PAGES,
+                     csv_max_rows=None, csv_sample_rows=None):
+    """Dispatch a file to the converter for its extension, writing markdown to writer"""
+    file_ext = os.path.splitext(file_path)[1].lower()
+
+    if file_ext in ['.txt', '.md', '.markdown']:
+        convert_text_file(file_path, writer)
+    elif file_ext in ['.json', '.jsonl', '.ndjson']:
+        convert_json_file(file_path, writer)
+    elif file_ext in ['.csv', '.tsv']:
+        convert_csv_file(file_path, writer, csv_max_rows, csv_sample_rows)
+    elif file_ext in ['.xml', '.html', '.htm']:
+        convert_xml_file(file_path, writer)
+    elif file_ext in ['.docx', '.doc', '.xlsx', '.xls', '.pptx', '.ppt', '.pdf']:
+        convert_document_file(file_path, extract_images, pdf_workers, pdf_min_pages, writer)
+    else:
+        # Default to text file handling for unknown extensions
+        convert_text_file(file_path, writer)
 
+def convert_to_output(file_path, output_path, extract_images=True, pdf_workers=None, pdf_min_pages=PDF_PARALLEL_MIN_PAGES,
+                      csv_max_rows=None, csv_sample_rows=None):
+    """Stream markdown into output_path via a temporary file and rename, returning a status dict"""
+    output_path = os.path.abspath(output_path)
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+
+    try:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            convert_any_file(file_path, MarkdownWriter(f), extract_images, pdf_workers, pdf_min_pages,
+                             csv_max_rows, csv_sample_rows)
+            f.write("\\n")
+        os.replace(temp_path, output_path)
+    except Exception as e:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return {'success': False, 'file_path': file_path, 'error': f"Error processing file: {str(e)}"}
+
+    return {'success': True, 'file_path': file_path, 'output_path': output_path,
+            'bytes': os.path.getsize(output_path)}
 
 def main():
-    if len(sys.argv) < 2:
+    # Split optional flags from the positional arguments
+    args = []
+    pdf_workers = None
+    pdf_min_pages = PDF_PARALLEL_MIN_PAGES
+    csv_max_rows = None
+    csv_sample_rows = None
+    output_path = None
+    argv = sys.argv[1:]
+    i = 0
+    while i < len(argv):
+        if argv[i] == '--pdf-workers' and i + 1 < len(argv):
+            pdf_workers = int(argv[i + 1])
+            i += 2
+        elif argv[i] == '--pdf-min-pages' and i + 1 < len(argv):
+            pdf_min_pages = int(argv[i + 1])
+            i += 2
+        elif argv[i] == '--csv-max-rows' and i + 1 < len(argv):
+            csv_max_rows = int(argv[i + 1])
+            i += 2
+        elif argv[i] == '--csv-sample-rows' and i + 1 < len(argv):
+            csv_sample_rows = int(argv[i + 1])
+            i += 2
+        elif argv[i] == '--output' and i + 1 < len(argv):
+            output_path = argv[i + 1]
+            i += 2
+        else:
+            args.append(argv[i])
+            i += 1
+
+    # Flags alone (e.g. only --output path) name no file either
+    if not args:
         print("DocuGenius CLI - Document to Markdown Converter", file=sys.stderr)
-        print("Usage: docugenius-cli <file> [extract_images]", file=sys.stderr)
+        print("Usage: docugenius-cli <file> [extract_images] [--pdf-workers N] [--pdf-min-pages N]", file=sys.stderr)
+        print("                      [--csv-max-rows N] [--csv-sample-rows N] [--output path]", file=sys.stderr)
         print("", file=sys.stderr)
         print("Arguments:", file=sys.stderr)
         print("  file           : Path to document file", file=sys.stderr)
         print("  extract_images : true/false to enable/disable image extraction for DOCX/PPTX/XLSX (default: true)", file=sys.stderr)
+        print("  --pdf-workers  : processes used for PDF text extraction (default: CPU count)", file=sys.stderr)
+        print(f"  --pdf-min-pages: PDFs with fewer pages are extracted serially (default: {PDF_PARALLEL_MIN_PAGES})", file=sys.stderr)
+        print("  --csv-max-rows : convert only the first N rows of a CSV/TSV file", file=sys.stderr)
+        print("  --csv-sample-rows: convert N rows sampled evenly from the whole CSV/TSV file", file=sys.stderr)
+        print("  --output       : write the markdown to this path (atomically) and print a JSON status", file=sys.stderr)
         print("", file=sys.stderr)
         print("Supported formats:", file=sys.stderr)
         print("  - Text files: .txt, .md, .markdown", file=sys.stderr)
-        print("  - Data files: .json, .csv, .xml, .html", file=sys.stderr)
+        print("  - Data files: .json, .jsonl, .csv, .tsv, .xml, .html", file=sys.stderr)
         print("  - Documents: .docx, .xlsx, .pptx (with image extraction), .pdf (text only)", file=sys.stderr)
         print("", file=sys.stderr)
         print("Features:", file=sys.stderr)
@@ -380,46 +856,148 @@ def main():
         print("  - Fast installation and execution", file=sys.stderr)
         sys.exit(1)
 
-    file_path = sys.argv[1]
+    file_path = args[0]
     extract_images = True
 
-    if len(sys.argv) > 2:
-        extract_images = sys.argv[2].lower() not in ['false', 'no', '0']
+    if len(args) > 1:
+        extract_images = args[1].lower() not in ['false', 'no', '0']
 
     if not os.path.exists(file_path):
         print(f"Error: File not found: {file_path}", file=sys.stderr)
         sys.exit(1)
 
-    file_ext = Path(file_path).suffix.lower()
+    if output_path:
+        import json
+        status = convert_to_output(file_path, output_path, extract_images, pdf_workers, pdf_min_pages,
+                                   csv_max_rows, csv_sample_rows)
+        print(json.dumps(status, ensure_ascii=False))
+        sys.exit(0 if status['success'] else 1)
 
-    try:
-        if file_ext in ['.txt', '.md', '.markdown']:
-            content = convert_text_file(file_path)
-        elif file_ext == '.json':
-            content = convert_json_file(file_path)
-        elif file_ext == '.csv':
-            content = convert_csv_file(file_path)
-        elif file_ext in ['.xml', '.html', '.htm']:
-            content = convert_xml_file(file_path)
-        elif file_ext in ['.docx', '.doc', '.xlsx', '.xls', '.pptx', '.ppt', '.pdf']:
-            content = convert_document_file(file_path, extract_images)
-        else:
-            # Default to text file handling for unknown extensions
-            content = convert_text_file(file_path)
+    # Stream markdown to stdout as it is produced instead of building one large string
+    writer = MarkdownWriter(sys.stdout)
 
-        print(content)
+    try:
+        convert_any_file(file_path, writer, extract_images, pdf_workers, pdf_min_pages, csv_max_rows, csv_sample_rows)
+        writer.write("\\n")
+        sys.stdout.flush()
 
     except Exception as e:
         print(f"Error processing file: {str(e)}", file=sys.stderr)
         sys.exit(1)
 
 if __name__ == "__main__":
+    # Required for process pools in frozen (PyInstaller) executables; a no-op otherwise
+    if getattr(sys, 'frozen', False):
+        import multiprocessing
+        multiprocessing.freeze_support()
     main()
 '''
     return cli_source
 
-def create_darwin_binary():
-    """Create macOS Universal Binary using PyInstaller (supports both Intel and Apple Silicon)"""
+# Directory the onedir build keeps its libraries in, beside bin/darwin/docugenius-cli
+CLI_RUNTIME_DIR = "docugenius-cli-runtime"
+
+# Modules the CLI never imports. PyInstaller would otherwise bundle whatever the document
+# libraries reference; pypdfium2 is only needed by pdfplumber to render pages as images
+CLI_EXCLUDED_MODULES = [
+    'tkinter', '_tkinter', 'turtle', 'turtledemo', 'idlelib',
+    'unittest', 'doctest', 'test', 'pydoc', 'pydoc_data', 'lib2to3',
+    'distutils', 'setuptools', 'pkg_resources', 'pip',
+    'curses', 'sqlite3', 'xmlrpc',
+    'pypdfium2', 'pdfplumber.display', 'PIL.ImageTk', 'PIL.ImageQt', 'numpy',
+]
+
+def pyinstaller_command(cli_file, onefile=False, target_arch=None):
+    """PyInstaller command line for the macOS CLI
+
+    The default onedir build unpacks nothing at startup: the executable loads its
+    libraries from CLI_RUNTIME_DIR in place (--contents-directory needs PyInstaller 6).
+    A onefile build extracts the whole bundle into a new temporary directory on every
+    run, which the extension pays for every file.
+    """
+    command = "python -m PyInstaller --noconfirm --name docugenius-cli"
+    command += " --onefile" if onefile else f" --onedir --contents-directory {CLI_RUNTIME_DIR}"
+    if target_arch:
+        command += f" --target-arch={target_arch}"
+    command += " --strip --optimize=2"
+    command += "".join(f" --exclude-module {module}" for module in CLI_EXCLUDED_MODULES)
+    return f"{command} {cli_file}"
+
+def measure_startup(executable, runs=5):
+    """Time the CLI converting a one-line text file: the first run, then the median of runs more
+
+    The first run after a build is the cold one: macOS checks the new binary's signature
+    and nothing of it has run yet. Files just written by the build can still be in the
+    page cache, so a cold start after a reboot is slower again.
+    """
+    import statistics
+    import time
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        sample = os.path.join(work_dir, "startup.txt")
+        with open(sample, 'w', encoding='utf-8') as f:
+            f.write("DocuGenius startup check\n")
+
+        times = []
+        for _ in range(runs + 1):
+            start = time.perf_counter()
+            result = subprocess.run([str(executable), sample, 'false'], capture_output=True)
+            times.append((time.perf_counter() - start) * 1000)
+            if result.returncode != 0:
+                return None
+
+    return {'cold_ms': round(times[0], 1), 'warm_ms': round(statistics.median(times[1:]), 1), 'runs': runs}
+
+def report_startup(executable):
+    """Print the cold and warm startup times of the CLI"""
+    timing = measure_startup(executable)
+    if timing is None:
+        print(f"⚠️  {executable} failed to convert a text file; startup time not measured")
+        return False
+    print(f"⏱️  Startup: cold {timing['cold_ms']:.0f} ms, warm {timing['warm_ms']:.0f} ms (median of {timing['runs']} runs)")
+    return True
+
+def install_darwin_binary(dist_dir, onefile):
+    """Copy the PyInstaller output into bin/darwin and return the executable's path
+
+    Both layouts put the executable at bin/darwin/docugenius-cli, the path the extension
+    runs; a onedir build adds its CLI_RUNTIME_DIR beside it. Whatever the other mode left
+    there is removed first.
+    """
+    darwin_dir = Path("bin/darwin")
+    darwin_dir.mkdir(parents=True, exist_ok=True)
+    target_path = darwin_dir / "docugenius-cli"
+    runtime_path = darwin_dir / CLI_RUNTIME_DIR
+
+    if target_path.exists():
+        target_path.unlink()
+    if runtime_path.exists():
+        shutil.rmtree(runtime_path)
+
+    if onefile:
+        shutil.copy2(Path(dist_dir) / "docugenius-cli", target_path)
+    else:
+        bundle_dir = Path(dist_dir) / "docugenius-cli"
+        shutil.copy2(bundle_dir / "docugenius-cli", target_path)
+        # Frameworks in the bundle are linked with symlinks; keep them as links
+        shutil.copytree(bundle_dir / CLI_RUNTIME_DIR, runtime_path, symlinks=True)
+
+    os.chmod(target_path, 0o755)
+    return target_path
+
+def directory_size(path):
+    """Total size of the files under path, or of path itself if it is a file"""
+    path = Path(path)
+    if path.is_file():
+        return path.stat().st_size
+    return sum(entry.stat().st_size for entry in path.rglob('*') if entry.is_file() and not entry.is_symlink())
+
+def create_darwin_binary(onefile=False):
+    """Create macOS Universal Binary using PyInstaller (supports both Intel and Apple Silicon)
+
+    Builds a onedir bundle by default; onefile builds the single self-extracting executable
+    of earlier releases.
+    """
     print("🔨 Building DocuGenius macOS Universal Binary")
     print("=" * 50)
 
@@ -464,15 +1042,16 @@ def create_darwin_binary():
 
         # Build the executable with universal binary support
         print("🔨 Building Universal Binary executable...")
+        print(f"📦 Layout: {'onefile (extracted on every run)' if onefile else f'onedir (libraries in bin/darwin/{CLI_RUNTIME_DIR})'}")
         # Use --target-arch=universal2 for universal binary support
-        build_cmd = f"source {env_dir}/bin/activate && python -m PyInstaller --onefile --name docugenius-cli --target-arch=universal2 --strip --optimize=2 {cli_file}"
+        build_cmd = f"source {env_dir}/bin/activate && {pyinstaller_command(cli_file, onefile, 'universal2')}"
 
         success, stdout, stderr = run_command(build_cmd, capture_output=False)
 
         if not success:
             print("⚠️  Universal binary build failed, falling back to current architecture...")
             # Fallback to current architecture if universal build fails
-            build_cmd = f"source {env_dir}/bin/activate && python -m PyInstaller --onefile --name docugenius-cli --strip --optimize=2 {cli_file}"
+            build_cmd = f"source {env_dir}/bin/activate && {pyinstaller_command(cli_file, onefile)}"
             success, stdout, stderr = run_command(build_cmd, capture_output=False)
             
             if not success:
@@ -480,21 +1059,14 @@ def create_darwin_binary():
                 return False
 
         # Check if the executable was created
-        exe_path = "dist/docugenius-cli"
+        exe_path = "dist/docugenius-cli" if onefile else "dist/docugenius-cli/docugenius-cli"
 
         if not os.path.exists(exe_path):
             print("❌ Executable not found after build")
             return False
 
-        # Create the bin/darwin directory if it doesn't exist
-        darwin_dir = Path("bin/darwin")
-        darwin_dir.mkdir(parents=True, exist_ok=True)
-
-        # Copy the executable to the bin directory
-        target_path = darwin_dir / "docugenius-cli"
-
-        shutil.copy2(exe_path, target_path)
-        os.chmod(target_path, 0o755)
+        # Copy the executable (and the onedir runtime) to the bin directory
+        target_path = install_darwin_binary("dist", onefile)
 
         # Check if it's a universal binary
         try:
@@ -514,6 +1086,9 @@ def create_darwin_binary():
             print(f"⚠️  Could not verify binary architecture: {e}")
 
         print(f"📊 File size: {os.path.getsize(target_path) / (1024*1024):.1f} MB")
+        if not onefile:
+            print(f"📊 Runtime size: {directory_size(target_path.parent / CLI_RUNTIME_DIR) / (1024*1024):.1f} MB")
+        report_startup(target_path)
 
         # Clean up build artifacts
         cleanup_dirs = ['build', 'dist', env_dir]
@@ -624,16 +1199,28 @@ def main():
 
     platform = sys.platform
 
-    if len(sys.argv) > 1:
-        target = sys.argv[1].lower()
+    # --onefile builds the single self-extracting macOS executable instead of a onedir bundle
+    args = [arg for arg in sys.argv[1:] if arg != "--onefile"]
+    onefile = "--onefile" in sys.argv[1:]
+
+    if args:
+        target = args[0].lower()
     else:
         target = "all"
 
+    if target == "startup":
+        # Measure an existing binary: python build_binaries.py startup [path]
+        executable = args[1] if len(args) > 1 else "bin/darwin/docugenius-cli"
+        if not os.path.exists(executable):
+            print(f"❌ Binary not found: {executable}")
+            sys.exit(1)
+        sys.exit(0 if report_startup(executable) else 1)
+
     success = True
 
     if target in ["all", "darwin", "macos"]:
         if platform == "darwin" or target != "all":
-            success &= create_darwin_binary()
+            success &= create_darwin_binary(onefile)
         else:
             print("⚠️  Skipping macOS binary (not on macOS)")
 
@@ -646,6 +1233,9 @@ def main():
         if os.path.exists("bin/darwin/docugenius-cli"):
             size = os.path.getsize("bin/darwin/docugenius-cli") / (1024*1024)
             print(f"   - bin/darwin/docugenius-cli ({size:.1f} MB)")
+        if os.path.exists(f"bin/darwin/{CLI_RUNTIME_DIR}"):
+            size = directory_size(f"bin/darwin/{CLI_RUNTIME_DIR}") / (1024*1024)
+            print(f"   - bin/darwin/{CLI_RUNTIME_DIR}/ ({size:.1f} MB)")
         if os.path.exists("bin/win32/docugenius-cli.bat"):
             size = os.path.getsize("bin/win32/docugenius-cli.bat")
             print(f"   - bin/win32/docugenius-cli.bat ({size} bytes)")
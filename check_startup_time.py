@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Startup-time check for the DocuGenius converter entry points
+Runs converter.py under `python -X importtime` for every document format and fails when
+the time spent importing modules exceeds a budget, or when a conversion imports the
+library of a format it is not converting.
+
+Usage:
+    python check_startup_time.py [--bin-dir bin/win32] [--formats docx,xlsx,pptx,pdf]
+                                 [--budget-ms 30] [--format-budget-ms 500]
+                                 [--repeat 3] [--cli] [--output startup.json]
+
+The extension spawns one converter process per file, so every millisecond spent on
+imports is paid again for every converted file. Three kinds of run are checked:
+    startup  converter.py with no arguments: the cost of its module-level imports
+    cold     a first conversion, which has to import the format's library
+    cached   the same conversion again, answered from DocuGenius/.cache without
+             importing any format library
+With --cli the CLI that build_binaries.py builds for macOS is checked as well.
+"""
+
+import os
+import sys
+import json
+import shutil
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+
+from benchmark_converters import FORMATS, corpus_file, default_bin_dir
+
+# Small documents: the check is about imports, not conversion work
+DOCUMENTS = {
+    'docx': {'pages': 1, 'images': 1},
+    'xlsx': {'rows': 20, 'sheets': 1},
+    'pptx': {'slides': 2},
+    'pdf': {'pages': 1},
+}
+
+
+def parse_importtime(stderr):
+    """Return [(module, cumulative microseconds)] for the top-level imports of the script
+
+    Imports made while the interpreter starts (everything up to and including site)
+    are left out; they are the same for every script and outside the converter's control.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # The header line
+        name = fields[2]
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 0:
+            imports.append((name.strip(), int(fields[1])))
+
+    for index, (name, _) in enumerate(imports):
+        if name == 'site':
+            return imports[index + 1:]
+    return imports
+
+
+def all_imported(stderr):
+    """Names of every module imported by the run, at any depth"""
+    return {line.split('|')[2].strip() for line in stderr.splitlines()
+            if line.startswith('import time:') and line.count('|') == 2}
+
+
+def run_importtime(command, cwd):
+    """Run command under -X importtime; returns (import ms, top-level imports, all module names, error)"""
+    # Installed converters cache their bytecode after the first run; measure that steady state
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    completed = subprocess.run([sys.executable, '-X', 'importtime'] + command,
+                               capture_output=True, text=True, cwd=cwd, env=env)
+    imports = parse_importtime(completed.stderr)
+    error = None
+    if completed.returncode not in (0, 1) or (completed.returncode == 1 and len(command) > 1):
+        # converter.py without arguments prints its usage and exits with 1
+        error = ([line for line in completed.stderr.splitlines() if not line.startswith('import time:')]
+                 or completed.stdout.splitlines() or ['no output'])[-1]
+    return sum(micros for _, micros in imports) / 1000, imports, all_imported(completed.stderr), error
+
+
+def check(name, command, cwd, budget_ms, forbidden, repeat, prepare=None):
+    """Run one scenario repeat times and compare the median import time against the budget
+
+    A first, unmeasured run writes the bytecode caches and warms the file system cache.
+    """
+    times = []
+    slowest = []
+    modules = set()
+    error = None
+    for run in range(repeat + 1):
+        if prepare:
+            prepare()
+        import_ms, imports, modules, error = run_importtime(command, cwd)
+        if error:
+            break
+        if run == 0:
+            continue
+        times.append(import_ms)
+        slowest = sorted(imports, key=lambda item: item[1], reverse=True)[:5]
+
+    result = {'scenario': name, 'budget_ms': budget_ms}
+    if error:
+        result.update(passed=False, error=error)
+        return result
+
+    unexpected = sorted(module for module in forbidden if module in modules)
+    result.update(
+        import_ms=round(statistics.median(times), 2),
+        slowest=[{'module': module, 'ms': round(micros / 1000, 2)} for module, micros in slowest],
+        unexpected_imports=unexpected,
+    )
+    result['passed'] = result['import_ms'] <= budget_ms and not unexpected
+    return result
+
+
+def format_modules(bin_dir):
+    """Top-level library modules of each format, as the converter declares them"""
+    sys.path.insert(0, str(bin_dir))
+    try:
+        from converter import FORMAT_MODULES
+    finally:
+        sys.path.pop(0)
+    return {ext.lstrip('.'): modules for ext, modules in FORMAT_MODULES.items()}
+
+
+def converter_scenarios(bin_dir, formats, documents, work_dir, args):
+    """Check converter.py: startup, then a cold and a cached conversion per format"""
+    converter = str(Path(bin_dir) / 'converter.py')
+    modules = format_modules(bin_dir)
+    every_library = {module for fmt_modules in modules.values() for module in fmt_modules}
+
+    results = [check('converter startup', [converter], work_dir, args.budget_ms,
+                     every_library | {'image_extractor'}, args.repeat)]
+
+    for fmt in formats:
+        document = os.path.join(work_dir, documents[fmt].name)
+        output = os.path.join(work_dir, 'DocuGenius', f"{fmt}.md")
+        command = [converter, document, 'true', '--output', output]
+        other_libraries = every_library - set(modules.get(fmt, []))
+
+        def clear_cache():
+            shutil.rmtree(os.path.join(work_dir, 'DocuGenius'), ignore_errors=True)
+
+        results.append(check(f"converter {fmt} cold", command, work_dir, args.format_budget_ms,
+                             other_libraries, args.repeat, prepare=clear_cache))
+        # The last cold run left its cache entry behind
+        results.append(check(f"converter {fmt} cached", command, work_dir, args.budget_ms,
+                             every_library | {'image_extractor'}, args.repeat))
+    return results
+
+
+def cli_scenarios(formats, documents, work_dir, args, modules):
+    """Check the CLI source that build_binaries.py freezes into the macOS binary"""
+    from build_binaries import create_cli_source
+
+    cli_path = os.path.join(work_dir, 'docugenius_cli.py')
+    with open(cli_path, 'w', encoding='utf-8') as f:
+        f.write(create_cli_source())
+
+    every_library = {module for fmt_modules in modules.values() for module in fmt_modules}
+    results = [check('cli startup', [cli_path], work_dir, args.budget_ms, every_library, args.repeat)]
+    for fmt in formats:
+        document = os.path.join(work_dir, documents[fmt].name)
+        output = os.path.join(work_dir, 'cli', f"{fmt}.md")
+        results.append(check(f"cli {fmt}", [cli_path, document, 'false', '--output', output], work_dir,
+                             args.format_budget_ms, every_library - set(modules.get(fmt, [])), args.repeat))
+    return results
+
+
+def print_results(results):
+    """Print one line per scenario, plus the slowest imports of the failing ones"""
+    for result in results:
+        status = 'ok  ' if result['passed'] else 'FAIL'
+        if 'error' in result:
+            print(f"{status} {result['scenario']:<24} error: {result['error']}")
+            continue
+        line = f"{status} {result['scenario']:<24} {result['import_ms']:8.1f} ms  (budget {result['budget_ms']} ms)"
+        if result['unexpected_imports']:
+            line += f"  unexpected imports: {', '.join(result['unexpected_imports'])}"
+        print(line)
+        if not result['passed']:
+            for entry in result['slowest']:
+                print(f"         {entry['module']:<30} {entry['ms']:8.1f} ms")
+
+
+def parse_args(args):
+    """Parse the check's command line"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Check the import-time budget of the DocuGenius converters')
+    parser.add_argument('--bin-dir', default=str(default_bin_dir()), help='directory containing converter.py')
+    parser.add_argument('--formats', default=','.join(FORMATS), help='comma-separated formats (default: all)')
+    parser.add_argument('--budget-ms', type=float, default=30,
+                        help='import budget of startup and cached runs in milliseconds (default: 30)')
+    parser.add_argument('--format-budget-ms', type=float, default=500,
+                        help='import budget of a cold conversion, format library included (default: 500)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per scenario; the median is checked (default: 3)')
+    parser.add_argument('--cli', action='store_true', help='also check the CLI built by build_binaries.py')
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    return parser.parse_args(args)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    args.bin_dir = os.path.abspath(args.bin_dir)
+    formats = [fmt for fmt in args.formats.split(',') if fmt]
+    unknown = [fmt for fmt in formats if fmt not in FORMATS]
+    if unknown:
+        print(f"Error: unknown format: {', '.join(unknown)}")
+        return 2
+
+    work_dir = tempfile.mkdtemp(prefix='docugenius-startup-')
+    try:
+        documents = {}
+        for fmt in formats:
+            document = corpus_file(work_dir, fmt, DOCUMENTS[fmt])
+            documents[fmt] = document
+
+        results = converter_scenarios(args.bin_dir, formats, documents, work_dir, args)
+        if args.cli:
+            results += cli_scenarios(formats, documents, work_dir, args, format_modules(args.bin_dir))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'results': results}, f, indent=2, ensure_ascii=False)
+
+    failures = [result['scenario'] for result in results if not result['passed']]
+    if failures:
+        print(f"\n{len(failures)} scenario(s) over budget: {', '.join(failures)}")
+        return 1
+    print("\nAll scenarios within budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
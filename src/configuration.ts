@@ -45,6 +45,14 @@ export class ConfigurationManager {
         return config.get<boolean>('extractImages', true);
     }
 
+    /**
+     * Check if the converter's per-stage timing and memory profile should be logged
+     */
+    shouldLogConversionProfile(): boolean {
+        const config = vscode.workspace.getConfiguration(ConfigurationManager.SECTION);
+        return config.get<boolean>('logConversionProfile', false);
+    }
+
     /**
      * Get minimum image size for extraction
      */
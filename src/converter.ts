@@ -1,8 +1,9 @@
 import * as vscode from 'vscode';
 import * as fs from 'fs';
+import * as buffer from 'buffer';
 import * as path from 'path';
 import { exec } from 'child_process';
-import { promisify } from 'util';
+import { promisify, TextDecoder } from 'util';
 import { ConfigurationManager } from './configuration';
 import { StatusManager } from './statusManager';
 
@@ -14,6 +15,30 @@ export interface ConversionResult {
     error?: string;
 }
 
+/**
+ * JSON status printed by the converter when it writes its output with --output
+ */
+interface ConverterStatus {
+    success: boolean;
+    output_path?: string;
+    bytes?: number;
+    error?: string;
+}
+
+/**
+ * Prefix of the stderr line carrying the converter's --profile report
+ */
+const PROFILE_PREFIX = 'DOCUGENIUS_PROFILE ';
+
+/**
+ * Per-stage timing and memory report printed by the converter when called with --profile
+ */
+interface ConverterProfile {
+    total?: { wall_seconds: number; cpu_seconds: number; peak_traced_bytes: number };
+    stages?: { name: string; depth: number; wall_seconds: number; cpu_seconds: number; peak_traced_bytes: number }[];
+    counters?: { [name: string]: number };
+}
+
 export class MarkitdownConverter {
     private context: vscode.ExtensionContext;
     private configManager: ConfigurationManager;
@@ -81,19 +106,20 @@ export class MarkitdownConverter {
                 progress.report({ increment: 0 });
                 
                 try {
-                    // Convert using built-in conversion engine
-                    const markdownContent = await this.callConverter(filePath);
+                    // Convert using built-in conversion engine; the converter writes outputPath itself
+                    const status = await this.callConverter(filePath, outputPath);
                     
                     progress.report({ increment: 50 });
                     
-                    // Check if document splitting is needed
-                    if (this.configManager.isDocumentSplittingEnabled() && 
-                        markdownContent.length > this.configManager.getDocumentSplittingThreshold()) {
-                        // Split the document into multiple files
-                        await this.splitAndSaveDocument(outputPath, markdownContent, fileName);
-                    } else {
-                        // Save the markdown file as a single file
-                        fs.writeFileSync(outputPath, markdownContent, 'utf8');
+                    // Check if document splitting is needed (the byte size bounds the character count,
+                    // so the document is only read back when it might exceed the threshold)
+                    const threshold = this.configManager.getDocumentSplittingThreshold();
+                    if (this.configManager.isDocumentSplittingEnabled() && (status.bytes ?? 0) > threshold) {
+                        const markdownContent = fs.readFileSync(outputPath, 'utf8');
+                        if (markdownContent.length > threshold) {
+                            // Split the document into multiple files
+                            await this.splitAndSaveDocument(outputPath, markdownContent, fileName);
+                        }
                     }
                     
                     progress.report({ increment: 100 });
@@ -237,9 +263,9 @@ export class MarkitdownConverter {
     }
 
     /**
-     * Call built-in converter to convert file
+     * Call built-in converter to convert file, writing the markdown straight to outputPath
      */
-    private async callConverter(filePath: string): Promise<string> {
+    private async callConverter(filePath: string, outputPath: string): Promise<ConverterStatus> {
         try {
             // Try embedded binary first, then fallback to system installations
             const commands = this.getConverterCommands();
@@ -254,20 +280,26 @@ export class MarkitdownConverter {
                     const isPythonConverter = command.includes('converter.py') || 
                                             (process.platform === 'win32' && command.includes('docugenius-cli.bat'));
                     let fullCommand: string;
+                    // The converter writes the document itself (atomically) and prints only a JSON status
+                    const outputArg = `--output "${outputPath}"`;
                     
                     if (isPythonConverter) {
                         // Pass extract images configuration to Python converter
                         const extractImages = this.configManager.shouldExtractImages();
-                        fullCommand = `"${command}" "${filePath}" ${extractImages ? 'true' : 'false'}`;
+                        const profileArg = this.configManager.shouldLogConversionProfile() ? ' --profile' : '';
+                        // Keep the cache under the configured subdirectory so the watcher ignores it
+                        const cacheArg = ` --cache-dir "${this.getCacheDir(filePath)}"`;
+                        fullCommand = `"${command}" "${filePath}" ${extractImages ? 'true' : 'false'} ${outputArg}${profileArg}${cacheArg}`;
                     } else {
-                        fullCommand = `"${command}" "${filePath}"`;
+                        fullCommand = `"${command}" "${filePath}" ${outputArg}`;
                     }
                     
                     // Add timeout for Windows to prevent hanging
                     const timeout = process.platform === 'win32' ? 120000 : 180000; // 2min for Windows, 3min for others
                     
                     const { stdout, stderr } = await Promise.race([
-                        execAsync(fullCommand, { maxBuffer: 50 * 1024 * 1024 }), // 50MB buffer for large files
+                        // stdout only carries the status line; the headroom is for library warnings on stderr
+                        execAsync(fullCommand, { maxBuffer: 10 * 1024 * 1024 }),
                         new Promise<never>((_, reject) => 
                             setTimeout(() => reject(new Error(`Conversion timeout after ${timeout/1000}s`)), timeout)
                         )
@@ -277,8 +309,14 @@ export class MarkitdownConverter {
                         throw new Error(`Converter error: ${stderr}`);
                     }
 
-                    // Process the markdown content to handle images if needed
-                    let markdownContent = stdout;
+                    const status = this.parseConverterStatus(stdout);
+                    if (!status.success) {
+                        throw new Error(status.error || 'Conversion failed');
+                    }
+
+                    if (stderr) {
+                        this.logConverterProfile(filePath, stderr);
+                    }
 
                     // Check if we used Python converter (which includes image extraction)
                     // For Windows, we use docugenius-cli.bat which calls converter.py internally
@@ -289,10 +327,12 @@ export class MarkitdownConverter {
                     if (this.configManager.shouldExtractImages() && !usedPythonConverter) {
                         // Only do additional image processing if we didn't use Python converter
                         // Python converter already includes intelligent image extraction
-                        markdownContent = await this.processImages(filePath, markdownContent);
+                        const markdownContent = fs.readFileSync(outputPath, 'utf8');
+                        fs.writeFileSync(outputPath, await this.processImages(filePath, markdownContent), 'utf8');
+                        status.bytes = fs.statSync(outputPath).size;
                     }
 
-                    return markdownContent;
+                    return status;
 
                 } catch (error) {
                     lastError = error instanceof Error ? error : new Error(String(error));
@@ -326,6 +366,50 @@ export class MarkitdownConverter {
 
 
 
+    /**
+     * Parse the JSON status line the converter prints when called with --output
+     */
+    private parseConverterStatus(stdout: string): ConverterStatus {
+        const lines = stdout.split(/\r?\n/).map(line => line.trim()).filter(line => line.startsWith('{'));
+        if (lines.length === 0) {
+            throw new Error(`Unexpected converter output: ${stdout.slice(0, 200)}`);
+        }
+        return JSON.parse(lines[lines.length - 1]) as ConverterStatus;
+    }
+
+    /**
+     * Log the per-stage profile the converter writes to stderr when called with --profile
+     */
+    private logConverterProfile(filePath: string, stderr: string): void {
+        const line = stderr.split(/\r?\n/).find(l => l.startsWith(PROFILE_PREFIX));
+        if (!line) {
+            return;
+        }
+
+        let profile: ConverterProfile;
+        try {
+            profile = JSON.parse(line.slice(PROFILE_PREFIX.length)) as ConverterProfile;
+        } catch (error) {
+            console.log(`Unreadable converter profile: ${error}`);
+            return;
+        }
+
+        const megabytes = (bytes: number) => `${(bytes / (1024 * 1024)).toFixed(1)} MB`;
+        const total = profile.total;
+        this.statusManager.log(`⏱ Profile: ${path.basename(filePath)}` +
+            (total ? ` - ${total.wall_seconds}s wall, ${total.cpu_seconds}s CPU, ${megabytes(total.peak_traced_bytes)} peak` : ''));
+
+        for (const stage of profile.stages || []) {
+            this.statusManager.log(`   ${'  '.repeat(stage.depth)}${stage.name}: ${stage.wall_seconds}s wall, ` +
+                `${stage.cpu_seconds}s CPU, ${megabytes(stage.peak_traced_bytes)} peak`);
+        }
+
+        const counters = Object.entries(profile.counters || {}).map(([name, value]) => `${name}=${value}`);
+        if (counters.length > 0) {
+            this.statusManager.log(`   ${counters.join(', ')}`);
+        }
+    }
+
     /**
      * Get output path for converted/copied file
      */
@@ -368,6 +452,14 @@ export class MarkitdownConverter {
         }
     }
 
+    /**
+     * Get the Python converter's cache folder for a file: <subdirectory>/.cache beside it
+     */
+    private getCacheDir(filePath: string): string {
+        const subdirName = this.configManager.getMarkdownSubdirectoryName();
+        return path.join(path.dirname(filePath), subdirName, '.cache');
+    }
+
     /**
      * Check if conversion is needed
      */
@@ -462,9 +554,14 @@ export class MarkitdownConverter {
             const fileName = path.basename(filePath);
             this.statusManager.showConversionInProgress(fileName);
 
-            // Copy the file
-            const fileContent = fs.readFileSync(filePath, 'utf8');
-            fs.writeFileSync(outputPath, fileContent, 'utf8');
+            // Valid UTF-8 would be written back unchanged, so it is copied by the OS (a reflink
+            // where the file system supports it) instead of being decoded and re-encoded
+            if (await this.isUtf8File(filePath)) {
+                await fs.promises.copyFile(filePath, outputPath, fs.constants.COPYFILE_FICLONE);
+            } else {
+                const fileContent = fs.readFileSync(filePath, 'utf8');
+                fs.writeFileSync(outputPath, fileContent, 'utf8');
+            }
 
             // Show success message (suppress notification in batch mode)
             this.statusManager.showConversionSuccess(filePath, outputPath, this.isBatchMode);
@@ -483,6 +580,54 @@ export class MarkitdownConverter {
         }
     }
 
+    /**
+     * Check in one streaming pass whether a file is valid UTF-8, without holding its text in memory
+     */
+    private async isUtf8File(filePath: string): Promise<boolean> {
+        // buffer.isUtf8 (Node 18.14+) validates without decoding; older runtimes decode and discard the text
+        const isUtf8 = (buffer as unknown as { isUtf8?: (input: Uint8Array) => boolean }).isUtf8;
+        const decoder = new TextDecoder('utf-8', { fatal: true });
+        let carry = Buffer.alloc(0);
+        try {
+            for await (const data of fs.createReadStream(filePath, { highWaterMark: 1024 * 1024 })) {
+                const chunk = data as Buffer;
+                if (!isUtf8) {
+                    decoder.decode(chunk, { stream: true });
+                    continue;
+                }
+                // A character split across chunks is carried over and validated with the next chunk
+                const bytes = carry.length ? Buffer.concat([carry, chunk]) : chunk;
+                const end = bytes.length - this.incompleteUtf8Tail(bytes);
+                if (!isUtf8(bytes.subarray(0, end))) {
+                    return false;
+                }
+                carry = bytes.subarray(end);
+            }
+            if (isUtf8) {
+                return carry.length === 0;
+            }
+            decoder.decode();
+            return true;
+        } catch (error) {
+            return false;
+        }
+    }
+
+    /**
+     * Number of bytes at the end of data that begin a UTF-8 character continued after it
+     */
+    private incompleteUtf8Tail(data: Buffer): number {
+        for (let back = 1; back <= Math.min(3, data.length); back++) {
+            const byte = data[data.length - back];
+            if ((byte & 0xc0) !== 0x80) {
+                // A lead byte announces the length of its character: 110xxxxx two bytes, 1110xxxx three, 11110xxx four
+                const length = byte >= 0xf0 ? 4 : byte >= 0xe0 ? 3 : byte >= 0xc0 ? 2 : 1;
+                return length > back ? back : 0;
+            }
+        }
+        return 0;
+    }
+
     /**
      * Handle file deletion - clean up corresponding markdown file and assets
      */
@@ -536,6 +681,17 @@ export class MarkitdownConverter {
                 this.statusManager.log(`🗑️ Deleted legacy assets: ${originalBaseName}_assets/`);
             }
 
+            // Remove the file's segment manifests (<file name>.<kind>.json); conversion
+            // entries are keyed by content and pruned by the cache itself
+            const segmentsDir = path.join(this.getCacheDir(filePath), 'segments');
+            for (const kind of ['content', 'text']) {
+                const manifestPath = path.join(segmentsDir, `${fileName}.${kind}.json`);
+                if (fs.existsSync(manifestPath)) {
+                    fs.unlinkSync(manifestPath);
+                    console.log(`Deleted segment manifest: ${manifestPath}`);
+                }
+            }
+
             // Show status update
             this.statusManager.updateStatusBar(`🗑️ Cleaned up ${fileName}`, `Deleted markdown file and assets for ${fileName}`);
 
@@ -849,6 +1005,11 @@ export class MarkitdownConverter {
             return;
         }
         
+        // The parts and index replace the single document the converter wrote
+        if (fs.existsSync(outputPath)) {
+            fs.unlinkSync(outputPath);
+        }
+
         // Save multiple parts
         const dir = path.dirname(outputPath);
         const baseName = path.basename(outputPath, '.md');
@@ -0,0 +1,32 @@
+"""Shared pytest setup: the converter modules are imported from bin/win32"""
+
+import os
+import struct
+import sys
+import zlib
+
+import pytest
+
+BIN_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bin', 'win32')
+sys.path.insert(0, BIN_DIR)
+
+
+@pytest.fixture
+def converter_script():
+    """Path of the converter.py run by the subprocess tests"""
+    return os.path.join(BIN_DIR, 'converter.py')
+
+
+@pytest.fixture
+def make_png():
+    """Factory for small solid-colour PNG files: make_png(width, height, red) -> bytes"""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+    def make(width, height, red=0):
+        pixels = b''.join(b'\x00' + bytes([red, 0, 0]) * width for _ in range(height))
+        header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+        return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(pixels))
+                + chunk(b'IEND', b''))
+
+    return make
@@ -0,0 +1,77 @@
+"""Batch mode: one JSON line per finished file, then a summary line"""
+
+import io
+import json
+import subprocess
+import sys
+
+from converter import _parse_batch_args, run_batch
+
+
+def write_notes(directory, count):
+    paths = []
+    for i in range(count):
+        path = directory / f'note{i}.txt'
+        path.write_text(f'note number {i}', encoding='utf-8')
+        paths.append(str(path))
+    return paths
+
+
+def test_each_file_gets_a_result_line_and_the_summary_comes_last(tmp_path):
+    paths = write_notes(tmp_path, 3) + [str(tmp_path / 'missing.txt')]
+    output = io.StringIO()
+
+    failed = run_batch(paths, jobs=1, output_stream=output)
+
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    results, summary = lines[:-1], lines[-1]
+    assert failed == 1
+    assert sorted(result['file_path'] for result in results) == sorted(paths)
+    for result in results:
+        assert 'elapsed' in result
+        if result['file_path'].endswith('missing.txt'):
+            assert not result['success'] and result['error']
+        else:
+            assert result['success'] and 'note number' in result['markdown']
+    assert summary['type'] == 'summary'
+    assert (summary['total'], summary['succeeded'], summary['failed']) == (4, 3, 1)
+
+
+def test_jobs_are_capped_by_the_number_of_files(tmp_path):
+    output = io.StringIO()
+
+    run_batch(write_notes(tmp_path, 2), jobs=1, output_stream=output)
+    run_batch(write_notes(tmp_path, 1), jobs=8, output_stream=output)
+
+    summaries = [json.loads(line) for line in output.getvalue().splitlines() if '"summary"' in line]
+    assert [summary['jobs'] for summary in summaries] == [1, 1]
+
+
+def test_batch_arguments_and_manifest(tmp_path):
+    manifest = tmp_path / 'files.txt'
+    manifest.write_text('\ufeff# sources\nfirst.txt\n\n  second.docx  \n', encoding='utf-8')
+
+    file_paths, extract_images, jobs, options = _parse_batch_args(
+        ['--jobs', '4', '--manifest', str(manifest), '--no-images', '--pdf-min-pages', '10', 'third.pdf'])
+
+    assert file_paths == ['first.txt', 'second.docx', 'third.pdf']
+    assert extract_images is False
+    assert jobs == 4
+    assert options == {'pdf_min_pages': 10}
+
+
+def test_process_pool_batch_exits_with_the_failure_status(converter_script, tmp_path):
+    paths = write_notes(tmp_path, 3)
+
+    completed = subprocess.run([sys.executable, converter_script, '--batch', '--jobs', '2'] + paths,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, encoding='utf-8', timeout=120)
+    failing = subprocess.run([sys.executable, converter_script, '--batch', '--jobs', '2', paths[0],
+                              str(tmp_path / 'missing.txt')],
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, encoding='utf-8', timeout=120)
+
+    lines = [json.loads(line) for line in completed.stdout.splitlines()]
+    assert completed.returncode == 0
+    assert sorted(line['file_path'] for line in lines[:-1]) == sorted(paths)
+    assert lines[-1]['jobs'] == 2 and lines[-1]['failed'] == 0
+    assert failing.returncode == 1
+    assert json.loads(failing.stdout.splitlines()[-1])['failed'] == 1
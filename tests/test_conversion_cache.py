@@ -0,0 +1,106 @@
+"""Conversion cache: content-hash keys, invalidation and where entries are stored"""
+
+import os
+import shutil
+
+import pytest
+
+import converter
+from conversion_cache import ConversionCache, SegmentManifest, cache_dir_for
+
+docx = pytest.importorskip('docx')
+
+
+def make_docx(path, *paragraphs):
+    document = docx.Document()
+    for text in paragraphs:
+        document.add_paragraph(text)
+    document.save(str(path))
+    return str(path)
+
+
+def test_key_covers_content_version_and_options(tmp_path):
+    cache = ConversionCache(str(tmp_path), '1.0')
+    key = cache.make_key('abc', {'extract_images': True, 'document_name': 'a'})
+
+    assert key == cache.make_key('abc', {'document_name': 'a', 'extract_images': True})
+    assert key != cache.make_key('abd', {'extract_images': True, 'document_name': 'a'})
+    assert key != cache.make_key('abc', {'extract_images': False, 'document_name': 'a'})
+    assert key != ConversionCache(str(tmp_path), '1.1').make_key('abc', {'extract_images': True, 'document_name': 'a'})
+
+
+def test_entry_is_dropped_once_its_images_are_gone(tmp_path):
+    image = tmp_path / 'img.png'
+    image.write_bytes(b'png')
+    cache = ConversionCache(str(tmp_path / 'conversions'), '1.0')
+    cache.put('k', {'markdown_content': 'md', 'images': [{'path': str(image)}]})
+
+    assert cache.get('k')['markdown_content'] == 'md'
+    image.unlink()
+    assert cache.get('k') is None
+    assert cache.get('never-stored') is None
+
+
+def test_least_recently_used_entries_are_pruned(tmp_path):
+    cache = ConversionCache(str(tmp_path), '1.0', max_entries=2)
+    for i, key in enumerate(['a', 'b']):
+        cache.put(key, {'markdown_content': key})
+        os.utime(tmp_path / f'{key}.json', (1000 + i, 1000 + i))
+    cache.get('a')  # Now more recently used than b
+
+    cache.put('c', {'markdown_content': 'c'})
+
+    assert sorted(os.listdir(tmp_path)) == ['a.json', 'c.json']
+
+
+def test_cache_folders(tmp_path):
+    document = str(tmp_path / 'deck.pptx')
+
+    assert cache_dir_for(document) == os.path.join(str(tmp_path), 'DocuGenius', '.cache')
+    assert cache_dir_for(document, str(tmp_path / 'kb' / '.cache')) == str(tmp_path / 'kb' / '.cache')
+    assert ConversionCache.for_document(document, '1.0', str(tmp_path / 'c')).cache_dir == str(tmp_path / 'c' / 'conversions')
+    manifest = SegmentManifest.for_document(document, {}, 'text', str(tmp_path / 'c'))
+    assert manifest.manifest_path == str(tmp_path / 'c' / 'segments' / 'deck.pptx.text.json')
+
+
+def test_hit_skips_the_conversion_and_a_content_change_misses(tmp_path, monkeypatch):
+    source = make_docx(tmp_path / 'report.docx', 'first version')
+    cache_dir = str(tmp_path / 'cache')
+    first = converter.convert_document(source, False, cache_dir=cache_dir)
+
+    def must_not_convert(*args, **kwargs):
+        raise AssertionError('a cache hit must not convert the document')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(converter, '_convert_document_uncached', must_not_convert)
+        os.utime(source, (1, 1))  # A touched but unchanged file still hits
+        hit = converter.convert_document(source, False, cache_dir=cache_dir)
+    make_docx(tmp_path / 'report.docx', 'second version')
+    changed = converter.convert_document(source, False, cache_dir=cache_dir)
+
+    assert not first.get('cached') and 'first version' in first['markdown_content']
+    assert hit['cached'] and hit['success'] and hit['markdown_content'] == first['markdown_content']
+    assert not changed.get('cached') and 'second version' in changed['markdown_content']
+    assert os.listdir(cache_dir) == ['conversions']
+
+
+def test_text_only_results_are_shared_by_renamed_copies(tmp_path):
+    make_docx(tmp_path / 'a.docx', 'same words')
+    shutil.copy(str(tmp_path / 'a.docx'), str(tmp_path / 'b.docx'))
+    cache_dir = str(tmp_path / 'cache')
+
+    converter.convert_document(str(tmp_path / 'a.docx'), False, cache_dir=cache_dir)
+    copy = converter.convert_document(str(tmp_path / 'b.docx'), False, cache_dir=cache_dir)
+
+    assert copy.get('cached')
+
+
+def test_failed_conversions_are_not_cached(tmp_path):
+    broken = tmp_path / 'broken.docx'
+    broken.write_bytes(b'not a zip file')
+    cache_dir = tmp_path / 'cache'
+
+    result = converter.convert_document(str(broken), False, cache_dir=str(cache_dir))
+
+    assert not result['success']
+    assert not (cache_dir / 'conversions').exists() or not os.listdir(str(cache_dir / 'conversions'))
@@ -0,0 +1,123 @@
+"""Streaming CSV tables: dialect and header sniffing, row limits and sampling"""
+
+import io
+
+import converter
+from csv_table import SNIFF_SIZE, sniff_table, write_csv_table
+from markdown_writer import MarkdownWriter
+
+
+class LineStream:
+    """Text stream over generated lines that records how many lines were read"""
+
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self.lines_read = 0
+        self.exhausted = False
+
+    def readline(self):
+        return next(self, '')
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            line = next(self._lines)
+        except StopIteration:
+            self.exhausted = True
+            raise
+        self.lines_read += 1
+        return line
+
+
+def table(text, tab_separated=False, **limits):
+    writer = MarkdownWriter()
+    written = write_csv_table(writer, io.StringIO(text), tab_separated, **limits)
+    return writer.getvalue(), written
+
+
+def test_header_rows_and_ragged_lines():
+    markdown, written = table('name,city\nAda,London\n\nAlan\nGrace,New York,extra\n')
+
+    assert markdown == ('| name | city |\n| --- | --- |\n| Ada | London |\n| Alan |  |\n'
+                        '| Grace | New York |')
+    assert written == 3
+
+
+def test_sniffed_delimiter_and_quoted_fields():
+    markdown, _ = table('id;note\n1;"semi; colon"\n2;"two\nlines"\n')
+
+    assert markdown.splitlines()[:3] == ['| id | note |', '| --- | --- |', '| 1 | semi; colon |']
+
+
+def test_numeric_first_row_is_data():
+    dialect, has_header = sniff_table('1,2,3\n4,5,6\n7,8,9\n')
+    markdown, written = table('1,2\n3,4\n')
+
+    assert dialect.delimiter == ',' and not has_header
+    assert markdown.startswith('| Column 1 | Column 2 |\n| --- | --- |\n| 1 | 2 |')
+    assert written == 2
+
+
+def test_tab_separated_default_and_empty_files():
+    markdown, _ = table('single\tcolumn?\n', tab_separated=True)
+
+    assert markdown.startswith('| single | column? |')
+    assert table('') == ('', None)
+    assert table('\n\n') == ('', None)
+
+
+def test_max_rows_stops_reading_the_file():
+    stream = LineStream(f'{i},{i * i}\n' for i in range(1000000))
+    writer = MarkdownWriter()
+
+    written = write_csv_table(writer, stream, max_rows=5)
+
+    assert written == 5
+    assert not stream.exhausted
+    # Little more than the sniffing sample is read, not the million rows
+    assert stream.lines_read < SNIFF_SIZE
+    assert writer.getvalue().endswith('<!-- Showing the first 5 rows; the rest of the file was not read -->')
+
+
+def test_rows_are_written_while_the_file_is_still_being_read():
+    stream = LineStream(['a,b\n'] + [f'{i},x\n' for i in range(100000)])
+    first_write_seen_exhausted = []
+
+    class Target:
+        def write(self, text):
+            if not first_write_seen_exhausted:
+                first_write_seen_exhausted.append(stream.exhausted)
+
+    write_csv_table(MarkdownWriter(Target()), stream)
+
+    assert first_write_seen_exhausted == [False]
+    assert stream.exhausted
+
+
+def test_sampled_rows_are_spread_in_file_order_and_repeatable():
+    text = 'n\n' + ''.join(f'{i}\n' for i in range(1000))
+
+    first, written = table(text, sample_rows=10)
+    second, _ = table(text, sample_rows=10, max_rows=2)
+    everything, _ = table(text, sample_rows=5000)
+
+    numbers = [int(line.strip('| ')) for line in first.splitlines()[2:12]]
+    assert written == 10 and numbers == sorted(numbers)
+    assert max(numbers) - min(numbers) > 500
+    assert first == second
+    assert first.endswith('<!-- Sampled 10 of 1000 rows -->')
+    assert '<!--' not in everything
+
+
+def test_converter_passes_the_csv_limits(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_text('a,b\n' + ''.join(f'{i},{i}\n' for i in range(50)), encoding='utf-8')
+
+    limited = converter.convert_text(str(path), csv_max_rows=3)
+    sampled = converter.convert_text(str(path), csv_sample_rows=4)
+
+    assert sum(line.startswith('|') for line in limited.splitlines()) == 5
+    assert 'Showing the first 3 rows' in limited
+    assert 'Sampled 4 of 50 rows' in sampled
@@ -0,0 +1,104 @@
+"""Incremental PPTX conversion: only changed slides are rendered, the rest are spliced back in"""
+
+import io
+import os
+
+import pytest
+
+from image_extractor import ImageExtractor, extract_document_with_images
+
+pptx = pytest.importorskip('pptx')
+
+
+@pytest.fixture
+def deck(tmp_path, make_png):
+    """A three-slide deck with a title and one picture per slide"""
+    presentation = pptx.Presentation()
+    for number in range(1, 4):
+        slide = presentation.slides.add_slide(presentation.slide_layouts[5])
+        slide.shapes.title.text = f'Slide title {number}'
+        slide.shapes.add_picture(io.BytesIO(make_png(60 + number, 60, number * 40)), pptx.util.Inches(1), pptx.util.Inches(2))
+    path = tmp_path / 'deck.pptx'
+    presentation.save(str(path))
+    return str(path)
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """Slide numbers rendered by ImageExtractor, in order"""
+    slide_numbers = []
+    render = ImageExtractor._render_pptx_slide
+
+    def counting_render(self, slide, slide_num):
+        slide_numbers.append(slide_num + 1)
+        return render(self, slide, slide_num)
+
+    monkeypatch.setattr(ImageExtractor, '_render_pptx_slide', counting_render)
+    return slide_numbers
+
+
+def convert(path, tmp_path, incremental=True, **kwargs):
+    result = extract_document_with_images(path, str(tmp_path / 'images'), str(tmp_path), incremental=incremental,
+                                          cache_dir=str(tmp_path / 'cache'), **kwargs)
+    assert result['success'], result.get('error')
+    return result
+
+
+def edit_slide(path, index, title):
+    presentation = pptx.Presentation(path)
+    presentation.slides[index].shapes.title.text = title
+    presentation.save(path)
+
+
+def test_unchanged_deck_renders_no_slides(deck, tmp_path, rendered):
+    first = convert(deck, tmp_path)
+    second = convert(deck, tmp_path)
+
+    assert rendered == [1, 2, 3]
+    assert second['markdown_content'] == first['markdown_content']
+    assert second['images'] == first['images']
+    assert os.path.exists(str(tmp_path / 'cache' / 'segments' / 'deck.pptx.content.json'))
+
+
+def test_edited_slide_is_spliced_between_stored_slides(deck, tmp_path, rendered):
+    convert(deck, tmp_path)
+    edit_slide(deck, 1, 'A brand new title')
+
+    spliced = convert(deck, tmp_path)
+    fresh = convert(deck, tmp_path, incremental=False)
+
+    assert rendered == [1, 2, 3, 2, 1, 2, 3]
+    assert spliced['markdown_content'] == fresh['markdown_content']
+    assert spliced['images'] == fresh['images']
+    assert 'A brand new title' in spliced['markdown_content']
+    assert 'Slide title 2' not in spliced['markdown_content']
+
+
+def test_added_slide_is_the_only_one_rendered(deck, tmp_path, rendered):
+    convert(deck, tmp_path)
+    presentation = pptx.Presentation(deck)
+    presentation.slides.add_slide(presentation.slide_layouts[5]).shapes.title.text = 'Appendix'
+    presentation.save(deck)
+
+    result = convert(deck, tmp_path)
+
+    assert rendered == [1, 2, 3, 4]
+    assert result['markdown_content'].index('Slide title 3') < result['markdown_content'].index('Appendix')
+
+
+def test_slide_is_rendered_again_when_its_image_was_deleted(deck, tmp_path, rendered):
+    first = convert(deck, tmp_path)
+    os.remove(first['images'][2]['path'])
+
+    second = convert(deck, tmp_path)
+
+    assert rendered == [1, 2, 3, 3]
+    assert os.path.exists(second['images'][2]['path'])
+
+
+def test_different_settings_render_every_slide(deck, tmp_path, rendered):
+    convert(deck, tmp_path)
+    result = convert(deck, tmp_path, min_image_size=63)
+
+    assert rendered == [1, 2, 3, 1, 2, 3]
+    assert [image['slide'] for image in result['images']] == [3]
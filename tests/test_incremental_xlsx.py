@@ -0,0 +1,130 @@
+"""Incremental XLSX conversion: only changed worksheets are converted again"""
+
+import io
+
+import pytest
+
+import converter
+from image_extractor import ImageExtractor, extract_document_with_images
+
+openpyxl = pytest.importorskip('openpyxl')
+
+
+@pytest.fixture
+def workbook_path(tmp_path, make_png):
+    """Three sheets of figures, the first with a picture anchored on it"""
+    pytest.importorskip('PIL')
+    from openpyxl.drawing.image import Image
+
+    workbook = openpyxl.Workbook()
+    for number, name in enumerate(['North', 'South', 'West'], 1):
+        sheet = workbook.active if number == 1 else workbook.create_sheet(name)
+        sheet.title = name
+        sheet.append(['Quarter', 'Revenue'])
+        for quarter in range(1, 5):
+            sheet.append([f'Q{quarter}', number * 1000 + quarter])
+    workbook['North'].add_image(Image(io.BytesIO(make_png(80, 80, 200))), 'D2')
+    path = str(tmp_path / 'figures.xlsx')
+    workbook.save(path)
+    # openpyxl adds a line style to the picture the first time it re-saves a workbook;
+    # round-trip once so that the edits below change only the sheet they touch
+    openpyxl.load_workbook(path).save(path)
+    return path
+
+
+def edit_cell(path, sheet_name, cell, value):
+    workbook = openpyxl.load_workbook(path)
+    workbook[sheet_name][cell] = value
+    workbook.save(path)
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """Sheet names rendered by the image extractor and by the text converter"""
+    names = {'content': [], 'text': []}
+    render_sheet = ImageExtractor._render_xlsx_sheet
+    write_sheet = converter._write_xlsx_sheet
+
+    def counting_render(self, archive, worksheet, sheet_name, media_parts):
+        names['content'].append(sheet_name)
+        return render_sheet(self, archive, worksheet, sheet_name, media_parts)
+
+    def counting_write(writer, workbook, sheet_name, with_header):
+        names['text'].append(sheet_name)
+        return write_sheet(writer, workbook, sheet_name, with_header)
+
+    monkeypatch.setattr(ImageExtractor, '_render_xlsx_sheet', counting_render)
+    monkeypatch.setattr(converter, '_write_xlsx_sheet', counting_write)
+    return names
+
+
+def extract(path, tmp_path, incremental=True):
+    result = extract_document_with_images(path, str(tmp_path / 'images'), str(tmp_path), incremental=incremental,
+                                          cache_dir=str(tmp_path / 'cache'))
+    assert result['success'], result.get('error')
+    return result
+
+
+def test_only_the_edited_sheet_is_rendered_again(workbook_path, tmp_path, rendered):
+    first = extract(workbook_path, tmp_path)
+    unchanged = extract(workbook_path, tmp_path)
+    edit_cell(workbook_path, 'South', 'B3', 424242)
+
+    spliced = extract(workbook_path, tmp_path)
+    fresh = extract(workbook_path, tmp_path, incremental=False)
+
+    assert rendered['content'] == ['North', 'South', 'West', 'South', 'North', 'South', 'West']
+    assert unchanged['markdown_content'] == first['markdown_content']
+    assert spliced['markdown_content'] == fresh['markdown_content']
+    assert spliced['images'] == fresh['images'] and len(spliced['images']) == 1
+    assert '424242' in spliced['markdown_content']
+
+
+def test_text_conversion_replays_unchanged_sheets(workbook_path, tmp_path, rendered):
+    cache_dir = str(tmp_path / 'cache')
+    first = converter.convert_text(workbook_path, incremental=True, cache_dir=cache_dir)
+    edit_cell(workbook_path, 'West', 'A1', 'Period')
+
+    spliced = converter.convert_text(workbook_path, incremental=True, cache_dir=cache_dir)
+    fresh = converter.convert_text(workbook_path)
+
+    assert rendered['text'] == ['North', 'South', 'West', 'West', 'North', 'South', 'West']
+    assert spliced == fresh and spliced != first
+    assert '## West' in spliced and '| Period |' in spliced
+
+
+def test_renamed_sheet_is_converted_again(workbook_path, tmp_path, rendered):
+    cache_dir = str(tmp_path / 'cache')
+    converter.convert_text(workbook_path, incremental=True, cache_dir=cache_dir)
+    workbook = openpyxl.load_workbook(workbook_path)
+    workbook['South'].title = 'Southeast'
+    workbook.save(workbook_path)
+
+    result = converter.convert_text(workbook_path, incremental=True, cache_dir=cache_dir)
+
+    assert rendered['text'][3:] == ['Southeast']
+    assert '## Southeast' in result and '## South\n' not in result
+
+
+def test_workbooks_opened_for_rendering_are_closed(workbook_path, tmp_path, monkeypatch):
+    opened = []
+    closed = []
+    load_workbook = openpyxl.load_workbook
+    close = openpyxl.Workbook.close
+
+    def recording_load(*args, **kwargs):
+        workbook = load_workbook(*args, **kwargs)
+        opened.append(workbook)
+        return workbook
+
+    def recording_close(self):
+        closed.append(self)
+        return close(self)
+
+    monkeypatch.setattr(openpyxl, 'load_workbook', recording_load)
+    monkeypatch.setattr(openpyxl.Workbook, 'close', recording_close)
+    extract(workbook_path, tmp_path)
+    converter.convert_text(workbook_path)
+
+    assert len(opened) == 2
+    assert [id(workbook) for workbook in closed] == [id(workbook) for workbook in opened]
@@ -0,0 +1,109 @@
+"""Token-stream JSON re-indenter of the standalone CLI built by build_binaries.py"""
+
+import importlib.util
+import io
+import json
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DOCUMENTS = [
+    {},
+    [],
+    {'name': 'DocuGenius', 'tags': ['a', 'b'], 'empty': {}, 'none': [], 'nested': {'deep': [[1, [2, {}]], {'x': None}]}},
+    [0, -12, 3.25, 1e+30, -2.5e-07, True, False, None],
+    {'quotes': 'say "hi"', 'slashes': 'C:\\temp\\', 'brackets': '{[,:]}', 'unicode': 'café ☕', 'newline': 'a\nb'},
+    'just a string',
+    42,
+]
+
+
+@pytest.fixture(scope='module')
+def cli(tmp_path_factory):
+    """The generated CLI script, imported as a module"""
+    spec = importlib.util.spec_from_file_location('build_binaries', os.path.join(ROOT, 'build_binaries.py'))
+    build_binaries = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(build_binaries)
+
+    path = tmp_path_factory.mktemp('cli') / 'docugenius_cli.py'
+    path.write_text(build_binaries.create_cli_source(), encoding='utf-8')
+    spec = importlib.util.spec_from_file_location('docugenius_cli', str(path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(params=[None, 5], ids=['one-chunk', 'tiny-chunks'])
+def reindent(cli, request, monkeypatch):
+    """_reindent_json over a string, optionally read in chunks that split every token"""
+    if request.param:
+        monkeypatch.setattr(cli, 'TEXT_CHUNK_SIZE', request.param)
+
+    def run(text):
+        out = io.StringIO()
+        cli._reindent_json(io.StringIO(text), out)
+        return out.getvalue()
+
+    return run
+
+
+@pytest.mark.parametrize('document', DOCUMENTS)
+def test_layout_matches_json_dumps(reindent, document):
+    expected = json.dumps(document, indent=2, ensure_ascii=False)
+
+    assert reindent(json.dumps(document, ensure_ascii=False)) == expected
+    assert reindent(json.dumps(document, indent=4, ensure_ascii=False)) == expected
+    assert reindent(json.dumps(document, separators=(',', ':'), ensure_ascii=False)) == expected
+
+
+def test_json_lines_print_one_value_after_another(reindent):
+    lines = [{'id': 1}, {'id': 2, 'tags': []}, [3]]
+    text = ''.join(json.dumps(line) + '\n' for line in lines)
+
+    assert reindent(text) == '\n'.join(json.dumps(line, indent=2) for line in lines)
+
+
+def test_long_strings_span_many_chunks(reindent):
+    document = {'blob': 'x' * 5000 + '\\"' + 'y' * 3000}
+
+    assert reindent(json.dumps(document)) == json.dumps(document, indent=2)
+
+
+@pytest.mark.parametrize('text', [
+    '', '   ', '[01]', '[1e]', '[-]', '[.]', '[1+2]', '[1.]', '[.5]', '[+1]', '[NaN]', '[tru]', "['a']",
+    '{"a" 1}', '{"a":}', '{"a":1,}', '{1: 2}', '[1 2]', '[1,]', '[,1]', '[1:2]', '{"a":1]', '[}', ']', ':',
+    '[', '{"a":[1,2}', '"unterminated', '{"a": "b',
+])
+def test_invalid_json_is_rejected(reindent, text):
+    with pytest.raises(ValueError):
+        reindent(text)
+
+
+def test_text_before_the_error_is_written(cli):
+    out = io.StringIO()
+
+    with pytest.raises(ValueError, match="found 'oops'"):
+        cli._reindent_json(io.StringIO('[1, 2, oops]'), out)
+
+    assert out.getvalue() == '[\n  1,\n  2,\n  '
+
+
+def test_large_and_multi_value_files_are_streamed(cli, tmp_path, monkeypatch):
+    document = {'rows': [{'id': index, 'name': f'row {index}'} for index in range(50)]}
+    path = tmp_path / 'api.json'
+    path.write_text(json.dumps(document), encoding='utf-8')
+    lines_path = tmp_path / 'events.jsonl'
+    lines_path.write_text('{"event": 1}\n{"event": 2}\n', encoding='utf-8')
+    broken_path = tmp_path / 'broken.json'
+    broken_path.write_text('{"a": [1, 2}', encoding='utf-8')
+
+    parsed = cli.convert_json_file(str(path))
+    monkeypatch.setattr(cli, 'JSON_STREAMING_THRESHOLD', 0)
+    streamed = cli.convert_json_file(str(path))
+
+    assert streamed == parsed
+    assert parsed == f"# api.json\n\n```json\n{json.dumps(document, indent=2)}\n```\n"
+    assert '{\n  "event": 1\n}\n{\n  "event": 2\n}' in cli.convert_json_file(str(lines_path))
+    assert 'Error converting JSON:' in cli.convert_json_file(str(broken_path))
@@ -0,0 +1,89 @@
+"""Worker mode: one JSON response line per request line on stdin"""
+
+import io
+import json
+import subprocess
+import sys
+
+from converter import handle_request, run_worker
+
+
+def serve(*lines):
+    """Run the worker over the given request lines and return the parsed responses"""
+    output = io.StringIO()
+    run_worker(io.StringIO(''.join(line + '\n' for line in lines)), output)
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_worker_announces_itself_then_answers_each_request(tmp_path):
+    note = tmp_path / 'note.txt'
+    note.write_text('hello worker', encoding='utf-8')
+
+    responses = serve(
+        json.dumps({'id': 1, 'type': 'ping'}),
+        '',
+        json.dumps({'id': 2, 'type': 'simple_convert', 'file_path': str(note)}),
+        json.dumps({'id': 3, 'file_path': str(note), 'extract_images': False}),
+    )
+
+    assert responses[0]['type'] == 'ready'
+    assert [response['id'] for response in responses[1:]] == [1, 2, 3]
+    assert responses[1]['type'] == 'pong'
+    assert responses[2]['success'] and 'hello worker' in responses[2]['markdown']
+    assert responses[3]['success'] and responses[3]['images'] == []
+
+
+def test_invalid_lines_get_an_error_response_and_the_worker_keeps_going(tmp_path):
+    note = tmp_path / 'note.txt'
+    note.write_text('still here', encoding='utf-8')
+
+    responses = serve('{not json', '[1, 2]', json.dumps({'id': 'after', 'file_path': str(note)}))
+
+    assert [response['success'] for response in responses[1:]] == [False, False, True]
+    assert responses[1]['error'].startswith('Invalid request:')
+    assert responses[2]['error'].startswith('Invalid request:')
+    assert responses[3]['id'] == 'after'
+
+
+def test_shutdown_stops_reading_requests():
+    responses = serve(json.dumps({'id': 1, 'type': 'shutdown'}), json.dumps({'id': 2, 'type': 'ping'}))
+
+    assert [response.get('type') for response in responses] == ['ready', 'shutdown']
+
+
+def test_failures_are_reported_through_success_and_error(tmp_path):
+    starts_like_an_error = tmp_path / 'error.txt'
+    starts_like_an_error.write_text('Error: this is the document text', encoding='utf-8')
+    unsupported = tmp_path / 'data.xyz'
+    unsupported.write_text('?', encoding='utf-8')
+
+    ok = handle_request({'id': 1, 'file_path': str(starts_like_an_error)})
+    failed = handle_request({'id': 2, 'file_path': str(unsupported)})
+
+    assert ok['success'] and ok['markdown'].startswith('Error: this is the document text')
+    assert not failed['success'] and 'markdown' not in failed
+    assert failed['error'].startswith('Unsupported file type')
+
+
+def test_request_errors():
+    assert handle_request({'id': 1})['error'] == 'Missing file_path'
+    assert handle_request({'id': 2, 'type': 'shred', 'file_path': 'a.txt'})['error'] == 'Unknown request type: shred'
+    invalid = handle_request({'id': 3, 'file_path': 'a.docx', 'docx_engine': 'fast'})
+    assert not invalid['success'] and invalid['error'].startswith('Invalid request: Unknown DOCX engine')
+
+
+def test_worker_stdout_carries_only_response_lines(converter_script, tmp_path):
+    note = tmp_path / 'note.txt'
+    note.write_text('over a pipe', encoding='utf-8')
+    requests = ''.join(json.dumps(request) + '\n' for request in [
+        {'id': 1, 'file_path': str(note)},
+        {'id': 2, 'file_path': str(tmp_path / 'missing.txt')},
+    ])
+
+    completed = subprocess.run([sys.executable, converter_script, '--worker'], input=requests,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, encoding='utf-8', timeout=60)
+
+    responses = [json.loads(line) for line in completed.stdout.splitlines()]
+    assert completed.returncode == 0
+    assert [response['id'] for response in responses] == [None, 1, 2]
+    assert responses[1]['success'] and not responses[2]['success']